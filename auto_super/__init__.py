@@ -0,0 +1 @@
+"""auto_super — инструменты автоматизации Superset (датасеты, графики, дашборды)."""
@@ -0,0 +1,5 @@
+import sys
+
+from auto_super.cli import main
+
+sys.exit(main())
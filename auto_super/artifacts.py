@@ -0,0 +1,200 @@
+"""Артефакты экспорта (superset_artifacts.yaml) и их раскладка по файлам.
+
+Один большой YAML удобно читать глазами, но его приходится целиком
+держать в памяти и при записи, и при импорте. Пошардовая раскладка —
+по файлу на объект плюс индекс:
+
+    superset_artifacts/
+        index.yaml                 # metadata + списки {uuid, id, name, file}
+        databases/<uuid>.yaml
+        datasets/<uuid>.yaml
+        charts/<uuid>.yaml
+        dashboards/<uuid>.yaml
+
+Файлы пишутся и читаются пулом потоков; если PyYAML собран с libyaml,
+используются CSafeLoader/CSafeDumper.
+"""
+
+import asyncio
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as Dumper, CSafeLoader as Loader
+except ImportError:
+    from yaml import SafeDumper as Dumper, SafeLoader as Loader
+
+INDEX_FILE = "index.yaml"
+# Ключ в superset_artifacts.yaml -> каталог шардов
+SECTIONS = {
+    "database": "databases",
+    "datasets": "datasets",
+    "charts": "charts",
+    "dashboard": "dashboards",
+}
+NAME_FIELDS = {
+    "databases": "database_name",
+    "datasets": "table_name",
+    "charts": "slice_name",
+    "dashboards": "dashboard_title",
+}
+DEFAULT_WORKERS = 8
+
+# Пространство имён для детерминированных uuid объектов из YAML:
+# повторный импорт того же файла обновляет объекты, а не плодит копии
+ARTIFACT_NAMESPACE = uuid.UUID("6f1c2b0e-4d7a-4c55-9a8e-2f0b7c1d9e31")
+
+
+def artifact_uuid(kind: str, key: Any) -> str:
+    return str(uuid.uuid5(ARTIFACT_NAMESPACE, f"{kind}:{key}"))
+
+
+def valid_uuid(value: Any) -> Optional[str]:
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return None
+
+
+def object_uuid(directory: str, item: Dict[str, Any]) -> str:
+    """uuid объекта артефактов (тот же, что попадает в бандл импорта)"""
+    if directory == "databases":
+        return valid_uuid(item.get("uuid")) or artifact_uuid(
+            "database", item["database_name"]
+        )
+    return artifact_uuid(directory[:-1], item["id"])
+
+
+def dump_yaml(data: Any) -> str:
+    return yaml.dump(
+        data,
+        Dumper=Dumper,
+        allow_unicode=True,
+        default_flow_style=False,
+        sort_keys=False,
+        indent=2,
+    )
+
+
+def load_yaml(path: Path) -> Any:
+    with open(path, encoding="utf-8") as f:
+        return yaml.load(f, Loader=Loader)
+
+
+def _items(data: Dict[str, Any], section: str) -> List[Dict[str, Any]]:
+    value = data.get(section)
+    if not value:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+# ========================
+# Запись
+# ========================
+def write_sharded(
+    data: Dict[str, Any], directory: str, workers: int = DEFAULT_WORKERS
+) -> Dict[str, Any]:
+    """Разложить артефакты по файлам; индекс пишется последним.
+
+    Шарды объектов, которых больше нет в `data`, удаляются, так что
+    каталог всегда совпадает с индексом.
+    """
+    base = Path(directory)
+    objects: Dict[str, List[Dict[str, Any]]] = {}
+    jobs = []
+    for section, sub in SECTIONS.items():
+        (base / sub).mkdir(parents=True, exist_ok=True)
+        objects[sub] = []
+        for item in _items(data, section):
+            object_id = object_uuid(sub, item)
+            file = f"{sub}/{object_id}.yaml"
+            objects[sub].append(
+                {
+                    "uuid": object_id,
+                    "id": item.get("id"),
+                    "name": item.get(NAME_FIELDS[sub]),
+                    "file": file,
+                }
+            )
+            jobs.append((base / file, item))
+
+    def write(job) -> None:
+        path, item = job
+        path.write_text(dump_yaml(item), encoding="utf-8")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(write, jobs))
+
+    expected = {path for path, _ in jobs}
+    for sub in SECTIONS.values():
+        for path in (base / sub).glob("*.yaml"):
+            if path not in expected:
+                path.unlink()
+
+    index = {"metadata": data.get("metadata") or {}, "objects": objects}
+    (base / INDEX_FILE).write_text(dump_yaml(index), encoding="utf-8")
+    return index
+
+
+# ========================
+# Чтение
+# ========================
+def read_index(directory: str) -> Dict[str, Any]:
+    path = Path(directory) / INDEX_FILE
+    if not path.exists():
+        raise FileNotFoundError(f"❌ Индекс {path} не найден")
+    return load_yaml(path)
+
+
+async def stream(
+    directory: str,
+    sub: str,
+    workers: int = DEFAULT_WORKERS,
+    index: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Объекты одного каталога (`datasets`, `charts`, ...) по порядку индекса.
+
+    Файлы разбираются в пуле потоков, вперёд читается не больше
+    2 × `workers` файлов — память не зависит от размера экспорта, а
+    первый объект доступен сразу, не дожидаясь остальных.
+    """
+    base = Path(directory)
+    index = index or read_index(directory)
+    entries = index["objects"].get(sub, [])
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=workers)
+    pending: deque = deque()
+    try:
+        for entry in entries:
+            pending.append(
+                loop.run_in_executor(pool, load_yaml, base / entry["file"])
+            )
+            if len(pending) >= 2 * workers:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def read_sharded(
+    directory: str, workers: int = DEFAULT_WORKERS
+) -> Dict[str, Any]:
+    """Собрать из шардов тот же словарь, что в superset_artifacts.yaml"""
+    base = Path(directory)
+    index = read_index(directory)
+    data: Dict[str, Any] = {"metadata": index.get("metadata") or {}}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for section, sub in SECTIONS.items():
+            files = [base / e["file"] for e in index["objects"].get(sub, [])]
+            items = list(pool.map(load_yaml, files))
+            if section in ("database", "dashboard"):
+                data[section] = items[0] if items else None
+            else:
+                data[section] = items
+    return data
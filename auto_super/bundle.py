@@ -0,0 +1,228 @@
+"""Работа с нативными ZIP-бандлами Superset (export/import).
+
+Бандл хранится как словарь `путь -> содержимое`, где путь задан без
+корневой папки архива: `metadata.yaml`, `databases/<name>.yaml`,
+`datasets/<db>/<name>.yaml`, `charts/<name>.yaml`, `dashboards/<name>.yaml`.
+"""
+
+import io
+import re
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Set
+
+import yaml
+
+BUNDLE_VERSION = "1.0.0"
+# Каталоги объектов в порядке зависимостей
+KINDS = ("databases", "datasets", "charts", "dashboards")
+
+Bundle = Dict[str, bytes]
+
+
+def metadata(bundle_type: str = "assets") -> bytes:
+    """Содержимое metadata.yaml"""
+    return yaml.safe_dump(
+        {
+            "version": BUNDLE_VERSION,
+            "type": bundle_type,
+            "timestamp": time.strftime(
+                "%Y-%m-%dT%H:%M:%S+00:00", time.gmtime()
+            ),
+        },
+        sort_keys=False,
+    ).encode("utf-8")
+
+
+def read_zip(content: bytes) -> Bundle:
+    """Распаковать ZIP из Superset, отбросив корневую папку архива"""
+    files: Bundle = {}
+    with zipfile.ZipFile(io.BytesIO(content)) as zf:
+        for name in zf.namelist():
+            if name.endswith("/"):
+                continue
+            _, _, relative = name.partition("/")
+            files[relative or name] = zf.read(name)
+    return files
+
+
+def build_zip(files: Bundle, root: str = "bundle") -> bytes:
+    """Собрать ZIP в структуре, которую принимает /import/"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for path, content in sorted(files.items()):
+            zf.writestr(f"{root}/{path}", content)
+    return buffer.getvalue()
+
+
+def write_dir(files: Bundle, directory: str) -> None:
+    """Разложить бандл по файлам в каталоге"""
+    base = Path(directory)
+    for path, content in files.items():
+        target = base / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+
+
+def read_dir(directory: str) -> Bundle:
+    """Прочитать бандл из каталога, записанного `write_dir`"""
+    base = Path(directory)
+    if not base.is_dir():
+        raise Exception(f"❌ Каталог бандла {directory} не найден")
+    files = {
+        path.relative_to(base).as_posix(): path.read_bytes()
+        for path in base.rglob("*.yaml")
+    }
+    if "metadata.yaml" not in files:
+        raise Exception(f"❌ В каталоге {directory} нет metadata.yaml")
+    return files
+
+
+def dump(config: Dict[str, Any]) -> bytes:
+    """YAML-файл объекта бандла"""
+    return yaml.safe_dump(
+        config, allow_unicode=True, sort_keys=False, indent=2
+    ).encode("utf-8")
+
+
+def load(content: bytes) -> Dict[str, Any]:
+    return yaml.safe_load(content) or {}
+
+
+def safe_name(text: str) -> str:
+    """Имя файла внутри бандла: буквы/цифры, остальное — `_`"""
+    name = re.sub(r"[^\w-]+", "_", str(text), flags=re.UNICODE).strip("_")
+    return name or "unnamed"
+
+
+# ========================
+# Зависимости и разбиение на части
+# ========================
+# Тип в metadata.yaml для импорта через /api/v1/<resource>/import/
+MODEL_TYPES = {
+    "database": "Database",
+    "dataset": "SqlaTable",
+    "chart": "Slice",
+    "dashboard": "Dashboard",
+}
+
+
+def with_metadata(files: Bundle, bundle_type: str) -> Bundle:
+    """Копия бандла с другим типом в metadata.yaml"""
+    return {**files, "metadata.yaml": metadata(bundle_type)}
+
+
+def dashboard_chart_uuids(config: Dict[str, Any]) -> List[str]:
+    """uuid графиков, на которые ссылается position дашборда"""
+    position = config.get("position") or {}
+    return [
+        node["meta"]["uuid"]
+        for node in position.values()
+        if isinstance(node, dict)
+        and node.get("type") == "CHART"
+        and node.get("meta", {}).get("uuid")
+    ]
+
+
+def index(files: Bundle) -> Dict[str, Dict[str, Any]]:
+    """uuid -> {path, kind, deps} для всех объектов бандла"""
+    result = {}
+    for path, content in files.items():
+        kind = path.split("/", 1)[0]
+        if kind not in KINDS:
+            continue
+        config = load(content)
+        if kind == "datasets":
+            deps = [config.get("database_uuid")]
+        elif kind == "charts":
+            deps = [config.get("dataset_uuid")]
+        elif kind == "dashboards":
+            deps = dashboard_chart_uuids(config)
+        else:
+            deps = []
+        result[config["uuid"]] = {
+            "path": path,
+            "kind": kind,
+            "deps": [d for d in deps if d],
+        }
+    return result
+
+
+def closure(
+    objects: Dict[str, Dict[str, Any]], uuids: List[str]
+) -> Set[str]:
+    """`uuids` вместе со всеми их зависимостями (по результату `index`)"""
+    members: Set[str] = set()
+    stack = list(uuids)
+    while stack:
+        uuid = stack.pop()
+        if uuid in members or uuid not in objects:
+            continue
+        members.add(uuid)
+        stack.extend(objects[uuid]["deps"])
+    return members
+
+
+def subset(
+    files: Bundle,
+    objects: Dict[str, Dict[str, Any]],
+    uuids: List[str],
+    bundle_type: str = "assets",
+) -> Bundle:
+    """Часть бандла: объекты `uuids` и их зависимости"""
+    part = {
+        objects[u]["path"]: files[objects[u]["path"]]
+        for u in closure(objects, uuids)
+    }
+    part["metadata.yaml"] = metadata(bundle_type)
+    return part
+
+
+def split(files: Bundle, max_objects: int) -> List[Bundle]:
+    """Разбить большой бандл на части не более чем по `max_objects`
+    основных объектов.
+
+    Superset импортирует объект только вместе с его зависимостями,
+    поэтому каждая часть дополняется нужными БД, датасетами и графиками.
+    Части идут в порядке БД/датасеты → графики → дашборды.
+    """
+    objects = index(files)
+    parts: List[Bundle] = []
+    for kind in KINDS:
+        uuids = [u for u, info in objects.items() if info["kind"] == kind]
+        for i in range(0, len(uuids), max_objects):
+            parts.append(subset(files, objects, uuids[i : i + max_objects]))
+    return parts
+
+
+# ========================
+# Загрузка в Superset
+# ========================
+async def import_by_resource(client, files: Bundle) -> None:
+    """Запасной путь без /api/v1/assets/: тот же бандл по типам объектов"""
+    present = {path.split("/", 1)[0] for path in files}
+    for resource in ("database", "dataset", "chart", "dashboard"):
+        if f"{resource}s" not in present:
+            continue
+        typed = with_metadata(files, MODEL_TYPES[resource])
+        await client.import_zip(
+            resource, build_zip(typed), filename=f"{resource}s.zip"
+        )
+
+
+async def import_files(client, files: Bundle) -> None:
+    """Импорт бандла одним POST /api/v1/assets/import/.
+
+    Если эндпоинт недоступен (Superset < 2.1), бандл загружается по
+    типам объектов.
+    """
+    from auto_super.client import SupersetAPIError
+
+    try:
+        await client.import_assets(build_zip(files))
+    except SupersetAPIError as e:
+        if e.status not in (404, 405):
+            raise
+        print("⚠️ /api/v1/assets/import/ недоступен, импорт по типам")
+        await import_by_resource(client, files)
@@ -0,0 +1,26 @@
+"""JSON-файлы (кэши в ~/.cache/auto_super, история замеров): чтение и
+атомарная запись."""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict
+
+
+def read_json(path) -> Dict[str, Any]:
+    """Содержимое кэша; отсутствующий или битый файл — пустой словарь"""
+    try:
+        with open(Path(path).expanduser(), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def write_json(path, data: Dict[str, Any]) -> None:
+    """Записать атомарно: параллельные запуски не видят половину файла"""
+    path = Path(path).expanduser()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
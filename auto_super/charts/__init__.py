@@ -0,0 +1 @@
+"""Скрипты создания отдельных графиков."""
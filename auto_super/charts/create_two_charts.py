@@ -1,66 +1,35 @@
-import requests
+import asyncio
 import json
-import time
+import sys
+from pathlib import Path
 
-# ========================
-# Конфигурация
-# ========================
-BASE_URL = "http://localhost:8088"
-USERNAME = "admin"
-PASSWORD = "admin"
-
-# Создаём сессию
-session = requests.Session()
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
-
-# ========================
-# 1. Авторизация
-# ========================
-def login():
-    print("🔐 Авторизуемся в Superset...")
-    url = f"{BASE_URL}/api/v1/security/login"
-    payload = {"username": USERNAME, "password": PASSWORD, "provider": "db"}
-    response = session.post(url, json=payload)
-    if response.status_code != 200:
-        raise Exception(f"❌ Ошибка авторизации: {response.text}")
-    token = response.json()["access_token"]
-    session.headers.update({"Authorization": f"Bearer {token}"})
-    session.headers.update({"Content-Type": "application/json"})
-    print("✅ Авторизация прошла успешно")
+from auto_super.client import SupersetAPIError, SupersetClient
+from auto_super.columns import ColumnIndex, check_charts
+from auto_super.config import BASE_URL
 
 
 # ========================
-# 2. Получить ID датасета по имени
+# 1. Получить ID датасета по имени
 # ========================
-def get_dataset_id_by_name(dataset_name):
+def get_dataset_id_by_name(index: ColumnIndex, dataset_name):
+    """ID из индекса колонок (один список датасетов на все имена)"""
     print(f"🔍 Ищем датасет: {dataset_name}")
-    url = f"{BASE_URL}/api/v1/dataset/"
-    params = {
-        "q": json.dumps(
-            {
-                "filters": [
-                    {"col": "table_name", "opr": "eq", "value": dataset_name}
-                ]
-            }
-        )
-    }
-    response = session.get(url, params=params)
-    if response.status_code != 200:
-        raise Exception(f"❌ Ошибка при поиске датасета: {response.text}")
-    data = response.json()
-    if data["count"] == 0:
+    dataset_id = index.dataset_id(dataset_name)
+    if dataset_id is None:
         raise Exception(f"❌ Датасет '{dataset_name}' не найден")
-    dataset_id = data["result"][0]["id"]
     print(f"✅ Найден датасет '{dataset_name}' с ID = {dataset_id}")
     return dataset_id
 
 
 # ========================
-# 3. Создать график
+# 2. Создать график
 # ========================
-def create_chart(dataset_id, chart_name, viz_type, form_data):
+async def create_chart(
+    client: SupersetClient, dataset_id, chart_name, viz_type, form_data
+):
     print(f"📈 Создаём график: {chart_name} ({viz_type})")
-    url = f"{BASE_URL}/api/v1/chart/"
     form_data["datasource"] = f"{dataset_id}__table"
     form_data["viz_type"] = viz_type
     form_data["row_limit"] = 1000
@@ -73,74 +42,87 @@ def create_chart(dataset_id, chart_name, viz_type, form_data):
         "params": json.dumps(form_data),
         "owners": [1],
     }
-    response = session.post(url, json=payload)
-    if response.status_code != 201:
-        raise Exception(f"❌ Ошибка создания графика: {response.text}")
-    chart_id = response.json()["id"]
+    try:
+        chart_id = await client.create_chart(payload)
+    except SupersetAPIError as e:
+        raise Exception(f"❌ Ошибка создания графика: {e.text}")
     print(f"✅ График '{chart_name}' создан (ID: {chart_id})")
     return chart_id
 
 
 # ========================
-# 4. Основной процесс
+# 3. Основной процесс
 # ========================
-if __name__ == "__main__":
-    try:
-        login()
-
-        # Получаем ID датасетов
-        dataset_revenue = get_dataset_id_by_name("Выручка по странам")
+async def main():
+    async with SupersetClient() as client:
+        # ID датасетов и их колонки — из индекса (один список на все имена)
+        try:
+            index = await ColumnIndex.load(client)
+        except SupersetAPIError as e:
+            raise Exception(f"❌ Ошибка при поиске датасета: {e.text}")
+        dataset_revenue = get_dataset_id_by_name(index, "Выручка по странам")
         dataset_new_customers = get_dataset_id_by_name(
-            "Новые клиенты по месяцам"
+            index, "Новые клиенты по месяцам"
         )
 
-        # 1. График: Выручка по странам (Bar Chart)
-        print("\n📊 Создаём график: Выручка по странам")
-        create_chart(
-            dataset_id=dataset_revenue,
-            chart_name="Выручка по странам",
-            viz_type="dist_bar",
-            form_data={
-                "groupby": ["Страна"],
-                "metrics": [
-                    {
-                        "label": "Выручка",
-                        "expressionType": "SIMPLE",
-                        "column": {"column_name": "Выручка"},
-                        "aggregate": "SUM",
-                    }
-                ],
-                "y_axis_format": "SMART_NUMBER",
-            },
-        )
-
-        time.sleep(2)
-
-        # 2. График: Новые клиенты по месяцам (Time Series)
-        print("\n📅 Создаём график: Новые клиенты по месяцам")
-        create_chart(
-            dataset_id=dataset_new_customers,
-            chart_name="Новые клиенты по месяцам",
-            viz_type="time_series",
-            form_data={
-                "x_axis": "Месяц",
-                "metrics": [
-                    {
-                        "label": "Новые клиенты",
-                        "expressionType": "SIMPLE",
-                        "column": {"column_name": "Новые клиенты"},
-                        "aggregate": "SUM",
-                    }
-                ],
-                "y_axis_format": "SMART_NUMBER",
-            },
-        )
+        charts = [
+            # 1. График: Выручка по странам (Bar Chart)
+            (
+                dataset_revenue,
+                dict(
+                    chart_name="Выручка по странам",
+                    viz_type="dist_bar",
+                    form_data={
+                        "groupby": ["Страна"],
+                        "metrics": [
+                            {
+                                "label": "Выручка",
+                                "expressionType": "SIMPLE",
+                                "column": {"column_name": "Выручка"},
+                                "aggregate": "SUM",
+                            }
+                        ],
+                        "y_axis_format": "SMART_NUMBER",
+                    },
+                ),
+            ),
+            # 2. График: Новые клиенты по месяцам (Time Series)
+            (
+                dataset_new_customers,
+                dict(
+                    chart_name="Новые клиенты по месяцам",
+                    viz_type="time_series",
+                    form_data={
+                        "x_axis": "Месяц",
+                        "metrics": [
+                            {
+                                "label": "Новые клиенты",
+                                "expressionType": "SIMPLE",
+                                "column": {"column_name": "Новые клиенты"},
+                                "aggregate": "SUM",
+                            }
+                        ],
+                        "y_axis_format": "SMART_NUMBER",
+                    },
+                ),
+            ),
+        ]
+
+        # Ссылки на колонки проверяются по индексу до первого POST
+        check_charts(index, charts)
+        for dataset_id, chart in charts:
+            await create_chart(client, dataset_id=dataset_id, **chart)
 
         print("\n🎉 Оба графика успешно созданы!")
         print(f"👉 Перейди в Superset: {BASE_URL}/chart/list/")
         print("   и найди графики:")
         print("   • 'Выручка по странам'")
         print("   • 'Новые клиенты по месяцам'")
+        return True
+
 
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
     except Exception as e:
         print(f"\n❌ КРИТИЧЕСКАЯ ОШИБКА: {e}")
@@ -0,0 +1,360 @@
+"""Единая точка входа: `auto_super export|import|sync|delete|create|spec|...`.
+
+Модуль импортирует только стандартную библиотеку: зависимости подкоманд
+(requests, yaml, ...) подгружаются внутри обработчиков. Поэтому лёгкие
+команды (`config`, `--help`) стартуют за десятки миллисекунд — это
+проверяет `auto_super bench`.
+"""
+
+import argparse
+import os
+import sys
+
+# Модули, которые не должен подгружать импорт auto_super.cli
+HEAVY_MODULES = ("requests", "yaml", "zipfile", "sqlite3", "asyncio")
+STARTUP_BUDGET_MS = 100
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_async(coro):
+    import asyncio
+
+    return asyncio.run(coro)
+
+
+# ========================
+# Подкоманды
+# ========================
+def cmd_export(args) -> int:
+    from superset_restore import export_superset_artifacts
+
+    return 0 if run_async(export_superset_artifacts.main(args)) else 1
+
+
+def cmd_import(args) -> int:
+    from superset_restore import import_superset_artifacts
+
+    return 0 if run_async(import_superset_artifacts.main(args)) else 1
+
+
+def cmd_delete(args) -> int:
+    from auto_super import delete_superset
+
+    if not args.yes and not delete_superset.confirm_deletion():
+        return 1
+    return 0 if run_async(delete_superset.cleanup_superset()) else 1
+
+
+CREATE_TARGETS = {
+    "datasets": "auto_super.datasets_create",
+    "dashboard": "auto_super.index",
+    "big-number": "auto_super.charts.big_number",
+    "two-charts": "auto_super.charts.create_two_charts",
+}
+
+
+def cmd_create(args) -> int:
+    import importlib
+
+    module = importlib.import_module(CREATE_TARGETS[args.target])
+    return 0 if run_async(module.main()) else 1
+
+
+def cmd_spec(args) -> int:
+    from auto_super import registry, spec
+
+    dashboard_spec = spec.load_spec(args.file)
+    # Графики проверяются по кэшу типов визуализаций, если он есть
+    errors = spec.validate(dashboard_spec, registry.cached())
+    if not errors:
+        # Одинаковые uuid со встроенными спеками перезаписали бы их объекты
+        errors = spec.bundled_conflicts(dashboard_spec, args.file)
+    if errors:
+        print(f"❌ Ошибки в спеке {args.file}:")
+        for error in errors:
+            print(f"  • {error}")
+        return 1
+    print(f"✅ Спека корректна: {spec.summary(dashboard_spec)}")
+    if args.rollup:
+        from auto_super import config
+
+        schema = args.rollup_schema or config.PG_SCHEMA
+        switched = spec.use_rollups(dashboard_spec, schema)
+        print(f"🔄 Из агрегатов схемы {schema}: {', '.join(switched)}")
+    if args.check:
+        return 0
+
+    async def upload():
+        from auto_super import bundle
+        from auto_super.client import SupersetClient
+
+        async with SupersetClient() as client:
+            files = await spec.build(
+                client, dashboard_spec, check_sql=not args.no_sql_check
+            )
+            if args.out:
+                with open(args.out, "wb") as f:
+                    f.write(bundle.build_zip(files))
+                print(f"💾 Бандл сохранён в {args.out}")
+                return
+            await bundle.import_files(client, files)
+            print(f"✅ Спека загружена одним импортом: {len(files)} файлов")
+            return await spec.refresh_columns(client, dashboard_spec)
+
+    return 1 if run_async(upload()) else 0
+
+
+def cmd_matview(args) -> int:
+    from auto_super import matview
+
+    return run_async(matview.main(args))
+
+
+# Скрипты, которые сами описывают опции своей подкоманды
+SCRIPT_OPTIONS = {
+    "export": "superset_restore.export_superset_artifacts",
+    "import": "superset_restore.import_superset_artifacts",
+    "matview": "auto_super.matview",
+    "rollup": "auto_super.rollup",
+    "bench-sql": "auto_super.sqlbench",
+    "scale": "auto_super.scale",
+    "load": "auto_super.loader",
+}
+
+
+def cmd_rollup(args) -> int:
+    from auto_super import rollup
+
+    return run_async(rollup.main(args))
+
+
+def cmd_bench_sql(args) -> int:
+    from auto_super import sqlbench
+
+    return run_async(sqlbench.main(args))
+
+
+def cmd_scale(args) -> int:
+    from auto_super import scale
+
+    return run_async(scale.main(args))
+
+
+def cmd_load(args) -> int:
+    from auto_super import loader
+
+    return run_async(loader.main(args))
+
+
+def cmd_config(args) -> int:
+    from auto_super import config
+
+    print(f"url:         {config.BASE_URL}")
+    print(f"username:    {config.USERNAME}")
+    print(f"token_cache: {config.TOKEN_CACHE}")
+    print(f"concurrency: {config.CONCURRENCY}")
+    return 0
+
+
+def cmd_bench(args) -> int:
+    """Холодный старт `auto_super config` и отсутствие тяжёлых импортов"""
+    import statistics
+    import subprocess
+    import time
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (REPO_ROOT, env.get("PYTHONPATH")) if p
+    )
+
+    def median_ms(command):
+        times = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            subprocess.run(
+                command, env=env, stdout=subprocess.DEVNULL, check=True
+            )
+            times.append(time.perf_counter() - started)
+        return statistics.median(times) * 1000
+
+    python_ms = median_ms([sys.executable, "-c", "pass"])
+    cli_ms = median_ms([sys.executable, "-m", "auto_super", "config"])
+    loaded = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys; base = set(sys.modules); import auto_super.cli; "
+            f"print(' '.join(m for m in {HEAVY_MODULES!r} "
+            "if m in sys.modules and m not in base))",
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+
+    print(f"⏱️ python -c pass:        {python_ms:6.1f} мс")
+    print(
+        f"⏱️ auto_super config:     {cli_ms:6.1f} мс "
+        f"(бюджет {args.budget:.0f} мс)"
+    )
+    ok = cli_ms <= args.budget and not loaded
+    if loaded:
+        print(f"❌ auto_super.cli тянет тяжёлые модули: {', '.join(loaded)}")
+    print("✅ Старт в пределах бюджета" if ok else "❌ Старт медленнее бюджета")
+    return 0 if ok else 1
+
+
+# ========================
+# Разбор аргументов
+# ========================
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="auto_super", description="Автоматизация Superset"
+    )
+    parser.add_argument(
+        "--config", help="INI-файл конфигурации (секция [superset])"
+    )
+    parser.add_argument("--url", help="адрес Superset")
+    parser.add_argument("--username", help="пользователь Superset")
+    parser.add_argument("--password", help="пароль Superset")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    # Опции export/import/sync/matview/rollup (и --help) разбирают скрипты
+    export = commands.add_parser(
+        "export", help="экспорт артефактов", add_help=False
+    )
+    export.set_defaults(handler=cmd_export, options="export")
+
+    import_ = commands.add_parser(
+        "import", help="импорт артефактов", add_help=False
+    )
+    import_.set_defaults(handler=cmd_import, options="import")
+
+    sync = commands.add_parser(
+        "sync",
+        help="импорт только изменений (с --plan — только план)",
+        add_help=False,
+    )
+    sync.set_defaults(handler=cmd_import, options="import", sync=True)
+
+    delete = commands.add_parser("delete", help="удалить все объекты")
+    delete.add_argument(
+        "--yes", action="store_true", help="не спрашивать подтверждение"
+    )
+    delete.set_defaults(handler=cmd_delete)
+
+    create = commands.add_parser("create", help="создать объекты в Superset")
+    create.add_argument("target", choices=sorted(CREATE_TARGETS))
+    create.set_defaults(handler=cmd_create)
+
+    spec = commands.add_parser(
+        "spec", help="загрузить декларативную спеку дашборда"
+    )
+    spec.add_argument("file", help="YAML/JSON со спекой")
+    spec.add_argument(
+        "--check", action="store_true", help="только проверить, без Superset"
+    )
+    spec.add_argument("--out", help="сохранить бандл в ZIP вместо импорта")
+    spec.add_argument(
+        "--no-sql-check",
+        action="store_true",
+        help="не проверять SQL датасетов через EXPLAIN",
+    )
+    spec.add_argument(
+        "--rollup",
+        action="store_true",
+        help="датасеты с rollup_sql — из агрегатов (auto_super rollup)",
+    )
+    spec.add_argument(
+        "--rollup-schema", help="схема агрегатов (SUPERSET_PG_SCHEMA)"
+    )
+    spec.set_defaults(handler=cmd_spec)
+
+    matview = commands.add_parser(
+        "matview",
+        help="материализованные представления для датасетов спеки",
+        add_help=False,
+    )
+    matview.set_defaults(handler=cmd_matview, options="matview")
+
+    rollup = commands.add_parser(
+        "rollup", help="инкрементальные помесячные агрегаты", add_help=False
+    )
+    rollup.set_defaults(handler=cmd_rollup, options="rollup")
+
+    scale = commands.add_parser(
+        "scale",
+        help="синтетически увеличить данные Chinook (COPY)",
+        add_help=False,
+    )
+    scale.set_defaults(handler=cmd_scale, options="scale")
+
+    load = commands.add_parser(
+        "load", help="загрузить дамп Chinook через COPY", add_help=False
+    )
+    load.set_defaults(handler=cmd_load, options="load")
+
+    config = commands.add_parser("config", help="показать конфигурацию")
+    config.set_defaults(handler=cmd_config)
+
+    bench = commands.add_parser("bench", help="замер холодного старта CLI")
+    bench.add_argument("--runs", type=int, default=10)
+    bench.add_argument("--budget", type=float, default=STARTUP_BUDGET_MS)
+    bench.set_defaults(handler=cmd_bench)
+
+    bench_sql = commands.add_parser(
+        "bench-sql",
+        help="замер SQL датасетов (EXPLAIN ANALYZE) с порогом регрессии",
+        add_help=False,
+    )
+    bench_sql.set_defaults(handler=cmd_bench_sql, options="bench-sql")
+    return parser
+
+
+def add_script_options(args, argv) -> argparse.Namespace:
+    """Опции подкоманд из SCRIPT_OPTIONS берутся из самих скриптов — но
+    только для выбранной подкоманды, чтобы не импортировать их заранее"""
+    import importlib
+
+    add_arguments = importlib.import_module(
+        SCRIPT_OPTIONS[args.options]
+    ).add_arguments
+    sub = argparse.ArgumentParser(prog=f"auto_super {args.command}")
+    add_arguments(sub)
+    options = sub.parse_args(argv)
+    for key, value in vars(options).items():
+        if key == "sync" and getattr(args, "sync", False):
+            continue
+        setattr(args, key, value)
+    return args
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+
+    # Переопределения до ленивого импорта auto_super.config
+    if args.config:
+        os.environ["AUTO_SUPER_CONFIG"] = args.config
+    for name in ("url", "username", "password"):
+        if getattr(args, name):
+            os.environ[f"SUPERSET_{name.upper()}"] = getattr(args, name)
+
+    if getattr(args, "options", None):
+        args = add_script_options(args, rest)
+    elif rest:
+        parser.error(f"неизвестные аргументы: {' '.join(rest)}")
+
+    try:
+        return args.handler(args)
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        print(f"\n❌ КРИТИЧЕСКАЯ ОШИБКА: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
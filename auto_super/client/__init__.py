@@ -0,0 +1,17 @@
+"""Общий асинхронный клиент Superset REST API.
+
+`SupersetClient` импортируется лениво: `requests` тянет за собой ~100 мс
+импортов, а лёгким модулям (errors, rison, auth) он не нужен.
+"""
+
+from auto_super.client.errors import SupersetAPIError
+
+__all__ = ["SupersetAPIError", "SupersetClient"]
+
+
+def __getattr__(name):
+    if name == "SupersetClient":
+        from auto_super.client.superset import SupersetClient
+
+        return SupersetClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
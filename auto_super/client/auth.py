@@ -0,0 +1,45 @@
+"""Кэш токенов Superset на диске.
+
+Access/refresh токены хранятся в JSON с правами 0600 (каталог — 0700),
+по ключу `<base_url>|<username>`. Короткий запуск скрипта берёт токен из
+кэша и не делает /api/v1/security/login с проверкой пароля; протухший
+access токен обновляется через /api/v1/security/refresh.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class TokenCache:
+    def __init__(self, path: str):
+        self.path = Path(path).expanduser()
+
+    @staticmethod
+    def key(base_url: str, username: str) -> str:
+        return f"{base_url.rstrip('/')}|{username}"
+
+    def _read_all(self) -> Dict[str, Dict[str, str]]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def get(self, key: str) -> Optional[Dict[str, str]]:
+        return self._read_all().get(key)
+
+    def put(self, key: str, tokens: Dict[str, str]) -> None:
+        entries = self._read_all()
+        entries[key] = {**entries.get(key, {}), **tokens}
+        self._write(entries)
+
+    def _write(self, entries: Dict[str, Dict[str, str]]) -> None:
+        """Записать атомарно и только для владельца файла"""
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp, self.path)
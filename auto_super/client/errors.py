@@ -0,0 +1,9 @@
+class SupersetAPIError(Exception):
+    """Ошибка ответа Superset API (неожиданный HTTP-статус)"""
+
+    def __init__(self, method: str, url: str, status: int, text: str):
+        self.method = method
+        self.url = url
+        self.status = status
+        self.text = text
+        super().__init__(f"❌ {method} {url}: {status} — {text[:500]}")
@@ -0,0 +1,111 @@
+"""Адаптивное ограничение числа одновременных запросов (AIMD).
+
+Пока задержки и доля ошибок в норме, лимит растёт на 1 за каждое окно
+успешных ответов (additive increase). На 429/5xx/таймаут лимит делится
+пополам (multiplicative decrease), а новые запросы ставятся на паузу —
+на `Retry-After` или на экспоненциально растущую задержку.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class AdaptiveLimiter:
+    """AIMD-контроллер конкуренции для клиента Superset API"""
+
+    def __init__(
+        self,
+        maximum: int,
+        initial: int = 4,
+        minimum: int = 1,
+        latency_target: float = 2.0,
+        window: int = 20,
+        max_error_rate: float = 0.05,
+        base_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.latency_target = latency_target
+        self.window = window
+        self.max_error_rate = max_error_rate
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._inflight = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._latencies: deque = deque(maxlen=window)
+        self._outcomes: deque = deque(maxlen=window)
+        self._since_change = 0
+        self._overloads = 0
+        self._paused_until = 0.0
+        # Не уменьшать лимит чаще, чем раз в период ответа сервера
+        self._cooldown_until = 0.0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Занять место среди одновременных запросов"""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self._inflight < int(self.limit)
+            )
+            self._inflight += 1
+        try:
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield
+        finally:
+            async with self._condition:
+                self._inflight -= 1
+                self._condition.notify_all()
+
+    def on_success(self, latency: float) -> None:
+        self._latencies.append(latency)
+        self._outcomes.append(True)
+        self._overloads = 0
+        self._since_change += 1
+        if self._since_change < self.window:
+            return
+        self._since_change = 0
+        errors = self._outcomes.count(False) / len(self._outcomes)
+        if percentile(self._latencies, 0.95) > self.latency_target:
+            self.limit = max(self.minimum, self.limit * 0.8)
+        elif errors <= self.max_error_rate:
+            self.limit = min(self.maximum, self.limit + 1)
+
+    def on_overload(self, retry_after: Optional[float] = None) -> float:
+        """Сервер перегружен: уменьшить лимит; вернуть паузу в секундах"""
+        now = time.monotonic()
+        self._outcomes.append(False)
+        self._overloads += 1
+        self._since_change = 0
+        if now >= self._cooldown_until:
+            self.limit = max(self.minimum, self.limit / 2)
+            self._cooldown_until = now + percentile(self._latencies, 0.5)
+        backoff = min(
+            self.max_backoff, self.base_backoff * 2 ** (self._overloads - 1)
+        )
+        pause = retry_after if retry_after is not None else backoff
+        self._paused_until = max(self._paused_until, now + pause)
+        return pause
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "limit": int(self.limit),
+            "inflight": self._inflight,
+            "p95": percentile(self._latencies, 0.95),
+        }
@@ -0,0 +1,40 @@
+"""Минимальный кодировщик Rison для параметра `q` Superset API.
+
+Superset (Flask-AppBuilder) разбирает `q` как Rison, например
+`(page:0,page_size:100)` или `!(1,2,3)` для списка id.
+"""
+
+import re
+from typing import Any
+
+# Символы, которые можно оставить в строке без кавычек
+_ID_RE = re.compile(r"^[^\s'!:(),*@$\"\-0-9][^\s'!:(),*@$\"]*$")
+
+
+def _dumps_str(value: str) -> str:
+    if value and _ID_RE.match(value):
+        return value
+    escaped = value.replace("!", "!!").replace("'", "!'")
+    return f"'{escaped}'"
+
+
+def dumps(value: Any) -> str:
+    """Сериализовать Python-значение в строку Rison"""
+    if value is None:
+        return "!n"
+    if value is True:
+        return "!t"
+    if value is False:
+        return "!f"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return _dumps_str(value)
+    if isinstance(value, dict):
+        items = ",".join(
+            f"{_dumps_str(str(k))}:{dumps(v)}" for k, v in value.items()
+        )
+        return f"({items})"
+    if isinstance(value, (list, tuple, set)):
+        return "!(" + ",".join(dumps(v) for v in value) + ")"
+    raise TypeError(f"Rison: неподдерживаемый тип {type(value).__name__}")
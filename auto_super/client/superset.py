@@ -0,0 +1,544 @@
+import asyncio
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from auto_super import config
+from auto_super.client import rison
+from auto_super.client.auth import TokenCache
+from auto_super.client.errors import SupersetAPIError
+from auto_super.client.ratelimit import AdaptiveLimiter
+
+# Максимальный page_size, который принимает Superset (FAB_API_MAX_PAGE_SIZE)
+MAX_PAGE_SIZE = 100
+# Статусы перегрузки: лимит конкуренции уменьшается, запрос повторяется
+OVERLOAD_STATUSES = (429, 502, 503, 504)
+# Методы, которые безопасно повторять после 5xx/таймаута
+IDEMPOTENT_METHODS = ("GET", "PUT", "DELETE")
+LOGIN_PATH = "/api/v1/security/login"
+REFRESH_PATH = "/api/v1/security/refresh"
+# version_string в bootstrap-данных HTML-страниц (кавычки экранированы)
+VERSION_PATTERN = re.compile(
+    r'version_string(?:"|&#34;|&quot;)\s*:\s*(?:"|&#34;|&quot;)([^"&]+)'
+)
+
+
+class SupersetClient:
+    """Асинхронный клиент Superset REST API.
+
+    Все запросы идут через один `requests.Session` с пулом keep-alive
+    соединений; блокирующие вызовы выполняются в пуле потоков, а число
+    одновременных запросов регулирует `AdaptiveLimiter` (до `concurrency`).
+    Поэтому десятки вызовов можно запускать разом через `asyncio.gather`.
+
+    Авторизация ленивая: токен берётся из кэша `token_cache` или
+    запрашивается при первом реальном запросе; на 401 access токен
+    обновляется через refresh, а если и он протух — новый логин.
+
+        async with SupersetClient() as client:
+            charts = await asyncio.gather(*(client.get_chart(i) for i in ids))
+    """
+
+    def __init__(
+        self,
+        base_url: str = config.BASE_URL,
+        username: str = config.USERNAME,
+        password: str = config.PASSWORD,
+        concurrency: int = config.CONCURRENCY,
+        timeout: float = config.TIMEOUT,
+        max_retries: int = config.MAX_RETRIES,
+        token_cache: Optional[str] = config.TOKEN_CACHE,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=concurrency, max_retries=0
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="superset-api"
+        )
+        self.limiter = AdaptiveLimiter(
+            maximum=concurrency,
+            initial=config.INITIAL_CONCURRENCY,
+            latency_target=config.LATENCY_TARGET,
+        )
+
+        self.tokens = TokenCache(token_cache) if token_cache else None
+        self._token_key = TokenCache.key(self.base_url, username)
+        self._access_token: Optional[str] = None
+        self._refresh_token: Optional[str] = None
+        self._auth_lock: Optional[asyncio.Lock] = None
+
+    # ========================
+    # Жизненный цикл
+    # ========================
+    async def __aenter__(self) -> "SupersetClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    # ========================
+    # Авторизация
+    # ========================
+    def _set_tokens(self, access: str, refresh: Optional[str] = None) -> None:
+        self._access_token = access
+        if refresh:
+            self._refresh_token = refresh
+        self.session.headers.update({"Authorization": f"Bearer {access}"})
+        if self.tokens:
+            tokens = {"access_token": access}
+            if refresh:
+                tokens["refresh_token"] = refresh
+            self.tokens.put(self._token_key, tokens)
+
+    async def login(self) -> None:
+        print("🔐 Авторизуемся в Superset...")
+        payload = {
+            "username": self.username,
+            "password": self.password,
+            "provider": "db",
+            "refresh": True,
+        }
+        response = await self._send("POST", LOGIN_PATH, json=payload)
+        if response.status_code != 200:
+            raise Exception(f"❌ Ошибка авторизации: {response.text}")
+        data = response.json()
+        self._set_tokens(data["access_token"], data.get("refresh_token"))
+        print("✅ Авторизация прошла успешно")
+
+    async def refresh(self) -> bool:
+        """Новый access токен по refresh токену; False — нужен логин"""
+        if not self._refresh_token:
+            return False
+        response = await self._send(
+            "POST",
+            REFRESH_PATH,
+            headers={"Authorization": f"Bearer {self._refresh_token}"},
+        )
+        if response.status_code != 200:
+            return False
+        self._set_tokens(response.json()["access_token"])
+        return True
+
+    async def ensure_auth(self, expired: Optional[str] = None) -> None:
+        """Получить токен при первом запросе или заменить протухший.
+
+        `expired` — токен, на который сервер ответил 401: если его уже
+        заменил параллельный запрос, повторно ничего не делаем.
+        """
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+        async with self._auth_lock:
+            if expired is None:
+                if self._access_token:
+                    return
+                cached = self.tokens and self.tokens.get(self._token_key)
+                if cached and cached.get("access_token"):
+                    self._set_tokens(
+                        cached["access_token"], cached.get("refresh_token")
+                    )
+                    return
+                await self.login()
+                return
+            if self._access_token != expired:
+                return
+            if not await self.refresh():
+                await self.login()
+
+    # ========================
+    # Низкоуровневые запросы
+    # ========================
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    async def _attempt(
+        self, method: str, path: str, **kwargs
+    ) -> requests.Response:
+        loop = asyncio.get_running_loop()
+        async with self.limiter.slot():
+            started = time.monotonic()
+            response = await loop.run_in_executor(
+                self._executor,
+                lambda: self.session.request(method, self.url(path), **kwargs),
+            )
+        if response.status_code not in OVERLOAD_STATUSES and (
+            response.status_code < 500
+        ):
+            self.limiter.on_success(time.monotonic() - started)
+        return response
+
+    async def _send(
+        self, method: str, path: str, **kwargs
+    ) -> requests.Response:
+        """Запрос с адаптивным лимитом и повторами при перегрузке.
+
+        429 повторяется всегда (сервер запрос не обработал), 502/503/504 и
+        таймауты — только для идемпотентных методов.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        retryable = method.upper() in IDEMPOTENT_METHODS
+        for attempt in range(self.max_retries + 1):
+            last = attempt == self.max_retries
+            try:
+                response = await self._attempt(method, path, **kwargs)
+            except (requests.Timeout, requests.ConnectionError):
+                self.limiter.on_overload()
+                if last or not retryable:
+                    raise
+                continue
+
+            status = response.status_code
+            if status >= 500 or status == 429:
+                self.limiter.on_overload(retry_after(response))
+                if not last and status in OVERLOAD_STATUSES and (
+                    retryable or status == 429
+                ):
+                    continue
+            return response
+        return response
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        q: Any = None,
+        expected: Sequence[int] = (200,),
+        **kwargs,
+    ) -> requests.Response:
+        """Выполнить запрос; `q` кодируется в Rison, неожиданный статус —
+        `SupersetAPIError`"""
+        if q is not None:
+            params = dict(kwargs.get("params") or {})
+            params["q"] = rison.dumps(q)
+            kwargs["params"] = params
+        await self.ensure_auth()
+        token = self._access_token
+        response = await self._send(method, path, **kwargs)
+        if auth_failed(response):
+            await self.ensure_auth(expired=token)
+            response = await self._send(method, path, **kwargs)
+        if response.status_code not in expected:
+            raise SupersetAPIError(
+                method, path, response.status_code, response.text
+            )
+        return response
+
+    async def get_json(self, path: str, q: Any = None) -> Dict[str, Any]:
+        response = await self.request("GET", path, q=q)
+        return response.json()
+
+    # ========================
+    # Общие CRUD-операции над ресурсами /api/v1/<resource>/
+    # ========================
+    async def _list(self, resource: str, q: Any = None) -> Dict[str, Any]:
+        return await self.get_json(f"/api/v1/{resource}/", q=q)
+
+    async def iter_all(
+        self,
+        resource: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Dict[str, Any]]] = None,
+        page_size: int = MAX_PAGE_SIZE,
+        order_column: Optional[str] = None,
+        order_direction: str = "asc",
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Все объекты ресурса постранично.
+
+        Страница 0 сообщает `count`; остальные страницы запрашиваются
+        одновременно, а строки отдаются в порядке страниц. `columns`
+        ограничивает поля ответа — для списков id это на порядок меньше
+        данных, чем полные строки.
+        """
+        query: Dict[str, Any] = {"page": 0, "page_size": page_size}
+        if columns:
+            query["columns"] = columns
+        if filters:
+            query["filters"] = filters
+        if order_column:
+            query["order_column"] = order_column
+            query["order_direction"] = order_direction
+
+        first = await self._list(resource, query)
+        for row in first["result"]:
+            yield row
+
+        pages = -(-first["count"] // page_size)
+        tasks = [
+            asyncio.ensure_future(self._list(resource, {**query, "page": n}))
+            for n in range(1, pages)
+        ]
+        try:
+            for task in tasks:
+                for row in (await task)["result"]:
+                    yield row
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def list_all(self, resource: str, **kwargs) -> List[Dict[str, Any]]:
+        """Список всех объектов ресурса (см. `iter_all`)"""
+        return [row async for row in self.iter_all(resource, **kwargs)]
+
+    async def _get(self, resource: str, object_id: int) -> Dict[str, Any]:
+        data = await self.get_json(f"/api/v1/{resource}/{object_id}")
+        return data["result"]
+
+    async def _create(self, resource: str, payload: Dict[str, Any]) -> int:
+        response = await self.request(
+            "POST", f"/api/v1/{resource}/", json=payload, expected=(201,)
+        )
+        return response.json()["id"]
+
+    async def _update(
+        self, resource: str, object_id: int, payload: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        response = await self.request(
+            "PUT", f"/api/v1/{resource}/{object_id}", json=payload
+        )
+        return response.json()
+
+    async def _delete(self, resource: str, object_id: int) -> None:
+        await self.request("DELETE", f"/api/v1/{resource}/{object_id}")
+
+    async def bulk_delete(self, resource: str, ids: List[int]) -> None:
+        """Массовое удаление: DELETE /api/v1/<resource>/?q=!(id1,id2,...)"""
+        await self.request("DELETE", f"/api/v1/{resource}/", q=list(ids))
+
+    # ========================
+    # Базы данных
+    # ========================
+    async def list_databases(self, q: Any = None) -> Dict[str, Any]:
+        return await self._list("database", q)
+
+    async def get_database(self, database_id: int) -> Dict[str, Any]:
+        return await self._get("database", database_id)
+
+    async def export_database(self, database_id: int) -> bytes:
+        """ZIP-архив с описанием подключения к БД"""
+        response = await self.request(
+            "GET", f"/api/v1/database/{database_id}/export/"
+        )
+        return response.content
+
+    # ========================
+    # Датасеты
+    # ========================
+    async def list_datasets(self, q: Any = None) -> Dict[str, Any]:
+        return await self._list("dataset", q)
+
+    async def get_dataset(self, dataset_id: int) -> Dict[str, Any]:
+        return await self._get("dataset", dataset_id)
+
+    async def create_dataset(self, payload: Dict[str, Any]) -> int:
+        return await self._create("dataset", payload)
+
+    async def update_dataset(
+        self, dataset_id: int, payload: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        return await self._update("dataset", dataset_id, payload)
+
+    async def delete_dataset(self, dataset_id: int) -> None:
+        await self._delete("dataset", dataset_id)
+
+    async def refresh_dataset(self, dataset_id: int) -> None:
+        """Перечитать колонки датасета из источника (PUT .../refresh)"""
+        await self.request("PUT", f"/api/v1/dataset/{dataset_id}/refresh")
+
+    async def find_dataset_id(self, table_name: str) -> Optional[int]:
+        """ID датасета по имени таблицы или None"""
+        data = await self.list_datasets(
+            {
+                "filters": [
+                    {"col": "table_name", "opr": "eq", "value": table_name}
+                ],
+                "columns": ["id"],
+            }
+        )
+        return data["result"][0]["id"] if data["count"] else None
+
+    async def dataset_ids_by_name(self) -> Dict[str, int]:
+        """table_name -> id всех датасетов одним списком"""
+        rows = await self.list_all("dataset", columns=["id", "table_name"])
+        return {row["table_name"]: row["id"] for row in rows}
+
+    # ========================
+    # Графики
+    # ========================
+    async def list_charts(self, q: Any = None) -> Dict[str, Any]:
+        return await self._list("chart", q)
+
+    async def get_chart(self, chart_id: int) -> Dict[str, Any]:
+        return await self._get("chart", chart_id)
+
+    async def create_chart(self, payload: Dict[str, Any]) -> int:
+        return await self._create("chart", payload)
+
+    async def update_chart(
+        self, chart_id: int, payload: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        return await self._update("chart", chart_id, payload)
+
+    async def delete_chart(self, chart_id: int) -> None:
+        await self._delete("chart", chart_id)
+
+    async def get_chart_info(self) -> Dict[str, Any]:
+        return await self.get_json("/api/v1/chart/_info")
+
+    async def server_version(self) -> Optional[str]:
+        """Версия Superset из страницы входа — небольшой HTML вместо
+        тяжёлого /api/v1/chart/_info; None, если версию не найти"""
+        try:
+            response = await self.request("GET", "/login/")
+        except SupersetAPIError:
+            return None
+        match = VERSION_PATTERN.search(response.text)
+        return match.group(1) if match else None
+
+    # ========================
+    # SQL Lab
+    # ========================
+    async def execute_sql(
+        self,
+        database_id: int,
+        sql: str,
+        schema: Optional[str] = None,
+        limit: int = 1,
+    ) -> Dict[str, Any]:
+        """Синхронно выполнить запрос через POST /api/v1/sqllab/execute/"""
+        payload = {
+            "database_id": database_id,
+            "sql": sql,
+            "schema": schema,
+            "runAsync": False,
+            "queryLimit": limit,
+            "select_as_cta": False,
+            "expand_data": False,
+            "tab": "auto_super",
+        }
+        response = await self.request(
+            "POST", "/api/v1/sqllab/execute/", json=payload
+        )
+        return response.json()
+
+    # ========================
+    # Дашборды
+    # ========================
+    async def list_dashboards(self, q: Any = None) -> Dict[str, Any]:
+        return await self._list("dashboard", q)
+
+    async def get_dashboard(self, dashboard_id: int) -> Dict[str, Any]:
+        return await self._get("dashboard", dashboard_id)
+
+    async def create_dashboard(self, payload: Dict[str, Any]) -> int:
+        return await self._create("dashboard", payload)
+
+    async def update_dashboard(
+        self, dashboard_id: int, payload: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        return await self._update("dashboard", dashboard_id, payload)
+
+    async def delete_dashboard(self, dashboard_id: int) -> None:
+        await self._delete("dashboard", dashboard_id)
+
+    async def find_dashboard_id(self, title: str) -> Optional[int]:
+        """ID дашборда по названию или None"""
+        data = await self.list_dashboards(
+            {
+                "filters": [
+                    {"col": "dashboard_title", "opr": "eq", "value": title}
+                ],
+                "columns": ["id"],
+            }
+        )
+        return data["result"][0]["id"] if data["count"] else None
+
+    # ========================
+    # Экспорт / импорт ZIP-архивов
+    # ========================
+    async def export_objects(self, resource: str, ids: List[int]) -> bytes:
+        """Нативный экспорт пачки объектов (ZIP): ?q=!(id1,id2,...)"""
+        response = await self.request(
+            "GET", f"/api/v1/{resource}/export/", q=list(ids)
+        )
+        return response.content
+
+    async def export_assets(self) -> bytes:
+        """Экспорт всех объектов одним архивом (Superset 2.1+)"""
+        response = await self.request("GET", "/api/v1/assets/export/")
+        return response.content
+
+    async def import_zip(
+        self,
+        resource: str,
+        zip_content: bytes,
+        overwrite: bool = True,
+        filename: str = "import.zip",
+    ) -> requests.Response:
+        """POST /api/v1/<resource>/import/ с ZIP-архивом"""
+        files = {
+            "file": (filename, zip_content, "application/zip"),
+            "overwrite": (None, "true" if overwrite else "false"),
+        }
+        return await self.request(
+            "POST",
+            f"/api/v1/{resource}/import/",
+            files=files,
+            expected=(200, 201),
+        )
+
+    async def import_assets(
+        self,
+        zip_content: bytes,
+        passwords: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        """POST /api/v1/assets/import/ — весь бандл одним запросом"""
+        files = {"bundle": ("bundle.zip", zip_content, "application/zip")}
+        if passwords:
+            files["passwords"] = (None, json.dumps(passwords))
+        return await self.request(
+            "POST", "/api/v1/assets/import/", files=files, expected=(200, 201)
+        )
+
+
+def auth_failed(response: requests.Response) -> bool:
+    """Токен протух или не подходит.
+
+    Flask-JWT-Extended отвечает 401 на истёкший токен и 422 с полем `msg`
+    на токен с чужой подписью (например, после смены SECRET_KEY).
+    """
+    if response.status_code == 401:
+        return True
+    if response.status_code != 422:
+        return False
+    try:
+        return "msg" in response.json()
+    except ValueError:
+        return False
+
+
+def retry_after(response: requests.Response) -> Optional[float]:
+    """Значение заголовка Retry-After в секундах (если это число)"""
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
@@ -0,0 +1,243 @@
+"""Колонки датасетов: обновление метаданных и проверка ссылок графиков.
+
+Виртуальный датасет, созданный через API или импортом бандла, не знает
+своих колонок, пока его не откроют в интерфейсе — первый рендер графика
+платит за это. После массового создания колонки всех датасетов
+перечитываются параллельно (PUT /api/v1/dataset/<id>/refresh), и сразу
+проверяется, что колонки, на которые ссылаются графики, существуют.
+
+`ColumnIndex` — локальный индекс колонок и типов всех датасетов
+(`config.COLUMN_CACHE`). Один список датасетов с `changed_on` показывает,
+какие изменились; их колонки и метрики дочитываются одним списком с
+вложенными полями (или по id, если изменились единицы или версия
+Superset не отдаёт вложенные поля в списке). После этого графики
+проверяются по индексу без единого запроса.
+"""
+
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from auto_super import cache, config
+from auto_super.client import SupersetAPIError
+
+# Агрегаты, которым нужна числовая колонка
+NUMERIC_AGGREGATES = ("SUM", "AVG")
+# GenericDataType в Superset: 0 — NUMERIC
+NUMERIC_TYPE = 0
+# Поля списка датасетов, из которых строится запись индекса
+INDEX_COLUMNS = [
+    "id",
+    "table_name",
+    "changed_on_utc",
+    "columns.column_name",
+    "columns.type_generic",
+    "metrics.metric_name",
+]
+# До стольких изменившихся датасетов дешевле дочитать их по id, чем
+# перечитать список всех датасетов с колонками
+BULK_MIN_STALE = 5
+
+
+def metric_columns(metric: Any) -> Set[str]:
+    """Колонка adhoc SIMPLE метрики (SQL и сохранённые метрики — пусто)"""
+    if isinstance(metric, dict) and metric.get("expressionType") == "SIMPLE":
+        column = metric.get("column") or {}
+        if column.get("column_name"):
+            return {column["column_name"]}
+    return set()
+
+
+def chart_columns(params: Dict[str, Any]) -> Set[str]:
+    """Колонки, на которые ссылается form_data графика"""
+    columns: Set[str] = set()
+    for metric in [params.get("metric")] + list(params.get("metrics") or []):
+        columns |= metric_columns(metric)
+    for field in ("groupby", "all_columns", "columns"):
+        columns |= {c for c in params.get(field) or [] if isinstance(c, str)}
+    if isinstance(params.get("x_axis"), str):
+        columns.add(params["x_axis"])
+    return columns
+
+
+def missing_columns(
+    expected: Iterable[str], present: Iterable[str]
+) -> List[str]:
+    present = set(present)
+    return sorted(c for c in expected if c not in present)
+
+
+async def refresh_one(client, dataset_id: int) -> Dict[str, Any]:
+    """Обновить колонки датасета и вернуть его с новыми колонками"""
+    await client.refresh_dataset(dataset_id)
+    return await client.get_dataset(dataset_id)
+
+
+async def refresh_and_verify(
+    client,
+    dataset_ids: Dict[str, int],
+    expected: Optional[Dict[str, Set[str]]] = None,
+) -> Dict[str, str]:
+    """Параллельно обновить колонки датасетов `имя -> id` и сверить их с
+    ожидаемыми; вернуть имя -> описание проблемы"""
+    expected = expected or {}
+    print(f"🔄 Обновляем колонки {len(dataset_ids)} датасетов...")
+    names = list(dataset_ids)
+    results = await asyncio.gather(
+        *(refresh_one(client, dataset_ids[name]) for name in names),
+        return_exceptions=True,
+    )
+
+    problems = {}
+    for name, result in zip(names, results):
+        if isinstance(result, SupersetAPIError):
+            problems[name] = f"refresh: {result.status} — {result.text[:200]}"
+            continue
+        if isinstance(result, Exception):
+            raise result
+        present = [c["column_name"] for c in result.get("columns") or []]
+        missing = missing_columns(expected.get(name, ()), present)
+        if missing:
+            problems[name] = f"нет колонок: {', '.join(missing)}"
+
+    if problems:
+        print(f"❌ Проблемы с колонками: {len(problems)}/{len(names)}")
+        for name, problem in problems.items():
+            print(f"  • {name}: {problem}")
+    else:
+        print(f"✅ Колонки {len(names)} датасетов обновлены и сверены")
+    return problems
+
+
+# ========================
+# Индекс колонок датасетов
+# ========================
+class ColumnIndex:
+    """id датасета -> table_name, changed_on, колонки (имя -> тип) и
+    сохранённые метрики"""
+
+    def __init__(self, datasets: Optional[Dict[int, Dict[str, Any]]] = None):
+        self.datasets = datasets or {}
+
+    @staticmethod
+    def entry(dataset: Dict[str, Any], changed_on: Any) -> Dict[str, Any]:
+        return {
+            "table_name": dataset.get("table_name"),
+            "changed_on": changed_on,
+            "columns": {
+                c["column_name"]: c.get("type_generic")
+                for c in dataset.get("columns") or []
+            },
+            "metrics": [
+                m["metric_name"] for m in dataset.get("metrics") or []
+            ],
+        }
+
+    @staticmethod
+    async def fetch_bulk(client) -> Dict[int, Dict[str, Any]]:
+        """Колонки и метрики всех датасетов одним списком; датасеты, для
+        которых Superset не вернул вложенные поля, в результат не входят"""
+        try:
+            rows = await client.list_all("dataset", columns=INDEX_COLUMNS)
+        except SupersetAPIError as e:
+            print(f"⚠️ Список датасетов с колонками недоступен ({e.status})")
+            return {}
+        return {row["id"]: row for row in rows if "columns" in row}
+
+    @classmethod
+    async def load(
+        cls,
+        client,
+        path: Optional[str] = config.COLUMN_CACHE,
+    ) -> "ColumnIndex":
+        """Индекс из кэша, дополненный датасетами, изменившимися с
+        прошлого раза (по changed_on из одного списка)"""
+        cached = cache.read_json(path) if path else {}
+        entries = cached.get(client.base_url, {})
+        rows = await client.list_all(
+            "dataset", columns=["id", "table_name", "changed_on_utc"]
+        )
+
+        def fresh(row):
+            changed_on = row.get("changed_on_utc")
+            entry = entries.get(str(row["id"])) or {}
+            return bool(changed_on) and entry.get("changed_on") == changed_on
+
+        datasets = {
+            row["id"]: entries[str(row["id"])] for row in rows if fresh(row)
+        }
+        stale = [row for row in rows if not fresh(row)]
+        bulk = {}
+        if len(stale) > BULK_MIN_STALE:
+            bulk = await cls.fetch_bulk(client)
+        missing = [row for row in stale if row["id"] not in bulk]
+        fetched = await asyncio.gather(
+            *(client.get_dataset(row["id"]) for row in missing)
+        )
+        bulk.update({row["id"]: ds for row, ds in zip(missing, fetched)})
+        for row in stale:
+            datasets[row["id"]] = cls.entry(
+                bulk[row["id"]], row.get("changed_on_utc")
+            )
+        print(
+            f"✅ Индекс колонок: {len(datasets)} датасетов "
+            f"(обновлено {len(stale)}, по id {len(missing)})"
+        )
+
+        if path:
+            cached[client.base_url] = {
+                str(k): v for k, v in datasets.items()
+            }
+            cache.write_json(path, cached)
+        return cls(datasets)
+
+    def dataset_id(self, table_name: str) -> Optional[int]:
+        for dataset_id, entry in self.datasets.items():
+            if entry["table_name"] == table_name:
+                return dataset_id
+        return None
+
+    def validate(self, dataset_id: int, params: Dict[str, Any]) -> List[str]:
+        """Ошибки ссылок form_data на колонки и метрики датасета"""
+        entry = self.datasets.get(dataset_id)
+        if entry is None:
+            return [f"датасет {dataset_id} не найден"]
+        columns = entry["columns"]
+        errors = [
+            f"нет колонки '{name}'"
+            for name in missing_columns(chart_columns(params), columns)
+        ]
+        metrics = [params.get("metric")] + list(params.get("metrics") or [])
+        for metric in metrics:
+            if isinstance(metric, str) and metric not in entry["metrics"]:
+                errors.append(f"нет метрики '{metric}'")
+            if not metric_columns(metric):
+                continue
+            (name,) = metric_columns(metric)
+            kind = columns.get(name)
+            if (
+                metric.get("aggregate") in NUMERIC_AGGREGATES
+                and kind is not None
+                and kind != NUMERIC_TYPE
+            ):
+                errors.append(
+                    f"{metric['aggregate']}({name}): колонка не числовая"
+                )
+        return errors
+
+
+def check_charts(
+    index: ColumnIndex, charts: List[Tuple[int, Dict[str, Any]]]
+) -> None:
+    """Проверить графики `(dataset_id, {chart_name, form_data, ...})` по
+    индексу; при ошибках — исключение до создания первого графика"""
+    errors = [
+        f"{chart['chart_name']}: {error}"
+        for dataset_id, chart in charts
+        for error in index.validate(dataset_id, chart["form_data"])
+    ]
+    if errors:
+        print(f"❌ Ошибки в графиках: {len(errors)}")
+        for error in errors:
+            print(f"  • {error}")
+        raise Exception("❌ Графики не прошли проверку по колонкам датасетов")
+    print(f"✅ Колонки {len(charts)} графиков проверены по индексу")
@@ -0,0 +1,62 @@
+"""Параллельное выполнение задач по уровням графа зависимостей."""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List
+
+OK = "ok"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+def levels(graph: Dict[Hashable, Iterable[Hashable]]) -> List[List[Hashable]]:
+    """Топологические уровни: в уровне N только узлы, все зависимости
+    которых лежат в уровнях < N. Зависимости вне графа игнорируются."""
+    deps = {
+        node: {d for d in node_deps if d in graph and d != node}
+        for node, node_deps in graph.items()
+    }
+    result = []
+    done = set()
+    while len(done) < len(deps):
+        level = [n for n, d in deps.items() if n not in done and d <= done]
+        if not level:
+            cycle = sorted(str(n) for n in deps if n not in done)
+            raise ValueError(f"❌ Цикл в зависимостях: {', '.join(cycle)}")
+        result.append(level)
+        done.update(level)
+    return result
+
+
+async def run(
+    graph: Dict[Hashable, Iterable[Hashable]],
+    action: Callable[[Hashable], Awaitable[bool]],
+    workers: int = 8,
+) -> Dict[Hashable, str]:
+    """Выполнить `action` для каждого узла графа.
+
+    Узлы одного уровня идут параллельно (не более `workers` сразу).
+    Если `action` вернул False или упал, все узлы, зависящие от него
+    (в том числе транзитивно), не запускаются и получают статус SKIPPED.
+    """
+    graph = {node: list(deps) for node, deps in graph.items()}
+    status: Dict[Hashable, str] = {}
+    semaphore = asyncio.Semaphore(workers)
+
+    async def guarded(node: Hashable) -> None:
+        async with semaphore:
+            try:
+                ok = await action(node)
+            except Exception as e:
+                print(f"❌ {node}: {e}")
+                ok = False
+        status[node] = OK if ok else FAILED
+
+    for level in levels(graph):
+        runnable = []
+        for node in level:
+            if any(status.get(d, OK) != OK for d in graph[node]):
+                status[node] = SKIPPED
+            else:
+                runnable.append(node)
+        await asyncio.gather(*(guarded(node) for node in runnable))
+    return status
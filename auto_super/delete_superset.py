@@ -1,82 +1,67 @@
-import requests
-import json
-import time
-
-# Конфигурация
-BASE_URL = "http://localhost:8088"
-USERNAME = "admin"
-PASSWORD = "admin"
-
-# Создаём сессию
-session = requests.Session()
-
-
-def login():
-    """Авторизация в Superset"""
-    print("🔐 Авторизуемся в Superset...")
-    url = f"{BASE_URL}/api/v1/security/login"
-    payload = {"username": USERNAME, "password": PASSWORD, "provider": "db"}
-    response = session.post(url, json=payload)
-    if response.status_code != 200:
-        raise Exception(f"❌ Ошибка авторизации: {response.text}")
-    token = response.json()["access_token"]
-    session.headers.update(
-        {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-        }
-    )
-    print("✅ Авторизация прошла успешно")
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from auto_super.client import SupersetAPIError, SupersetClient
 
+# Сколько id удаляется одним запросом DELETE /api/v1/<resource>/?q=!(...)
+BULK_CHUNK_SIZE = 100
 
-def get_all_dashboards():
+
+async def get_all_dashboards(client: SupersetClient):
     """Получить все дашборды"""
     print("📋 Получаем список всех дашбордов...")
-    url = f"{BASE_URL}/api/v1/dashboard/"
-    response = session.get(url)
-    if response.status_code != 200:
-        raise Exception(f"❌ Ошибка при получении дашбордов: {response.text}")
+    try:
+        dashboards = await client.list_all(
+            "dashboard", columns=["id", "dashboard_title"]
+        )
+    except SupersetAPIError as e:
+        raise Exception(f"❌ Ошибка при получении дашбордов: {e.text}")
 
-    dashboards = response.json().get("result", [])
     print(f"✅ Найдено дашбордов: {len(dashboards)}")
     return dashboards
 
 
-def get_all_charts():
+async def get_all_charts(client: SupersetClient):
     """Получить все графики"""
     print("📊 Получаем список всех графиков...")
-    url = f"{BASE_URL}/api/v1/chart/"
-    response = session.get(url)
-    if response.status_code != 200:
-        raise Exception(f"❌ Ошибка при получении графиков: {response.text}")
+    try:
+        charts = await client.list_all(
+            "chart", columns=["id", "slice_name"]
+        )
+    except SupersetAPIError as e:
+        raise Exception(f"❌ Ошибка при получении графиков: {e.text}")
 
-    charts = response.json().get("result", [])
     print(f"✅ Найдено графиков: {len(charts)}")
     return charts
 
 
-def get_all_datasets():
+async def get_all_datasets(client: SupersetClient):
     """Получить все датасеты (включая виртуальные)"""
     print("🗃️ Получаем список всех датасетов...")
-    url = f"{BASE_URL}/api/v1/dataset/"
-    response = session.get(url)
-    if response.status_code != 200:
-        raise Exception(f"❌ Ошибка при получении датасетов: {response.text}")
+    try:
+        datasets = await client.list_all(
+            "dataset", columns=["id", "table_name", "kind"]
+        )
+    except SupersetAPIError as e:
+        raise Exception(f"❌ Ошибка при получении датасетов: {e.text}")
 
-    datasets = response.json().get("result", [])
     print(f"✅ Найдено датасетов: {len(datasets)}")
     return datasets
 
 
-def get_all_virtual_datasets():
+async def get_all_virtual_datasets(client: SupersetClient):
     """Получить только виртуальные датасеты"""
     print("🔍 Получаем список виртуальных датасетов...")
-    url = f"{BASE_URL}/api/v1/dataset/"
-    response = session.get(url)
-    if response.status_code != 200:
-        raise Exception(f"❌ Ошибка при получении датасетов: {response.text}")
+    try:
+        all_datasets = await client.list_all(
+            "dataset", columns=["id", "table_name", "kind"]
+        )
+    except SupersetAPIError as e:
+        raise Exception(f"❌ Ошибка при получении датасетов: {e.text}")
 
-    all_datasets = response.json().get("result", [])
     virtual_datasets = [
         ds for ds in all_datasets if ds.get("kind") == "virtual"
     ]
@@ -84,98 +69,164 @@ def get_all_virtual_datasets():
     return virtual_datasets
 
 
-def delete_dashboard(dashboard_id, dashboard_name):
+async def delete_dashboard(
+    client: SupersetClient, dashboard_id, dashboard_name
+):
     """Удалить дашборд"""
-    url = f"{BASE_URL}/api/v1/dashboard/{dashboard_id}"
-    response = session.delete(url)
-    if response.status_code == 200:
-        print(f"🗑️ Удалён дашборд: {dashboard_name} (ID: {dashboard_id})")
-        return True
-    else:
-        print(
-            f"⚠️ Не удалось удалить дашборд {dashboard_name}: {response.text}"
-        )
+    try:
+        await client.delete_dashboard(dashboard_id)
+    except SupersetAPIError as e:
+        print(f"⚠️ Не удалось удалить дашборд {dashboard_name}: {e.text}")
         return False
+    print(f"🗑️ Удалён дашборд: {dashboard_name} (ID: {dashboard_id})")
+    return True
 
 
-def delete_chart(chart_id, chart_name):
+async def delete_chart(client: SupersetClient, chart_id, chart_name):
     """Удалить график"""
-    url = f"{BASE_URL}/api/v1/chart/{chart_id}"
-    response = session.delete(url)
-    if response.status_code == 200:
-        print(f"🗑️ Удалён график: {chart_name} (ID: {chart_id})")
-        return True
-    else:
-        print(f"⚠️ Не удалось удалить график {chart_name}: {response.text}")
+    try:
+        await client.delete_chart(chart_id)
+    except SupersetAPIError as e:
+        print(f"⚠️ Не удалось удалить график {chart_name}: {e.text}")
         return False
+    print(f"🗑️ Удалён график: {chart_name} (ID: {chart_id})")
+    return True
 
 
-def delete_dataset(dataset_id, dataset_name, is_virtual=False):
+async def delete_dataset(
+    client: SupersetClient, dataset_id, dataset_name, is_virtual=False
+):
     """Удалить датасет"""
-    url = f"{BASE_URL}/api/v1/dataset/{dataset_id}"
-    response = session.delete(url)
-    if response.status_code == 200:
-        type_str = "виртуальный датасет" if is_virtual else "датасет"
-        print(f"🗑️ Удалён {type_str}: {dataset_name} (ID: {dataset_id})")
-        return True
-    else:
-        print(f"⚠️ Не удалось удалить датасет {dataset_name}: {response.text}")
+    try:
+        await client.delete_dataset(dataset_id)
+    except SupersetAPIError as e:
+        print(f"⚠️ Не удалось удалить датасет {dataset_name}: {e.text}")
         return False
+    type_str = "виртуальный датасет" if is_virtual else "датасет"
+    print(f"🗑️ Удалён {type_str}: {dataset_name} (ID: {dataset_id})")
+    return True
+
 
+async def delete_chunk(
+    client: SupersetClient, resource: str, objects, delete_one
+):
+    """Удалить пачку одним запросом; при ошибке — по одному объекту.
 
-def cleanup_superset():
-    """Основная функция очистки"""
+    Возвращает список объектов, которые удалить не удалось.
+    """
+    ids = [obj["id"] for obj in objects]
+    try:
+        await client.bulk_delete(resource, ids)
+        print(f"🗑️ {resource}: удалено {len(ids)} (пачкой)")
+        return []
+    except SupersetAPIError as e:
+        print(
+            f"⚠️ {resource}: пачка из {len(ids)} не удалена ({e.status}), "
+            "удаляем по одному"
+        )
+    results = await asyncio.gather(*(delete_one(obj) for obj in objects))
+    return [obj for obj, ok in zip(objects, results) if not ok]
+
+
+async def bulk_cleanup(
+    client: SupersetClient, resource: str, objects, delete_one
+):
+    """Удалить все объекты ресурса пачками по BULK_CHUNK_SIZE"""
+    chunks = [
+        objects[i : i + BULK_CHUNK_SIZE]
+        for i in range(0, len(objects), BULK_CHUNK_SIZE)
+    ]
+    failed_parts = await asyncio.gather(
+        *(
+            delete_chunk(client, resource, chunk, delete_one)
+            for chunk in chunks
+        )
+    )
+    return [obj for part in failed_parts for obj in part]
+
+
+async def cleanup_superset():
+    """Основная функция очистки; True, если удалено всё"""
     try:
         # Авторизация
-        login()
-
-        # Удаляем дашборды
-        dashboards = get_all_dashboards()
-        dashboard_count = 0
-        for dashboard in dashboards:
-            if dashboard.get("id") and dashboard.get("dashboard_title"):
-                if delete_dashboard(
-                    dashboard["id"], dashboard["dashboard_title"]
-                ):
-                    dashboard_count += 1
-                time.sleep(0.1)
-
-        # Удаляем графики
-        charts = get_all_charts()
-        chart_count = 0
-        for chart in charts:
-            if chart.get("id") and chart.get("slice_name"):
-                if delete_chart(chart["id"], chart["slice_name"]):
-                    chart_count += 1
-                time.sleep(0.1)
-
-        # Удаляем ВСЕ датасеты (обычные и виртуальные)
-        datasets = get_all_datasets()
-        dataset_count = 0
-        virtual_count = 0
-
-        for dataset in datasets:
-            if dataset.get("id") and dataset.get("table_name"):
-                is_virtual = dataset.get("kind") == "virtual"
-                if delete_dataset(
-                    dataset["id"], dataset["table_name"], is_virtual
-                ):
-                    dataset_count += 1
-                    if is_virtual:
-                        virtual_count += 1
-                time.sleep(0.1)
+        async with SupersetClient() as client:
+            # Порядок важен: дашборды → графики → датасеты
+            dashboards = [
+                d
+                for d in await get_all_dashboards(client)
+                if d.get("id") and d.get("dashboard_title")
+            ]
+            failed_dashboards = await bulk_cleanup(
+                client,
+                "dashboard",
+                dashboards,
+                lambda d: delete_dashboard(
+                    client, d["id"], d["dashboard_title"]
+                ),
+            )
+
+            charts = [
+                c
+                for c in await get_all_charts(client)
+                if c.get("id") and c.get("slice_name")
+            ]
+            failed_charts = await bulk_cleanup(
+                client,
+                "chart",
+                charts,
+                lambda c: delete_chart(client, c["id"], c["slice_name"]),
+            )
+
+            # Удаляем ВСЕ датасеты (обычные и виртуальные)
+            datasets = [
+                d
+                for d in await get_all_datasets(client)
+                if d.get("id") and d.get("table_name")
+            ]
+            failed_datasets = await bulk_cleanup(
+                client,
+                "dataset",
+                datasets,
+                lambda d: delete_dataset(
+                    client,
+                    d["id"],
+                    d["table_name"],
+                    d.get("kind") == "virtual",
+                ),
+            )
+
+        failed_ids = {d["id"] for d in failed_datasets}
+        virtual_count = sum(
+            1
+            for d in datasets
+            if d.get("kind") == "virtual" and d["id"] not in failed_ids
+        )
 
         print("\n" + "=" * 50)
         print("🎯 Очистка завершена!")
-        print(f"🗑️ Удалено дашбордов: {dashboard_count}")
-        print(f"🗑️ Удалено графиков: {chart_count}")
         print(
-            f"🗑️ Удалено датасетов: {dataset_count} (из них виртуальных: {virtual_count})"
+            f"🗑️ Удалено дашбордов: {len(dashboards) - len(failed_dashboards)}"
+        )
+        print(f"🗑️ Удалено графиков: {len(charts) - len(failed_charts)}")
+        print(
+            f"🗑️ Удалено датасетов: {len(datasets) - len(failed_datasets)} (из них виртуальных: {virtual_count})"
         )
+        for title, failed, name_key in (
+            ("дашборды", failed_dashboards, "dashboard_title"),
+            ("графики", failed_charts, "slice_name"),
+            ("датасеты", failed_datasets, "table_name"),
+        ):
+            if failed:
+                names = ", ".join(
+                    f"{obj[name_key]} (ID: {obj['id']})" for obj in failed
+                )
+                print(f"⚠️ Не удалены {title}: {names}")
         print("=" * 50)
+        return not (failed_dashboards or failed_charts or failed_datasets)
 
     except Exception as e:
         print(f"❌ Критическая ошибка: {e}")
+        return False
 
 
 def confirm_deletion():
@@ -203,6 +254,7 @@ if __name__ == "__main__":
     print("=" * 40)
 
     if confirm_deletion():
-        cleanup_superset()
+        if not asyncio.run(cleanup_superset()):
+            sys.exit(1)
     else:
         print("Операция отменена")
@@ -1,38 +1,26 @@
-import requests
+import asyncio
 import json
 import os
-from datetime import datetime
-
-BASE_URL = "http://localhost:8088"
-USERNAME = "admin"
-PASSWORD = "admin"
-
-session = requests.Session()
+import sys
+from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-def login():
-    url = f"{BASE_URL}/api/v1/security/login"
-    payload = {"username": USERNAME, "password": PASSWORD, "provider": "db"}
-    response = session.post(url, json=payload)
-    token = response.json()["access_token"]
-    session.headers.update(
-        {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-        }
-    )
+from auto_super.client import SupersetClient
 
 
-def export_dashboards():
+async def export_dashboards(client: SupersetClient):
     """Экспорт всех дашбордов"""
     print("📤 Экспортируем дашборды...")
-    response = session.get(f"{BASE_URL}/api/v1/dashboard/")
-    dashboards = response.json().get("result", [])
+    dashboards = await client.list_all(
+        "dashboard", columns=["id", "dashboard_title"]
+    )
+    details = await asyncio.gather(
+        *(client.get_json(f"/api/v1/dashboard/{db['id']}") for db in dashboards)
+    )
 
-    for db in dashboards:
+    for db, db_detail in zip(dashboards, details):
         db_id = db["id"]
-        db_detail = session.get(f"{BASE_URL}/api/v1/dashboard/{db_id}").json()
-
         filename = (
             f"dashboard_{db_id}_{db['dashboard_title'].replace(' ', '_')}.json"
         )
@@ -41,18 +29,18 @@ def export_dashboards():
         print(f"💾 Сохранен дашборд: {db['dashboard_title']}")
 
 
-def export_charts():
+async def export_charts(client: SupersetClient):
     """Экспорт всех графиков"""
     print("📊 Экспортируем графики...")
-    response = session.get(f"{BASE_URL}/api/v1/chart/")
-    charts = response.json().get("result", [])
+    charts = await client.list_all(
+        "chart", columns=["id", "slice_name"]
+    )
+    details = await asyncio.gather(
+        *(client.get_json(f"/api/v1/chart/{chart['id']}") for chart in charts)
+    )
 
-    for chart in charts:
+    for chart, chart_detail in zip(charts, details):
         chart_id = chart["id"]
-        chart_detail = session.get(
-            f"{BASE_URL}/api/v1/chart/{chart_id}"
-        ).json()
-
         filename = (
             f"chart_{chart_id}_{chart['slice_name'].replace(' ', '_')}.json"
         )
@@ -61,16 +49,18 @@ def export_charts():
         print(f"💾 Сохранен график: {chart['slice_name']}")
 
 
-def export_datasets():
+async def export_datasets(client: SupersetClient):
     """Экспорт всех датасетов"""
     print("🗃️ Экспортируем датасеты...")
-    response = session.get(f"{BASE_URL}/api/v1/dataset/")
-    datasets = response.json().get("result", [])
+    datasets = await client.list_all(
+        "dataset", columns=["id", "table_name"]
+    )
+    details = await asyncio.gather(
+        *(client.get_json(f"/api/v1/dataset/{ds['id']}") for ds in datasets)
+    )
 
-    for ds in datasets:
+    for ds, ds_detail in zip(datasets, details):
         ds_id = ds["id"]
-        ds_detail = session.get(f"{BASE_URL}/api/v1/dataset/{ds_id}").json()
-
         filename = f"dataset_{ds_id}_{ds['table_name'].replace(' ', '_')}.json"
         with open(f"export/datasets/{filename}", "w") as f:
             json.dump(ds_detail, f, indent=2, ensure_ascii=False)
@@ -174,16 +164,22 @@ if __name__ == "__main__":
     print("📝 Создан скрипт для импорта: import_superset.py")
 
 
+async def main():
+    async with SupersetClient() as client:
+        await asyncio.gather(
+            export_datasets(client),
+            export_charts(client),
+            export_dashboards(client),
+        )
+
+
 if __name__ == "__main__":
     # Создаем папки для экспорта
     os.makedirs("export/dashboards", exist_ok=True)
     os.makedirs("export/charts", exist_ok=True)
     os.makedirs("export/datasets", exist_ok=True)
 
-    login()
-    export_datasets()
-    export_charts()
-    export_dashboards()
+    asyncio.run(main())
     create_import_script()
 
     print("✅ Экспорт завершен! Файлы сохранены в папке export/")
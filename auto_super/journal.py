@@ -0,0 +1,139 @@
+"""Журнал импорта в SQLite: статус каждого объекта по его uuid.
+
+Если импорт прервался, повторный запуск с `--resume` пропускает объекты
+со статусом ok и повторяет только pending/failed — работа пропорциональна
+оставшемуся, а не всему бандлу. Для каждого объекта хранится хэш его
+YAML: если объект в бандле изменился, он импортируется заново.
+"""
+
+import hashlib
+import sqlite3
+import time
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+PENDING = "pending"
+OK = "ok"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    uuid       TEXT PRIMARY KEY,
+    kind       TEXT NOT NULL,
+    name       TEXT,
+    status     TEXT NOT NULL,
+    object_id  INTEGER,
+    hash       TEXT,
+    duration   REAL,
+    error      TEXT,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+def content_hash(data: bytes) -> str:
+    """Хэш содержимого объекта бандла"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ImportJournal:
+    def __init__(self, path: str):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute(SCHEMA)
+        # Журналы старых версий — без колонки hash
+        columns = {
+            row[1] for row in self.db.execute("PRAGMA table_info(objects)")
+        }
+        if "hash" not in columns:
+            self.db.execute("ALTER TABLE objects ADD COLUMN hash TEXT")
+        self.db.commit()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> "ImportJournal":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def reset(self) -> None:
+        self.db.execute("DELETE FROM objects")
+        self.db.commit()
+
+    def plan(
+        self, objects: Iterable[Tuple[str, str, Optional[str], str]]
+    ) -> None:
+        """Записать объекты (uuid, kind, name, hash) как pending. Уже
+        импортированные не трогаются, если хэш их содержимого не изменился"""
+        now = time.time()
+        self.db.executemany(
+            "INSERT INTO objects (uuid, kind, name, status, hash, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(uuid) DO UPDATE SET kind = excluded.kind, "
+            "name = excluded.name, status = excluded.status, "
+            "hash = excluded.hash, updated_at = excluded.updated_at "
+            "WHERE objects.status != 'ok' "
+            "OR objects.hash IS NOT excluded.hash",
+            [
+                (u, kind, name, PENDING, digest, now)
+                for u, kind, name, digest in objects
+            ],
+        )
+        self.db.commit()
+
+    def finish(
+        self,
+        uuid: str,
+        ok: bool,
+        duration: float,
+        error: Optional[str] = None,
+        object_id: Optional[int] = None,
+    ) -> None:
+        """Статус объекта и (если известен) id, полученный в Superset —
+        пишется сразу, чтобы id не терялись при прерванном импорте"""
+        self.db.execute(
+            "UPDATE objects SET status = ?, duration = ?, error = ?, "
+            "object_id = COALESCE(?, object_id), updated_at = ? "
+            "WHERE uuid = ?",
+            (
+                OK if ok else FAILED,
+                duration,
+                error,
+                object_id,
+                time.time(),
+                uuid,
+            ),
+        )
+        self.db.commit()
+
+    def missing_ids(self) -> Set[str]:
+        """Импортированные объекты, для которых id ещё не записан"""
+        rows = self.db.execute(
+            "SELECT uuid FROM objects WHERE status = ? "
+            "AND object_id IS NULL",
+            (OK,),
+        )
+        return {row[0] for row in rows}
+
+    def record_ids(self, ids: Dict[str, int]) -> None:
+        """Сохранить id, которые объекты получили в Superset"""
+        self.db.executemany(
+            "UPDATE objects SET object_id = ? WHERE uuid = ?",
+            [(object_id, u) for u, object_id in ids.items()],
+        )
+        self.db.commit()
+
+    def completed(self, hashes: Dict[str, str]) -> Set[str]:
+        """uuid объектов, импортированных с тем же содержимым, что в
+        `hashes` (uuid -> хэш текущего бандла)"""
+        rows = self.db.execute(
+            "SELECT uuid, hash FROM objects WHERE status = ?", (OK,)
+        )
+        return {u for u, digest in rows if hashes.get(u) == digest}
+
+    def summary(self) -> Dict[str, int]:
+        rows = self.db.execute(
+            "SELECT status, COUNT(*) FROM objects GROUP BY status"
+        )
+        return dict(rows.fetchall())
@@ -0,0 +1,174 @@
+"""Построение разметки дашборда (position_json v2) целиком в памяти.
+
+Спецификация разметки — словарь со строками или вкладками:
+
+    {
+        "title": "Chinook",                       # необязательно
+        "rows": [
+            {
+                "header": "🔷 Общая статистика",   # необязательно
+                "charts": [
+                    {"chart": 1, "width": 4},
+                    {"chart": 2, "width": 4},
+                    {"column": [{"chart": 3}, {"chart": 4}], "width": 4},
+                ],
+            },
+        ],
+        # вместо "rows" можно "tabs": [{"title": "...", "rows": [...]}]
+    }
+
+Ячейка — это `{"chart": <id>, "width", "height", "uuid", "name"}` или
+колонка `{"column": [ячейки], "width"}`. Ширины в строке дают не больше 12.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+GRID_COLUMN_COUNT = 12
+DEFAULT_WIDTH = 6
+DEFAULT_HEIGHT = 50
+
+Position = Dict[str, Any]
+
+
+class LayoutError(ValueError):
+    """Некорректная спецификация разметки"""
+
+
+class _Builder:
+    def __init__(self):
+        self.position: Position = {"DASHBOARD_VERSION_KEY": "v2"}
+        self.counters: Dict[str, int] = {}
+
+    def add(
+        self,
+        kind: str,
+        parents: List[str],
+        meta: Optional[Dict[str, Any]] = None,
+        key: Optional[str] = None,
+    ) -> str:
+        if key is None:
+            self.counters[kind] = self.counters.get(kind, 0) + 1
+            key = f"{kind}-{self.counters[kind]}"
+        self.position[key] = {
+            "type": kind,
+            "id": key,
+            "children": [],
+            "parents": list(parents),
+        }
+        if meta is not None:
+            self.position[key]["meta"] = meta
+        if parents:
+            self.position[parents[-1]]["children"].append(key)
+        return key
+
+    def chart(self, cell: Dict[str, Any], parents: List[str], width: int):
+        chart_id = cell["chart"]
+        meta = {
+            "chartId": chart_id,
+            "width": width,
+            "height": cell.get("height", DEFAULT_HEIGHT),
+        }
+        if cell.get("uuid"):
+            meta["uuid"] = cell["uuid"]
+        if cell.get("name"):
+            meta["sliceName"] = cell["name"]
+        key = f"CHART-{chart_id}"
+        if key in self.position:
+            key = None  # один график дважды — ключ из счётчика
+        self.add("CHART", parents, meta, key=key)
+
+    def row(self, row: Dict[str, Any], parents: List[str]) -> None:
+        if row.get("header"):
+            self.add(
+                "HEADER",
+                parents,
+                {
+                    "text": row["header"],
+                    "headerSize": "MEDIUM_HEADER",
+                    "background": "BACKGROUND_TRANSPARENT",
+                },
+            )
+        cells = row.get("charts", [])
+        widths = [cell.get("width", DEFAULT_WIDTH) for cell in cells]
+        if sum(widths) > GRID_COLUMN_COUNT:
+            raise LayoutError(
+                f"❌ Сумма ширин в строке {widths} больше {GRID_COLUMN_COUNT}"
+            )
+        row_key = self.add(
+            "ROW", parents, {"background": "BACKGROUND_TRANSPARENT"}
+        )
+        row_parents = parents + [row_key]
+        for cell, width in zip(cells, widths):
+            if "column" in cell:
+                col_key = self.add(
+                    "COLUMN",
+                    row_parents,
+                    {"width": width, "background": "BACKGROUND_TRANSPARENT"},
+                )
+                for inner in cell["column"]:
+                    self.chart(inner, row_parents + [col_key], width)
+            else:
+                self.chart(cell, row_parents, width)
+
+
+def build_position(spec: Dict[str, Any]) -> Position:
+    """Полный position_json по спецификации разметки"""
+    builder = _Builder()
+    builder.add("ROOT", [], key="ROOT_ID")
+    builder.add("GRID", ["ROOT_ID"], key="GRID_ID")
+    if spec.get("title"):
+        builder.position["HEADER_ID"] = {
+            "id": "HEADER_ID",
+            "type": "HEADER",
+            "meta": {"text": spec["title"]},
+        }
+
+    if spec.get("tabs"):
+        tabs_key = builder.add("TABS", ["ROOT_ID", "GRID_ID"])
+        for tab in spec["tabs"]:
+            tab_key = builder.add(
+                "TAB",
+                ["ROOT_ID", "GRID_ID", tabs_key],
+                {"text": tab.get("title", ""), "defaultText": "Tab title"},
+            )
+            for row in tab.get("rows", []):
+                builder.row(row, ["ROOT_ID", "GRID_ID", tabs_key, tab_key])
+    else:
+        for row in spec.get("rows", []):
+            builder.row(row, ["ROOT_ID", "GRID_ID"])
+    return builder.position
+
+
+def grid_spec(
+    chart_ids: List[int],
+    per_row: int = 2,
+    height: int = DEFAULT_HEIGHT,
+) -> Dict[str, Any]:
+    """Простая сетка: графики по `per_row` в строке равной ширины"""
+    width = GRID_COLUMN_COUNT // per_row
+    return {
+        "rows": [
+            {
+                "charts": [
+                    {"chart": chart_id, "width": width, "height": height}
+                    for chart_id in chart_ids[i : i + per_row]
+                ]
+            }
+            for i in range(0, len(chart_ids), per_row)
+        ]
+    }
+
+
+def dashboard_payload(position: Position) -> Dict[str, str]:
+    """Тело PUT /api/v1/dashboard/<id> с готовой разметкой.
+
+    `json_metadata.positions` заставляет Superset привязать графики к
+    дашборду так же, как при сохранении из интерфейса.
+    """
+    return {
+        "position_json": json.dumps(position, ensure_ascii=False),
+        "json_metadata": json.dumps(
+            {"positions": position}, ensure_ascii=False
+        ),
+    }
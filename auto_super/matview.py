@@ -0,0 +1,409 @@
+"""Материализованные представления для тяжёлых виртуальных датасетов.
+
+Датасеты вроде «Топ-10 треков» при каждом рендере графика заново
+соединяют invoice_line, track, album и artist. `promote` сохраняет
+результат SQL датасета спеки в `<schema>.mv_<key>` с уникальным индексом
+(без него не работает `REFRESH ... CONCURRENTLY`), регистрирует его в
+Superset физическим датасетом и переводит на него графики виртуального
+датасета — запрос дашборда читает несколько готовых строк.
+
+    auto_super matview promote                  # датасеты с materialize
+    auto_super matview promote top_tracks       # или по key/имени
+    auto_super matview refresh                  # все MV, параллельно
+    auto_super matview refresh --every 3600     # по расписанию
+    auto_super matview list
+
+Уникальный ключ берётся из `materialize: {unique_key: [...]}` датасета;
+без него к строкам добавляется номер `_row`. Комментарий MV хранит хэш
+определения, поэтому повторный `promote` пересоздаёт только изменённые
+представления (в одной транзакции — читатели видят старую версию до
+COMMIT). После повторного импорта спеки графики снова смотрят на
+виртуальные датасеты — `promote` их вернёт, MV при этом не пересоздаются.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from auto_super import config, pg, spec
+from auto_super.client import SupersetClient
+from auto_super.remap import DatasetIndex, rewrite_chart
+
+SPEC_FILE = spec.spec_path("chinook.yaml")
+MV_SCHEMA = config.PG_SCHEMA
+MV_PREFIX = "mv_"
+# Колонка-номер строки, если у датасета не задан unique_key
+ROW_COLUMN = "_row"
+# Метка в COMMENT ON MATERIALIZED VIEW: "auto_super <key> <хэш>"
+MARKER = "auto_super"
+
+
+# ========================
+# 1. Определение представления
+# ========================
+def materialize_options(ds: Dict[str, Any]) -> Dict[str, Any]:
+    options = ds.get("materialize")
+    return options if isinstance(options, dict) else {}
+
+
+def dataset_key(ds: Dict[str, Any]) -> str:
+    return str(ds.get("key") or ds["name"])
+
+
+def unique_key(ds: Dict[str, Any]) -> List[str]:
+    return list(materialize_options(ds).get("unique_key") or [ROW_COLUMN])
+
+
+def view_name(ds: Dict[str, Any]) -> str:
+    return f"{MV_PREFIX}{dataset_key(ds)}"
+
+
+def view_sql(ds: Dict[str, Any]) -> str:
+    """SELECT, результат которого хранит представление"""
+    sql = pg.strip_sql(ds["sql"])
+    if materialize_options(ds).get("unique_key"):
+        return sql
+    return (
+        f"SELECT row_number() OVER () AS {pg.quote_ident(ROW_COLUMN)}, q.*\n"
+        f"FROM (\n{sql}\n) q"
+    )
+
+
+def fingerprint(ds: Dict[str, Any]) -> str:
+    source = view_sql(ds) + "\n" + ",".join(unique_key(ds))
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+
+
+def select_datasets(
+    dashboard_spec: spec.Spec, keys: List[str]
+) -> List[Dict[str, Any]]:
+    """Датасеты спеки по key или имени; без `keys` — с `materialize`"""
+    datasets = dashboard_spec.get("datasets") or []
+    if not keys:
+        return [ds for ds in datasets if ds.get("materialize")]
+    by_key = {dataset_key(ds): ds for ds in datasets}
+    by_key.update({ds["name"]: ds for ds in datasets})
+    unknown = [key for key in keys if key not in by_key]
+    if unknown:
+        raise Exception(f"❌ Нет датасетов в спеке: {', '.join(unknown)}")
+    return [by_key[key] for key in keys]
+
+
+# ========================
+# 2. DDL в Postgres
+# ========================
+def ensure_schema(schema: str, dsn: Optional[str] = None) -> None:
+    """Схема для MV — один раз до параллельных create_view: одновременные
+    CREATE SCHEMA IF NOT EXISTS падают на уникальности pg_namespace"""
+    conn = pg.connect(dsn)
+    try:
+        pg.execute(
+            conn, f"CREATE SCHEMA IF NOT EXISTS {pg.quote_ident(schema)}"
+        )
+    finally:
+        conn.close()
+
+
+def create_view(
+    ds: Dict[str, Any], schema: str, dsn: Optional[str] = None
+) -> bool:
+    """Создать или пересоздать MV датасета (схема уже есть, см.
+    ensure_schema); False — уже актуально"""
+    name = view_name(ds)
+    target = pg.qualified(schema, name)
+    comment = f"{MARKER} {dataset_key(ds)} {fingerprint(ds)}"
+    conn = pg.connect(dsn, autocommit=False)
+    try:
+        (current,) = pg.fetch(
+            conn,
+            "SELECT obj_description(to_regclass(%s), 'pg_class')",
+            (target,),
+        )[0]
+        if current == comment:
+            conn.rollback()
+            print(f"  ✅ {schema}.{name} актуально")
+            return False
+
+        started = time.perf_counter()
+        pg.execute(conn, f"DROP MATERIALIZED VIEW IF EXISTS {target}")
+        pg.execute(
+            conn,
+            f"CREATE MATERIALIZED VIEW {target} AS\n{view_sql(ds)}\n"
+            "WITH DATA",
+        )
+        pg.execute(
+            conn,
+            f"CREATE UNIQUE INDEX {pg.quote_ident(name + '_key')} "
+            f"ON {target} ({pg.column_list(unique_key(ds))})",
+        )
+        pg.execute(
+            conn, f"COMMENT ON MATERIALIZED VIEW {target} IS %s", (comment,)
+        )
+        pg.execute(conn, f"ANALYZE {target}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - started
+    print(f"  ✅ {schema}.{name} создано за {elapsed:.2f} с")
+    return True
+
+
+def managed_views(
+    schema: Optional[str] = None, dsn: Optional[str] = None
+) -> List[Tuple[str, str, float, int]]:
+    """MV, созданные promote: (схема, имя, строк по статистике, байт)"""
+    conn = pg.connect(dsn)
+    try:
+        return pg.fetch(
+            conn,
+            "SELECT n.nspname, c.relname, c.reltuples, "
+            "pg_total_relation_size(c.oid) "
+            "FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE c.relkind = 'm' "
+            "AND obj_description(c.oid, 'pg_class') LIKE %s "
+            "AND (%s IS NULL OR n.nspname = %s) "
+            "ORDER BY 1, 2",
+            (f"{MARKER} %", schema, schema),
+        )
+    finally:
+        conn.close()
+
+
+def refresh_view(schema: str, name: str, dsn: Optional[str] = None) -> float:
+    """REFRESH CONCURRENTLY — чтение MV не блокируется; время в секундах"""
+    target = pg.qualified(schema, name)
+    started = time.perf_counter()
+    conn = pg.connect(dsn)
+    try:
+        pg.execute(conn, f"REFRESH MATERIALIZED VIEW CONCURRENTLY {target}")
+        pg.execute(conn, f"ANALYZE {target}")
+    finally:
+        conn.close()
+    return time.perf_counter() - started
+
+
+async def refresh_views(
+    names: List[str], schema: str, dsn: Optional[str] = None
+) -> Dict[str, Any]:
+    """Обновить MV параллельно (по соединению на каждое); имя -> время
+    или исключение"""
+    if not names:
+        names = [
+            name for _, name, _, _ in await asyncio.to_thread(
+                managed_views, schema, dsn
+            )
+        ]
+    if not names:
+        print(f"⚠️ В схеме {schema} нет представлений auto_super")
+        return {}
+    print(f"🔄 Обновляем {len(names)} MV (CONCURRENTLY)...")
+    results = await asyncio.gather(
+        *(asyncio.to_thread(refresh_view, schema, n, dsn) for n in names),
+        return_exceptions=True,
+    )
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            print(f"  ❌ {schema}.{name}: {result}")
+        else:
+            print(f"  ✅ {schema}.{name}: {result:.2f} с")
+    return dict(zip(names, results))
+
+
+# ========================
+# 3. Регистрация в Superset
+# ========================
+async def register_dataset(
+    client: SupersetClient, database_id: int, schema: str, name: str
+) -> int:
+    """Физический датасет над MV (существующий — с обновлёнными колонками).
+
+    Существующий ищется по таблице, схеме и базе: одноимённая таблица в
+    другой схеме — другой датасет.
+    """
+    rows = await client.list_all(
+        "dataset",
+        columns=["id"],
+        filters=[
+            {"col": "table_name", "opr": "eq", "value": name},
+            {"col": "schema", "opr": "eq", "value": schema},
+            {"col": "database", "opr": "rel_o_m", "value": database_id},
+        ],
+    )
+    dataset_id = rows[0]["id"] if rows else None
+    if dataset_id is None:
+        dataset_id = await client.create_dataset(
+            {"database": database_id, "schema": schema, "table_name": name}
+        )
+    await client.refresh_dataset(dataset_id)
+    return dataset_id
+
+
+async def repoint_charts(
+    client: SupersetClient, source_id: int, target_id: int
+) -> int:
+    """Перевести графики датасета `source_id` на `target_id`.
+
+    Сохранённый query_context ссылается на старый датасет, и прогрев
+    кэша и отчёты по нему читали бы тяжёлый запрос: он сбрасывается,
+    Superset построит его заново из params.
+    """
+    charts = await client.list_all(
+        "chart",
+        columns=["id", "params", "datasource_id", "datasource_type"],
+        filters=[{"col": "datasource_id", "opr": "eq", "value": source_id}],
+    )
+    updates = []
+    for ch in charts:
+        rewritten = rewrite_chart(ch, target_id)
+        payload = {
+            key: rewritten[key]
+            for key in ("datasource_id", "datasource_type", "params")
+        }
+        payload["query_context"] = None
+        updates.append(client.update_chart(ch["id"], payload))
+    await asyncio.gather(*updates)
+    return len(charts)
+
+
+async def promote(
+    client: SupersetClient,
+    dashboard_spec: spec.Spec,
+    keys: List[str],
+    schema: str = MV_SCHEMA,
+    repoint: bool = True,
+    dsn: Optional[str] = None,
+) -> Dict[str, Any]:
+    """MV для датасетов спеки + физические датасеты; имя MV -> id или
+    исключение. Регистрируются и получают графики только созданные MV"""
+    datasets = select_datasets(dashboard_spec, keys)
+    if not datasets:
+        print("⚠️ Нечего материализовать: укажите key или materialize")
+        return {}
+
+    print(f"🏗️ Материализуем {len(datasets)} датасетов в схеме {schema}...")
+    await asyncio.to_thread(ensure_schema, schema, dsn)
+    results = await asyncio.gather(
+        *(asyncio.to_thread(create_view, ds, schema, dsn) for ds in datasets),
+        return_exceptions=True,
+    )
+    registered: Dict[str, Any] = {}
+    created = []
+    for ds, result in zip(datasets, results):
+        if isinstance(result, Exception):
+            print(f"  ❌ {schema}.{view_name(ds)}: {result}")
+            registered[view_name(ds)] = result
+        else:
+            created.append(ds)
+    if not created:
+        return registered
+
+    (database_id, _), index = await asyncio.gather(
+        spec.resolve_database(client, dashboard_spec.get("database")),
+        DatasetIndex.load(client),
+    )
+    for ds in created:
+        name = view_name(ds)
+        target_id = await register_dataset(client, database_id, schema, name)
+        registered[name] = target_id
+        source_id = index.resolve(
+            spec.object_uuid(dashboard_spec, "dataset", ds), ds["name"]
+        )
+        moved = 0
+        if repoint and source_id is not None:
+            moved = await repoint_charts(client, source_id, target_id)
+        print(
+            f"  ✅ {ds['name']} → {schema}.{name} "
+            f"(датасет {target_id}, графиков переведено: {moved})"
+        )
+    return registered
+
+
+# ========================
+# 4. Запуск
+# ========================
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Опции скрипта (их же использует `auto_super matview`)"""
+    parser.add_argument("action", choices=("promote", "refresh", "list"))
+    parser.add_argument(
+        "keys", nargs="*", help="key или имя датасета спеки (для refresh — MV)"
+    )
+    parser.add_argument(
+        "--spec", default=str(SPEC_FILE), help="спека с датасетами"
+    )
+    parser.add_argument("--schema", default=MV_SCHEMA, help="схема для MV")
+    parser.add_argument("--dsn", help="подключение к Postgres")
+    parser.add_argument(
+        "--keep-charts",
+        action="store_true",
+        help="не переводить графики на физический датасет",
+    )
+    parser.add_argument(
+        "--every",
+        type=float,
+        help="refresh: повторять каждые N секунд",
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Материализованные представления для датасетов"
+    )
+    add_arguments(parser)
+    return parser.parse_args()
+
+
+async def main(args) -> int:
+    if args.action == "list":
+        views = await asyncio.to_thread(managed_views, None, args.dsn)
+        for schema, name, rows, size in views:
+            print(f"  • {schema}.{name}: ~{int(rows)} строк, {size} байт")
+        print(f"✅ Представлений auto_super: {len(views)}")
+        return 0
+
+    if args.action == "refresh":
+        names = [
+            key if key.startswith(MV_PREFIX) else MV_PREFIX + key
+            for key in args.keys
+        ]
+        while True:
+            results = await refresh_views(names, args.schema, args.dsn)
+            failed = any(isinstance(r, Exception) for r in results.values())
+            if not args.every:
+                return 1 if failed else 0
+            print(f"⏳ Следующее обновление через {args.every:.0f} с")
+            await asyncio.sleep(args.every)
+
+    dashboard_spec = spec.load_spec(args.spec)
+    errors = spec.validate(dashboard_spec)
+    if errors:
+        raise spec.SpecError(errors)
+    async with SupersetClient() as client:
+        results = await promote(
+            client,
+            dashboard_spec,
+            args.keys,
+            args.schema,
+            not args.keep_charts,
+            args.dsn,
+        )
+    failed = [n for n, r in results.items() if isinstance(r, Exception)]
+    if failed:
+        print(f"❌ Не материализованы: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(asyncio.run(main(parse_args())))
+    except Exception as e:
+        print(f"\n❌ КРИТИЧЕСКАЯ ОШИБКА: {e}")
@@ -0,0 +1,109 @@
+"""Прямое подключение к Postgres с данными Chinook.
+
+Superset ходит в базу сам, но DDL (материализованные представления,
+индексы) и служебные запросы выполняются напрямую. psycopg2 — необязательная
+зависимость (`pip install auto-super[postgres]`): импортируется только
+командами, которым нужна база.
+"""
+
+import csv
+import io
+from itertools import islice
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from auto_super import config
+
+# Сколько байт COPY читает из потока за раз
+COPY_BUFFER = 1 << 16
+# Маркер NULL в CSV для COPY (пустое поле без кавычек — это '')
+NULL = "\\N"
+
+
+def connect(dsn: Optional[str] = None, autocommit: bool = True):
+    """Соединение psycopg2 с `dsn` (по умолчанию `config.PG_DSN`)"""
+    try:
+        import psycopg2
+    except ImportError:
+        raise Exception(
+            "❌ Для работы с Postgres нужен psycopg2: "
+            "pip install psycopg2-binary"
+        )
+    conn = psycopg2.connect(dsn or config.PG_DSN)
+    conn.autocommit = autocommit
+    return conn
+
+
+def quote_ident(name: str) -> str:
+    """Идентификатор в двойных кавычках (колонки бывают кириллицей)"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def qualified(schema: Optional[str], name: str) -> str:
+    if schema:
+        return f"{quote_ident(schema)}.{quote_ident(name)}"
+    return quote_ident(name)
+
+
+def column_list(columns: Iterable[str]) -> str:
+    return ", ".join(quote_ident(c) for c in columns)
+
+
+def strip_sql(sql: str) -> str:
+    """SQL без завершающей `;` — для вложения в другой запрос"""
+    return sql.strip().rstrip(";").strip()
+
+
+def fetch(conn, sql: str, params: Any = None) -> List[Tuple]:
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        return cur.fetchall() if cur.description else []
+
+
+def execute(conn, sql: str, params: Any = None) -> int:
+    """Выполнить запрос; число затронутых строк"""
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        return cur.rowcount
+
+
+# ========================
+# COPY
+# ========================
+class CsvStream:
+    """Файловый объект для COPY FROM STDIN: CSV из итератора строк,
+    формируется по мере чтения — таблица целиком в памяти не держится"""
+
+    BATCH = 1000
+
+    def __init__(self, rows: Iterable[Sequence[Any]]):
+        self._rows = iter(rows)
+        self._buffer = ""
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            batch = list(islice(self._rows, self.BATCH))
+            if not batch:
+                break
+            out = io.StringIO()
+            csv.writer(out, lineterminator="\n").writerows(
+                [NULL if v is None else v for v in row] for row in batch
+            )
+            self._buffer += out.getvalue()
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+def copy_rows(
+    conn, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]
+) -> int:
+    """COPY строк в `table` (уже экранированное имя); сколько загружено"""
+    with conn.cursor() as cur:
+        cur.copy_expert(
+            f"COPY {table} ({column_list(columns)}) "
+            f"FROM STDIN WITH (FORMAT csv, NULL '{NULL}')",
+            CsvStream(rows),
+            size=COPY_BUFFER,
+        )
+        return cur.rowcount
@@ -0,0 +1,71 @@
+"""Проверка SQL датасетов до создания чего-либо в Superset.
+
+Каждый запрос выполняется как `EXPLAIN <sql>` через SQL Lab
+(/api/v1/sqllab/execute/): Postgres разбирает и планирует его, но не
+выполняет, поэтому синтаксис, таблицы и колонки проверяются за
+миллисекунды. Все запросы проверяются параллельно, и при любой ошибке
+не создаётся ни один датасет — вместо заглушек и половины объектов.
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+from auto_super.client import SupersetAPIError
+
+
+def explain_sql(sql: str) -> str:
+    """EXPLAIN для SQL датасета (без завершающей `;`)"""
+    return f"EXPLAIN {sql.strip().rstrip(';').strip()}"
+
+
+def error_message(text: str) -> str:
+    """Текст ошибки SQL Lab из тела ответа"""
+    try:
+        body = json.loads(text)
+    except ValueError:
+        return text[:500]
+    errors = body.get("errors") or []
+    if errors and errors[0].get("message"):
+        return errors[0]["message"]
+    return str(body.get("error") or body.get("message") or text[:500])
+
+
+async def check_sql(
+    client, database_id: int, sql: str, schema: Optional[str] = None
+) -> Optional[str]:
+    """Ошибка запроса или None, если Postgres его принял"""
+    try:
+        result = await client.execute_sql(
+            database_id, explain_sql(sql), schema=schema
+        )
+    except SupersetAPIError as e:
+        return error_message(e.text)
+    if result.get("status") in ("failed", "error"):
+        return str(result.get("error") or result)
+    return None
+
+
+async def check_datasets(
+    client, database_id: int, datasets: List[Dict[str, Any]]
+) -> Dict[str, str]:
+    """Проверить SQL всех датасетов параллельно; имя -> ошибка"""
+    print(f"🧪 Проверяем SQL {len(datasets)} датасетов (EXPLAIN)...")
+    results = await asyncio.gather(
+        *(
+            check_sql(client, database_id, ds["sql"], ds.get("schema"))
+            for ds in datasets
+        )
+    )
+    failed = {
+        ds["name"]: error
+        for ds, error in zip(datasets, results)
+        if error is not None
+    }
+    if failed:
+        print(f"❌ SQL с ошибками: {len(failed)}/{len(datasets)}")
+        for name, error in failed.items():
+            print(f"  • {name}: {error}")
+    else:
+        print(f"✅ SQL всех {len(datasets)} датасетов корректен")
+    return failed
@@ -0,0 +1,178 @@
+"""Реестр типов визуализаций Superset с кэшем на диске.
+
+`/api/v1/chart/_info` отдаёт большую схему form_data, из которой нужны
+лишь список `VizType.enum` и описания полей. Реестр сохраняет их в JSON
+(`config.REGISTRY_CACHE`) по ключу адреса Superset вместе с его версией:
+пока версия та же и не истёк `config.REGISTRY_TTL`, схема не скачивается.
+Тот же кэш позволяет проверить графики спеки вообще без сети.
+"""
+
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from auto_super import cache, config
+from auto_super.client.errors import SupersetAPIError
+
+# Замены для имён, которых нет в версии Superset: первый доступный вариант
+VIZ_ALIASES = {
+    "pie": ("pie", "pie_chart"),
+    "line": ("echarts_timeseries_line", "line", "time_series"),
+    "bar": ("echarts_timeseries_bar", "dist_bar", "bar"),
+    "area": ("echarts_area", "area"),
+    "time_series": ("echarts_timeseries_line", "line"),
+    "dist_bar": ("echarts_timeseries_bar", "dist_bar"),
+}
+# Обязательные поля form_data; кортеж — достаточно одного из полей
+REQUIRED_FIELDS = {
+    "big_number_total": ("metric",),
+    "big_number": ("metric", "x_axis"),
+    "pie": ("metric", "groupby"),
+    "table": (("metrics", "all_columns", "groupby"),),
+    "echarts_timeseries_bar": ("metrics", "x_axis"),
+    "echarts_timeseries_line": ("metrics", "x_axis"),
+    "echarts_area": ("metrics", "x_axis"),
+}
+
+
+class VizRegistry:
+    """Доступные viz_type и схема form_data одной версии Superset"""
+
+    def __init__(
+        self,
+        viz_types: Iterable[str],
+        schema: Optional[Dict[str, Any]] = None,
+        version: Optional[str] = None,
+        fetched_at: Optional[float] = None,
+    ):
+        self.viz_types = list(viz_types)
+        self.schema = schema or {}
+        self.version = version
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+
+    @classmethod
+    def from_info(
+        cls, info: Dict[str, Any], version: Optional[str] = None
+    ) -> "VizRegistry":
+        """Реестр из ответа /api/v1/chart/_info"""
+        schema = info.get("form_data_schema") or {}
+        definitions = schema.get("definitions") or {}
+        viz_type = definitions.get("VizType") or {}
+        # Храним только то, что нужно для проверки, а не весь ответ
+        compact = {
+            "properties": schema.get("properties") or {},
+            "definitions": {
+                name: definition
+                for name, definition in definitions.items()
+                if "enum" in definition
+            },
+        }
+        return cls(viz_type.get("enum") or [], compact, version)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "VizRegistry":
+        return cls(
+            data.get("viz_types") or [],
+            data.get("schema"),
+            data.get("version"),
+            data.get("fetched_at"),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "fetched_at": self.fetched_at,
+            "viz_types": self.viz_types,
+            "schema": self.schema,
+        }
+
+    def fresh(self, version: Optional[str], ttl: float) -> bool:
+        return (
+            bool(self.viz_types)
+            and self.version == version
+            and time.time() - self.fetched_at < ttl
+        )
+
+    def resolve(self, viz_type: str) -> Optional[str]:
+        """`viz_type` или его замена из этой версии; None — замены нет"""
+        if viz_type in self.viz_types:
+            return viz_type
+        for candidate in VIZ_ALIASES.get(viz_type, ()):
+            if candidate in self.viz_types:
+                return candidate
+        return None
+
+    def _property(self, name: str) -> Dict[str, Any]:
+        prop = self.schema.get("properties", {}).get(name) or {}
+        ref = prop.get("$ref", "")
+        if ref.startswith("#/definitions/"):
+            definitions = self.schema.get("definitions", {})
+            return definitions.get(ref.rsplit("/", 1)[1]) or {}
+        return prop
+
+    def validate(self, viz_type: str, form_data: Dict[str, Any]) -> List[str]:
+        """Ошибки form_data графика без обращения к Superset"""
+        errors = []
+        resolved = self.resolve(viz_type) if self.viz_types else viz_type
+        if resolved is None:
+            errors.append(
+                f"viz_type '{viz_type}' недоступен "
+                f"в Superset {self.version or '?'}"
+            )
+        for required in REQUIRED_FIELDS.get(resolved or viz_type, ()):
+            fields = required if isinstance(required, tuple) else (required,)
+            if not any(form_data.get(field) for field in fields):
+                errors.append(f"нет поля {' или '.join(fields)}")
+        for name, value in form_data.items():
+            allowed = self._property(name).get("enum")
+            if allowed and name != "viz_type" and value not in allowed:
+                errors.append(f"{name}={value!r} не из {allowed}")
+        return errors
+
+
+# ========================
+# Кэш на диске
+# ========================
+def cached(
+    base_url: str = config.BASE_URL,
+    path: Optional[str] = config.REGISTRY_CACHE,
+) -> Optional[VizRegistry]:
+    """Последний сохранённый реестр без проверки версии и срока — для
+    офлайн-проверки спеки"""
+    if not path:
+        return None
+    entry = cache.read_json(path).get(base_url.rstrip("/"))
+    return VizRegistry.from_dict(entry) if entry else None
+
+
+async def load(
+    client,
+    path: Optional[str] = config.REGISTRY_CACHE,
+    ttl: float = config.REGISTRY_TTL,
+) -> VizRegistry:
+    """Реестр для `client`: из кэша, если версия Superset та же и срок не
+    истёк, иначе из /api/v1/chart/_info с обновлением кэша"""
+    version = await client.server_version()
+    registry = cached(client.base_url, path)
+    if registry and registry.fresh(version, ttl):
+        print(
+            f"✅ Типы визуализаций из кэша "
+            f"(Superset {version or '?'}): {len(registry.viz_types)}"
+        )
+        return registry
+
+    print("🔍 Получаем доступные типы визуализаций...")
+    try:
+        info = await client.get_chart_info()
+    except SupersetAPIError as e:
+        print(f"❌ Ошибка: {e.status} - {e.text[:200]}")
+        return registry or VizRegistry([], version=version)
+    registry = VizRegistry.from_info(info, version)
+    if not registry.viz_types:
+        print("⚠️ В /api/v1/chart/_info нет VizType — кэш не обновлён")
+        return registry
+    print(f"✅ Доступно типов визуализаций: {len(registry.viz_types)}")
+    if path:
+        entries = cache.read_json(path)
+        entries[client.base_url] = registry.to_dict()
+        cache.write_json(path, entries)
+    return registry
@@ -0,0 +1,100 @@
+"""Перенос графиков между инстансами: старый id датасета -> новый.
+
+Экспортированные графики ссылаются на датасеты исходного инстанса —
+`datasource_id` и строкой `"<id>__table"` в params. После импорта
+датасетов один список `/api/v1/dataset/` даёт индекс целевого инстанса
+(uuid / table_name -> id), и все графики переписываются за один проход
+без запросов на каждый график.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from auto_super.artifacts import artifact_uuid
+from auto_super.client import SupersetClient
+
+
+class DatasetIndex:
+    """Датасеты целевого инстанса: uuid и table_name -> id"""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.by_uuid = {
+            str(row["uuid"]): row["id"] for row in rows if row.get("uuid")
+        }
+        self.by_name = {row["table_name"]: row["id"] for row in rows}
+
+    @classmethod
+    async def load(cls, client: SupersetClient) -> "DatasetIndex":
+        rows = await client.list_all(
+            "dataset", columns=["id", "uuid", "table_name"]
+        )
+        return cls(rows)
+
+    def resolve(
+        self, uuid: Optional[str] = None, table_name: Optional[str] = None
+    ) -> Optional[int]:
+        if uuid and uuid in self.by_uuid:
+            return self.by_uuid[uuid]
+        return self.by_name.get(table_name)
+
+
+def chart_source_dataset_id(ch: Dict) -> Optional[int]:
+    """ID датасета графика: datasource_id или "<id>__table" из params"""
+    if ch.get("datasource_id"):
+        return int(ch["datasource_id"])
+    params = ch.get("params") or {}
+    if isinstance(params, str):
+        params = json.loads(params)
+    datasource = str(params.get("datasource", ""))
+    source_id, _, _ = datasource.partition("__")
+    return int(source_id) if source_id.isdigit() else None
+
+
+def source_id_map(
+    datasets: List[Dict[str, Any]], index: DatasetIndex
+) -> Dict[int, int]:
+    """id датасета в исходном инстансе -> id в целевом.
+
+    Сначала ищем по uuid (явному или детерминированному, который
+    получает датасет при импорте бандлом), затем по имени таблицы.
+    """
+    mapping = {}
+    for ds in datasets:
+        target = index.resolve(
+            ds.get("uuid") or artifact_uuid("dataset", ds["id"]),
+            ds.get("table_name"),
+        )
+        if target is not None:
+            mapping[ds["id"]] = target
+    return mapping
+
+
+def rewrite_chart(ch: Dict[str, Any], target_id: int) -> Dict[str, Any]:
+    """Копия графика, ссылающаяся на датасет `target_id`"""
+    params = ch.get("params") or {}
+    was_str = isinstance(params, str)
+    if was_str:
+        params = json.loads(params or "{}")
+    params = {**params, "datasource": f"{target_id}__table"}
+    return {
+        **ch,
+        "datasource_id": target_id,
+        "datasource_type": ch.get("datasource_type") or "table",
+        "params": (
+            json.dumps(params, ensure_ascii=False) if was_str else params
+        ),
+    }
+
+
+def rewrite_charts(
+    charts: List[Dict[str, Any]], id_map: Dict[int, int]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Переписать все графики; вернуть (готовые, без найденного датасета)"""
+    rewritten, unresolved = [], []
+    for ch in charts:
+        target_id = id_map.get(chart_source_dataset_id(ch))
+        if target_id is None:
+            unresolved.append(ch)
+        else:
+            rewritten.append(rewrite_chart(ch, target_id))
+    return rewritten, unresolved
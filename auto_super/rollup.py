@@ -0,0 +1,325 @@
+"""Инкрементальные помесячные агрегаты для временных рядов дашборда.
+
+«Выручка по месяцам» и «Новые клиенты по месяцам» каждый раз
+агрегировали всю историю invoice (а новые клиенты — ещё и коррелированным
+подзапросом на строку). Здесь агрегаты хранятся в таблицах схемы
+`config.PG_SCHEMA` и дополняются пакетно: для каждой таблицы помнится
+водяной знак — последний обработанный id источника, и `update` сводит
+только строки новее него (upsert по первичному ключу). С
+`auto_super spec ... --rollup` датасеты спеки с `rollup_sql` читают готовые
+помесячные строки, их стоимость не зависит от длины истории счетов.
+
+    auto_super rollup update                # дописать новые строки
+    auto_super rollup update --every 300    # пакетно по расписанию
+    auto_super rollup rebuild               # пересчитать с нуля
+    auto_super rollup status
+
+Изменения и удаления старых счетов, а также строки транзакций, которые
+были открыты во время пакета и получили id ниже водяного знака, в
+агрегаты не попадают — для этого есть `rebuild`.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from auto_super import config, pg
+
+WATERMARK_TABLE = "rollup_watermark"
+
+# Таблицы агрегатов: DDL, источник с монотонным id и upsert диапазона
+# (low, high] этого id. {schema} — схема агрегатов.
+ROLLUPS = [
+    {
+        "table": "rollup_revenue_monthly",
+        "source": "invoice_line",
+        "id_column": "invoice_line_id",
+        "ddl": """
+            CREATE TABLE IF NOT EXISTS {schema}.rollup_revenue_monthly (
+                month date NOT NULL,
+                country text NOT NULL,
+                genre text NOT NULL,
+                media_type text NOT NULL,
+                revenue numeric(14, 2) NOT NULL,
+                quantity bigint NOT NULL,
+                lines bigint NOT NULL,
+                PRIMARY KEY (month, country, genre, media_type)
+            )
+        """,
+        "upsert": """
+            INSERT INTO {schema}.rollup_revenue_monthly AS r
+                (month, country, genre, media_type, revenue, quantity, lines)
+            SELECT
+                DATE_TRUNC('month', i.invoice_date)::date,
+                COALESCE(i.billing_country, ''),
+                COALESCE(g.name, ''),
+                COALESCE(mt.name, ''),
+                SUM(il.unit_price * il.quantity),
+                SUM(il.quantity),
+                COUNT(*)
+            FROM invoice_line il
+            JOIN invoice i ON i.invoice_id = il.invoice_id
+            JOIN track t ON t.track_id = il.track_id
+            LEFT JOIN genre g ON g.genre_id = t.genre_id
+            LEFT JOIN media_type mt ON mt.media_type_id = t.media_type_id
+            WHERE il.invoice_line_id > %(low)s
+              AND il.invoice_line_id <= %(high)s
+            GROUP BY 1, 2, 3, 4
+            ON CONFLICT (month, country, genre, media_type) DO UPDATE SET
+                revenue = r.revenue + EXCLUDED.revenue,
+                quantity = r.quantity + EXCLUDED.quantity,
+                lines = r.lines + EXCLUDED.lines
+        """,
+    },
+    {
+        "table": "rollup_customer_first_purchase",
+        "source": "invoice",
+        "id_column": "invoice_id",
+        "ddl": """
+            CREATE TABLE IF NOT EXISTS
+                {schema}.rollup_customer_first_purchase (
+                customer_id integer PRIMARY KEY,
+                country text NOT NULL,
+                first_month date NOT NULL
+            )
+        """,
+        "upsert": """
+            INSERT INTO {schema}.rollup_customer_first_purchase AS r
+                (customer_id, country, first_month)
+            SELECT
+                i.customer_id,
+                COALESCE(c.country, ''),
+                DATE_TRUNC('month', MIN(i.invoice_date))::date
+            FROM invoice i
+            JOIN customer c ON c.customer_id = i.customer_id
+            WHERE i.invoice_id > %(low)s AND i.invoice_id <= %(high)s
+            GROUP BY i.customer_id, c.country
+            ON CONFLICT (customer_id) DO UPDATE SET
+                first_month = LEAST(r.first_month, EXCLUDED.first_month)
+        """,
+    },
+]
+
+
+def _sql(template: str, schema: str) -> str:
+    return template.format(schema=pg.quote_ident(schema))
+
+
+# ========================
+# 1. Таблицы и водяные знаки
+# ========================
+def ensure_tables(conn, schema: str) -> None:
+    pg.execute(conn, f"CREATE SCHEMA IF NOT EXISTS {pg.quote_ident(schema)}")
+    pg.execute(
+        conn,
+        f"CREATE TABLE IF NOT EXISTS "
+        f"{pg.qualified(schema, WATERMARK_TABLE)} ("
+        "name text PRIMARY KEY, "
+        "last_id bigint NOT NULL DEFAULT 0, "
+        "updated_at timestamptz)",
+    )
+    for rollup in ROLLUPS:
+        pg.execute(conn, _sql(rollup["ddl"], schema))
+
+
+def lock_watermark(conn, schema: str, table: str) -> int:
+    """Водяной знак таблицы, заблокированный до конца транзакции — два
+    пакета одновременно одну таблицу не обработают"""
+    watermarks = pg.qualified(schema, WATERMARK_TABLE)
+    pg.execute(
+        conn,
+        f"INSERT INTO {watermarks} (name) VALUES (%s) "
+        "ON CONFLICT (name) DO NOTHING",
+        (table,),
+    )
+    rows = pg.fetch(
+        conn,
+        f"SELECT last_id FROM {watermarks} WHERE name = %s FOR UPDATE",
+        (table,),
+    )
+    return rows[0][0]
+
+
+# ========================
+# 2. Пакетное обновление
+# ========================
+def update_rollup(conn, schema: str, rollup: Dict[str, Any]) -> int:
+    """Свести строки источника новее водяного знака; сколько id
+    обработано. Агрегат и водяной знак меняются в текущей транзакции —
+    фиксирует её вызывающий"""
+    low = lock_watermark(conn, schema, rollup["table"])
+    ((high,),) = pg.fetch(
+        conn,
+        f"SELECT COALESCE(MAX({rollup['id_column']}), 0) "
+        f"FROM {rollup['source']}",
+    )
+    if high > low:
+        pg.execute(
+            conn,
+            _sql(rollup["upsert"], schema),
+            {"low": low, "high": high},
+        )
+        pg.execute(
+            conn,
+            f"UPDATE {pg.qualified(schema, WATERMARK_TABLE)} "
+            "SET last_id = %s, updated_at = now() WHERE name = %s",
+            (high, rollup["table"]),
+        )
+    return max(high - low, 0)
+
+
+def update(
+    schema: str = config.PG_SCHEMA,
+    dsn: Optional[str] = None,
+    rebuild: bool = False,
+) -> Dict[str, int]:
+    """Обновить все агрегаты (с `rebuild` — пересчитать с нуля).
+
+    Пакет фиксирует каждую таблицу отдельно. `rebuild` очищает агрегаты,
+    пересчитывает их и пишет водяные знаки одной транзакцией: очистка —
+    DELETE, а не TRUNCATE, поэтому до фиксации дашборды читают прежние
+    строки, а не пустые таблицы.
+    """
+    conn = pg.connect(dsn, autocommit=False)
+    try:
+        ensure_tables(conn, schema)
+        conn.commit()
+        if rebuild:
+            for rollup in ROLLUPS + [{"table": WATERMARK_TABLE}]:
+                table = pg.qualified(schema, rollup["table"])
+                pg.execute(conn, f"DELETE FROM {table}")
+
+        processed = {}
+        for rollup in ROLLUPS:
+            started = time.perf_counter()
+            processed[rollup["table"]] = update_rollup(conn, schema, rollup)
+            if not rebuild:
+                conn.commit()
+            print(
+                f"  ✅ {schema}.{rollup['table']}: "
+                f"+{processed[rollup['table']]} id {rollup['source']} "
+                f"за {time.perf_counter() - started:.2f} с"
+            )
+        conn.commit()
+        for rollup in ROLLUPS:
+            table = pg.qualified(schema, rollup["table"])
+            pg.execute(conn, f"ANALYZE {table}")
+        conn.commit()
+        return processed
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def status(
+    schema: str = config.PG_SCHEMA, dsn: Optional[str] = None
+) -> List[tuple]:
+    """(таблица, водяной знак, строк в агрегате, время обновления); без
+    таблицы агрегата строк None. Только читает: таблицы не создаются"""
+    conn = pg.connect(dsn)
+    try:
+        existing = {
+            name
+            for (name,) in pg.fetch(
+                conn,
+                "SELECT table_name FROM information_schema.tables "
+                "WHERE table_schema = %s",
+                (schema,),
+            )
+        }
+        watermarks = {}
+        if WATERMARK_TABLE in existing:
+            watermarks = {
+                name: (last_id, updated_at)
+                for name, last_id, updated_at in pg.fetch(
+                    conn,
+                    "SELECT name, last_id, updated_at FROM "
+                    f"{pg.qualified(schema, WATERMARK_TABLE)}",
+                )
+            }
+        result = []
+        for rollup in ROLLUPS:
+            count = None
+            if rollup["table"] in existing:
+                ((count,),) = pg.fetch(
+                    conn,
+                    "SELECT COUNT(*) FROM "
+                    f"{pg.qualified(schema, rollup['table'])}",
+                )
+            last_id, updated_at = watermarks.get(rollup["table"], (0, None))
+            result.append((rollup["table"], last_id, count, updated_at))
+        return result
+    finally:
+        conn.close()
+
+
+# ========================
+# 3. Запуск
+# ========================
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Опции скрипта (их же использует `auto_super rollup`)"""
+    parser.add_argument("action", choices=("update", "rebuild", "status"))
+    parser.add_argument(
+        "--schema", default=config.PG_SCHEMA, help="схема агрегатов"
+    )
+    parser.add_argument("--dsn", help="подключение к Postgres")
+    parser.add_argument(
+        "--every", type=float, help="update: повторять каждые N секунд"
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Инкрементальные помесячные агрегаты"
+    )
+    add_arguments(parser)
+    return parser.parse_args()
+
+
+async def main(args) -> int:
+    if args.action == "status":
+        rows = await asyncio.to_thread(status, args.schema, args.dsn)
+        for table, last_id, count, updated_at in rows:
+            if count is None:
+                print(
+                    f"  ⚠️ {args.schema}.{table}: не инициализировано "
+                    "(auto_super rollup update)"
+                )
+                continue
+            print(
+                f"  • {args.schema}.{table}: {count} строк, "
+                f"водяной знак {last_id}, обновлено {updated_at or '—'}"
+            )
+        return 0
+
+    rebuild = args.action == "rebuild"
+    while True:
+        print(
+            "🔄 Пересчитываем агрегаты с нуля..."
+            if rebuild
+            else "🔄 Дописываем новые строки в агрегаты..."
+        )
+        if rebuild or not args.every:
+            await asyncio.to_thread(update, args.schema, args.dsn, rebuild)
+            return 0
+        # По расписанию ошибка одного пакета не останавливает следующие
+        try:
+            await asyncio.to_thread(update, args.schema, args.dsn)
+        except Exception as e:
+            print(f"❌ Пакет не выполнен: {e}")
+        print(f"⏳ Следующий пакет через {args.every:.0f} с")
+        await asyncio.sleep(args.every)
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(asyncio.run(main(parse_args())))
+    except Exception as e:
+        print(f"\n❌ КРИТИЧЕСКАЯ ОШИБКА: {e}")
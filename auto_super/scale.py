@@ -0,0 +1,461 @@
+"""Синтетическое масштабирование Chinook в 10–1000 раз.
+
+В дампе docker/Chinook_PostgreSql_SerialPKs.sql всего 412 счетов и 2 240
+строк — на таком объёме не видно ни одной проблемы дашбордов. Генератор
+дописывает клиентов, треки, счета и строки счетов до `factor` × исходного
+объёма с правдоподобными распределениями:
+
+* популярность треков — закон Ципфа (`--zipf`), немного хитов и длинный
+  хвост;
+* даты счетов — сезонность по месяцам и рост к концу периода;
+* страны клиентов — перекос исходного распределения в степени
+  `--country-skew` (США и Канада становятся ещё крупнее);
+* число строк в счёте — как в исходных счетах.
+
+Строки грузятся через COPY параллельными потоками (`--workers`), каждый
+кусок счетов — со своими строками в одной транзакции. Генерация
+детерминирована (`--seed`), а объём считается от исходных строк Chinook,
+поэтому повторный запуск с тем же `factor` ничего не добавляет.
+
+    auto_super scale --factor 100
+    auto_super scale --factor 10 --invoices 1000   # счета отдельно
+    auto_super scale --reset                       # только исходные данные
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from auto_super import pg
+
+# Строк в исходном дампе; id выше — синтетические
+CHINOOK_ROWS = {"customer": 59, "track": 3503, "invoice": 412}
+# Вес месяца (январь..декабрь): летний спад и пик к Новому году
+SEASONALITY = (0.8, 0.8, 0.9, 0.9, 1.0, 0.9, 0.8, 0.8, 1.0, 1.1, 1.3, 1.6)
+# Во сколько раз последний месяц периода оживлённее первого
+GROWTH = 2.0
+
+TRACK_COLUMNS = (
+    "track_id",
+    "name",
+    "album_id",
+    "media_type_id",
+    "genre_id",
+    "composer",
+    "milliseconds",
+    "bytes",
+    "unit_price",
+)
+CUSTOMER_COLUMNS = (
+    "customer_id",
+    "first_name",
+    "last_name",
+    "company",
+    "address",
+    "city",
+    "state",
+    "country",
+    "postal_code",
+    "phone",
+    "fax",
+    "email",
+    "support_rep_id",
+)
+INVOICE_COLUMNS = (
+    "invoice_id",
+    "customer_id",
+    "invoice_date",
+    "billing_address",
+    "billing_city",
+    "billing_state",
+    "billing_country",
+    "billing_postal_code",
+    "total",
+)
+LINE_COLUMNS = ("invoice_id", "track_id", "unit_price", "quantity")
+
+
+# ========================
+# 1. Исходные данные
+# ========================
+def load_base(conn) -> Dict[str, Any]:
+    """Шаблоны из исходных строк Chinook и текущие объёмы таблиц"""
+    tracks = pg.fetch(
+        conn,
+        f"SELECT {pg.column_list(TRACK_COLUMNS)} FROM track "
+        "WHERE track_id <= %s ORDER BY track_id",
+        (CHINOOK_ROWS["track"],),
+    )
+    customers = pg.fetch(
+        conn,
+        f"SELECT {pg.column_list(CUSTOMER_COLUMNS)} FROM customer "
+        "WHERE customer_id <= %s ORDER BY customer_id",
+        (CHINOOK_ROWS["customer"],),
+    )
+    lines = [
+        n
+        for (n,) in pg.fetch(
+            conn,
+            "SELECT COUNT(*) FROM invoice_line WHERE invoice_id <= %s "
+            "GROUP BY invoice_id",
+            (CHINOOK_ROWS["invoice"],),
+        )
+    ]
+    ((first, last),) = pg.fetch(
+        conn,
+        "SELECT MIN(invoice_date), MAX(invoice_date) FROM invoice "
+        "WHERE invoice_id <= %s",
+        (CHINOOK_ROWS["invoice"],),
+    )
+    counts = {}
+    for table in CHINOOK_ROWS:
+        ((count, max_id),) = pg.fetch(
+            conn, f"SELECT COUNT(*), COALESCE(MAX({table}_id), 0) FROM {table}"
+        )
+        counts[table] = (count, max_id)
+    if len(tracks) < CHINOOK_ROWS["track"] or not lines:
+        raise Exception("❌ В базе нет исходных данных Chinook")
+    return {
+        "tracks": tracks,
+        "customers": customers,
+        "lines_per_invoice": lines,
+        "period": (first, last),
+        "counts": counts,
+    }
+
+
+# ========================
+# 2. Генераторы строк
+# ========================
+def generate_tracks(
+    base: Dict[str, Any], first_id: int, count: int, seed: int
+):
+    rng = random.Random(seed)
+    for track_id in range(first_id, first_id + count):
+        template = rng.choice(base["tracks"])
+        length = max(1000, int(template[6] * rng.uniform(0.8, 1.2)))
+        size = int(template[7] * length / template[6]) if template[7] else None
+        yield (
+            track_id,
+            f"{template[1]} (Version {track_id})"[:200],
+            *template[2:6],
+            length,
+            size,
+            template[8],
+        )
+
+
+def country_weights(
+    customers: List[Tuple], skew: float
+) -> Tuple[List[str], List[float]]:
+    counts: Dict[str, int] = {}
+    for customer in customers:
+        counts[customer[7]] = counts.get(customer[7], 0) + 1
+    countries = sorted(counts)
+    return countries, [counts[c] ** skew for c in countries]
+
+
+def generate_customers(
+    base: Dict[str, Any], first_id: int, count: int, seed: int, skew: float
+):
+    rng = random.Random(seed)
+    customers = base["customers"]
+    by_country: Dict[str, List[Tuple]] = {}
+    for customer in customers:
+        by_country.setdefault(customer[7], []).append(customer)
+    countries, weights = country_weights(customers, skew)
+    for customer_id in range(first_id, first_id + count):
+        (country,) = rng.choices(countries, weights)
+        template = rng.choice(by_country[country])
+        first_name = rng.choice(customers)[1]
+        last_name = rng.choice(customers)[2]
+        yield (
+            customer_id,
+            first_name,
+            last_name,
+            *template[3:11],
+            f"customer{customer_id}@example.com",
+            template[12],
+        )
+
+
+class InvoiceModel:
+    """Распределения для счетов: месяцы с сезонностью и ростом, клиенты,
+    треки по Ципфу и число строк в счёте"""
+
+    def __init__(
+        self,
+        base: Dict[str, Any],
+        customers: List[Tuple],
+        track_prices: Dict[int, Any],
+        zipf: float,
+        seed: int,
+    ):
+        first, last = base["period"]
+        self.months = []
+        month = datetime(first.year, first.month, 1)
+        while month <= last:
+            self.months.append(month)
+            month = (month + timedelta(days=32)).replace(day=1)
+        span = max(len(self.months) - 1, 1)
+        self.month_weights = list(
+            accumulate(
+                SEASONALITY[m.month - 1] * (1 + (GROWTH - 1) * n / span)
+                for n, m in enumerate(self.months)
+            )
+        )
+        self.customers = {c[0]: c for c in customers}
+        self.customer_ids = list(self.customers)
+        # Ранг популярности трека не зависит от его id
+        self.tracks = sorted(track_prices)
+        random.Random(seed).shuffle(self.tracks)
+        ranks = range(1, len(self.tracks) + 1)
+        self.track_weights = list(accumulate(1 / r**zipf for r in ranks))
+        self.track_prices = track_prices
+        self.lines_per_invoice = base["lines_per_invoice"]
+
+    def invoice_date(self, rng: random.Random) -> datetime:
+        (month,) = rng.choices(self.months, cum_weights=self.month_weights)
+        days = ((month + timedelta(days=32)).replace(day=1) - month).days
+        return month + timedelta(days=rng.randrange(days))
+
+    def generate(self, first_id: int, count: int, seed: int):
+        """Счета и строки счетов куска id [first_id, first_id + count)"""
+        rng = random.Random(seed)
+        invoices, lines = [], []
+        for invoice_id in range(first_id, first_id + count):
+            customer = self.customers[rng.choice(self.customer_ids)]
+            tracks = rng.choices(
+                self.tracks,
+                cum_weights=self.track_weights,
+                k=rng.choice(self.lines_per_invoice),
+            )
+            total = sum(self.track_prices[t] for t in tracks)
+            invoices.append(
+                (
+                    invoice_id,
+                    customer[0],
+                    self.invoice_date(rng),
+                    *customer[4:9],
+                    total,
+                )
+            )
+            lines.extend(
+                (invoice_id, t, self.track_prices[t], 1) for t in tracks
+            )
+        return invoices, lines
+
+
+# ========================
+# 3. Загрузка
+# ========================
+def chunks(first_id: int, count: int, size: int):
+    for start in range(first_id, first_id + count, size):
+        yield start, min(size, first_id + count - start)
+
+
+def copy_chunk(dsn: Optional[str], job: Callable[[], List[Tuple]]) -> int:
+    """COPY таблиц куска `job() -> [(таблица, колонки, строки)]` одной
+    транзакцией в своём соединении; строки генерируются в потоке загрузки"""
+    conn = pg.connect(dsn, autocommit=False)
+    try:
+        loaded = sum(
+            pg.copy_rows(conn, table, columns, rows)
+            for table, columns, rows in job()
+        )
+        conn.commit()
+        return loaded
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def run_parallel(
+    dsn: Optional[str], jobs: List[Callable[[], List[Tuple]]], workers: int
+) -> int:
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(lambda job: copy_chunk(dsn, job), jobs))
+
+
+def targets(args, counts) -> Dict[str, int]:
+    """Сколько строк добавить в каждую таблицу"""
+    factors = {
+        "customer": args.customers or args.factor,
+        "track": args.tracks or args.factor,
+        "invoice": args.invoices or args.factor,
+    }
+    return {
+        table: max(0, int(CHINOOK_ROWS[table] * factors[table]) - count)
+        for table, (count, _) in counts.items()
+    }
+
+
+def reset(conn) -> None:
+    """Удалить синтетические строки (id выше исходных)"""
+    pg.execute(
+        conn,
+        "DELETE FROM invoice_line WHERE invoice_id > %s",
+        (CHINOOK_ROWS["invoice"],),
+    )
+    for table in ("invoice", "customer", "track"):
+        deleted = pg.execute(
+            conn,
+            f"DELETE FROM {table} WHERE {table}_id > %s",
+            (CHINOOK_ROWS[table],),
+        )
+        print(f"  🗑️ {table}: удалено {deleted}")
+
+
+def restart_sequences(conn) -> None:
+    """Serial-последовательности продолжают после явно заданных id"""
+    for table in ("customer", "track", "invoice", "invoice_line"):
+        pg.execute(
+            conn,
+            f"SELECT setval(pg_get_serial_sequence('{table}', "
+            f"'{table}_id'), (SELECT MAX({table}_id) FROM {table}))",
+        )
+
+
+def scale(args) -> int:
+    """Дописать синтетические строки; сколько загружено"""
+    conn = pg.connect(args.dsn)
+    try:
+        if args.reset:
+            reset(conn)
+            restart_sequences(conn)
+            print("✅ Остались исходные данные Chinook")
+            return 0
+        base = load_base(conn)
+    finally:
+        conn.close()
+
+    counts = base["counts"]
+    add = targets(args, counts)
+    print(
+        "📈 Добавляем: "
+        + ", ".join(f"{table} +{n}" for table, n in add.items())
+    )
+    seed = args.seed
+    started = time.perf_counter()
+
+    # Клиенты и треки — до счетов, которые на них ссылаются
+    jobs = []
+    for table, columns, generator in (
+        ("customer", CUSTOMER_COLUMNS, generate_customers),
+        ("track", TRACK_COLUMNS, generate_tracks),
+    ):
+        for n, (first_id, count) in enumerate(
+            chunks(counts[table][1] + 1, add[table], args.chunk)
+        ):
+            extra = (args.country_skew,) if table == "customer" else ()
+            rows = generator(base, first_id, count, seed + n, *extra)
+            jobs.append(lambda item=(table, columns, rows): [item])
+    loaded = run_parallel(args.dsn, jobs, args.workers)
+
+    conn = pg.connect(args.dsn)
+    try:
+        customers = pg.fetch(
+            conn,
+            f"SELECT {pg.column_list(CUSTOMER_COLUMNS)} FROM customer",
+        )
+        track_prices = dict(
+            pg.fetch(conn, "SELECT track_id, unit_price FROM track")
+        )
+    finally:
+        conn.close()
+    model = InvoiceModel(base, customers, track_prices, args.zipf, seed)
+
+    def invoice_job(n, first_id, count):
+        def job():
+            invoices, lines = model.generate(
+                first_id, count, seed + 1000 + n
+            )
+            return [
+                ("invoice", INVOICE_COLUMNS, invoices),
+                ("invoice_line", LINE_COLUMNS, lines),
+            ]
+
+        return job
+
+    jobs = [
+        invoice_job(n, first_id, count)
+        for n, (first_id, count) in enumerate(
+            chunks(counts["invoice"][1] + 1, add["invoice"], args.chunk)
+        )
+    ]
+    loaded += run_parallel(args.dsn, jobs, args.workers)
+
+    conn = pg.connect(args.dsn)
+    try:
+        restart_sequences(conn)
+        for table in ("customer", "track", "invoice", "invoice_line"):
+            pg.execute(conn, f"ANALYZE {table}")
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - started
+    print(
+        f"✅ Загружено {loaded} строк за {elapsed:.1f} с "
+        f"({loaded / max(elapsed, 1e-9):.0f} строк/с)"
+    )
+    return loaded
+
+
+# ========================
+# 4. Запуск
+# ========================
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Опции скрипта (их же использует `auto_super scale`)"""
+    parser.add_argument(
+        "--factor", type=float, default=10, help="во сколько раз больше"
+    )
+    parser.add_argument("--customers", type=float, help="множитель клиентов")
+    parser.add_argument("--tracks", type=float, help="множитель треков")
+    parser.add_argument(
+        "--invoices", type=float, help="множитель счетов (и их строк)"
+    )
+    parser.add_argument("--zipf", type=float, default=1.1)
+    parser.add_argument("--country-skew", type=float, default=1.5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--chunk", type=int, default=20000, help="строк в одном COPY"
+    )
+    parser.add_argument(
+        "--reset", action="store_true", help="удалить синтетические строки"
+    )
+    parser.add_argument("--dsn", help="подключение к Postgres")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Синтетическое масштабирование Chinook"
+    )
+    add_arguments(parser)
+    return parser.parse_args()
+
+
+async def main(args) -> int:
+    await asyncio.to_thread(scale, args)
+    print(
+        "👉 Агрегаты пересчитываются командой: auto_super rollup "
+        + ("rebuild" if args.reset else "update")
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(asyncio.run(main(parse_args())))
+    except Exception as e:
+        print(f"\n❌ КРИТИЧЕСКАЯ ОШИБКА: {e}")
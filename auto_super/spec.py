@@ -0,0 +1,573 @@
+"""Декларативное описание дашборда (YAML/JSON) и его компиляция в бандл.
+
+Вместо цепочки запросов «датасет → график → дашборд → разметка» спека
+целиком проверяется офлайн, ссылки разрешаются в uuid, и получается один
+нативный бандл, который загружается одним POST /api/v1/assets/import/.
+
+    name: label-stats                 # пространство uuid (иначе slug)
+    database: examples                # имя подключения; без него — первое
+    datasets:
+      - key: revenue_by_country       # ссылка для графиков (иначе name)
+        name: Выручка по странам
+        sql: SELECT ...
+        columns: [Страна, Выручка]    # ожидаемые колонки (необязательно)
+        materialize: {unique_key: [Страна]}  # MV (см. matview.py)
+        rollup_sql: SELECT ... FROM {schema}.rollup_...  # с --rollup
+    charts:
+      - key: revenue_bar
+        name: Выручка по странам
+        dataset: revenue_by_country
+        viz_type: echarts_timeseries_bar
+        x_axis: Страна
+        metrics: [SUM(Выручка)]        # AGG(колонка), SQL или имя метрики
+        params: {row_limit: 100}       # остальные поля form_data как есть
+    dashboard:
+      title: Статистика лейбла
+      slug: label-stats
+      rows:                            # или tabs, формат как в layout.py
+        - header: 📊 География и рост
+          charts: [{chart: revenue_bar, width: 6}]
+
+Без rows/tabs графики раскладываются сеткой по два в строке. uuid
+объектов детерминированы по имени спеки (name, иначе slug или title
+дашборда) и key, поэтому повторная загрузка той же спеки обновляет
+объекты, а не создаёт копии, а одинаковые key разных спек не пересекаются.
+"""
+
+import asyncio
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import yaml
+
+from auto_super import (
+    bundle,
+    columns,
+    config,
+    layout,
+    pg,
+    preflight,
+    registry,
+)
+from auto_super.artifacts import artifact_uuid, valid_uuid
+from auto_super.remap import DatasetIndex
+
+Spec = Dict[str, Any]
+
+AGGREGATES = ("AVG", "COUNT", "COUNT_DISTINCT", "MAX", "MIN", "SUM")
+# Поля графика, которые переносятся в form_data без изменений
+FORM_FIELDS = ("groupby", "x_axis", "all_columns", "columns")
+DEFAULT_ROW_LIMIT = 1000
+
+# AGG(колонка): колонка — "в кавычках" или слова через пробел,
+# необязательно после DISTINCT
+_SIMPLE_METRIC = re.compile(
+    r'^\s*([A-Za-z_]+)\s*\(\s*(DISTINCT\s+)?'
+    r'("(?:[^"]|"")+"|\w+(?: \w+)*)\s*\)\s*$',
+    re.I,
+)
+# Слова, с которыми аргумент — SQL-выражение, а не имя колонки
+SQL_KEYWORDS = {
+    "AND",
+    "AS",
+    "BETWEEN",
+    "CASE",
+    "ELSE",
+    "END",
+    "FILTER",
+    "IN",
+    "IS",
+    "LIKE",
+    "NOT",
+    "NULL",
+    "OR",
+    "OVER",
+    "THEN",
+    "WHEN",
+}
+
+
+class SpecError(ValueError):
+    """Спека не прошла проверку; `errors` — все найденные проблемы"""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("\n".join(errors))
+
+
+def load_spec(path) -> Spec:
+    """Прочитать спеку из YAML или JSON (JSON — подмножество YAML)"""
+    with open(path, encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    return data or {}
+
+
+# ========================
+# Метрики
+# ========================
+def metric(value: Any) -> Any:
+    """Метрика form_data из краткой записи.
+
+    `SUM(Выручка)`, `COUNT(DISTINCT "Клиент")` — adhoc SIMPLE по колонке:
+    имя в кавычках или слова без операторов и ключевых слов SQL.
+    `COUNT(*)`, `SUM(a) / SUM(b)`, `SUM(price * qty)` и прочие выражения
+    со скобками — adhoc SQL, строка без скобок — сохранённая метрика
+    датасета, словарь передаётся как есть.
+    """
+    if not isinstance(value, str):
+        return value
+    if "(" not in value:
+        return value
+    sql = {
+        "expressionType": "SQL",
+        "sqlExpression": value.strip(),
+        "label": value.strip(),
+    }
+    match = _SIMPLE_METRIC.match(value)
+    if not match:
+        return sql
+    aggregate, distinct, column = match.groups()
+    aggregate = aggregate.upper()
+    if column.startswith('"'):
+        column = column[1:-1].replace('""', '"')
+    elif SQL_KEYWORDS & set(column.upper().split()):
+        return sql
+    if distinct:
+        if aggregate != "COUNT":
+            return sql
+        aggregate = "COUNT_DISTINCT"
+    if aggregate not in AGGREGATES:
+        return sql
+    return {
+        "expressionType": "SIMPLE",
+        "aggregate": aggregate,
+        "column": {"column_name": column},
+        "label": f"{aggregate}({column})",
+    }
+
+
+def form_data(chart: Dict[str, Any]) -> Dict[str, Any]:
+    """form_data графика без ссылки на датасет"""
+    params = {"viz_type": chart["viz_type"], "row_limit": DEFAULT_ROW_LIMIT}
+    for field in FORM_FIELDS:
+        if field in chart:
+            params[field] = chart[field]
+    if "metric" in chart:
+        params["metric"] = metric(chart["metric"])
+    if "metrics" in chart:
+        params["metrics"] = [metric(m) for m in chart["metrics"]]
+    params.update(chart.get("params") or {})
+    return params
+
+
+# ========================
+# Проверка
+# ========================
+def _key(item: Dict[str, Any]) -> Optional[str]:
+    value = item.get("key", item.get("name"))
+    return None if value is None else str(value)
+
+
+def _cells(rows: List[Dict[str, Any]]):
+    for row in rows or []:
+        for cell in row.get("charts", []):
+            if "column" in cell:
+                yield from cell["column"]
+            else:
+                yield cell
+
+
+def layout_spec(dashboard: Dict[str, Any], chart_keys: List[str]) -> Spec:
+    """Разметка дашборда из спеки; без rows/tabs — сетка из всех графиков"""
+    if dashboard.get("rows") or dashboard.get("tabs"):
+        return {
+            key: dashboard[key]
+            for key in ("rows", "tabs")
+            if dashboard.get(key)
+        }
+    return layout.grid_spec(chart_keys)
+
+
+def _check_items(
+    spec: Spec, section: str, required: List[str], errors: List[str]
+) -> Dict[str, Dict[str, Any]]:
+    items = spec.get(section) or []
+    if not isinstance(items, list):
+        errors.append(f"{section}: ожидается список")
+        return {}
+    result: Dict[str, Dict[str, Any]] = {}
+    names = set()
+    for n, item in enumerate(items):
+        where = f"{section}[{n}]"
+        if not isinstance(item, dict):
+            errors.append(f"{where}: ожидается словарь")
+            continue
+        missing = [field for field in required if not item.get(field)]
+        if missing:
+            errors.append(f"{where}: нет полей {', '.join(missing)}")
+            continue
+        key = _key(item)
+        if key in result:
+            errors.append(f"{where}: повторяется key '{key}'")
+        if item["name"] in names:
+            errors.append(f"{where}: повторяется имя '{item['name']}'")
+        names.add(item["name"])
+        result[key] = item
+    return result
+
+
+def validate(
+    spec: Spec, viz: Optional[registry.VizRegistry] = None
+) -> List[str]:
+    """Все ошибки спеки без обращения к Superset (пустой список — ок).
+
+    С реестром `viz` (например, `registry.cached()`) проверяются ещё
+    viz_type и form_data каждого графика.
+    """
+    if not isinstance(spec, dict):
+        return ["спека должна быть словарём"]
+    errors: List[str] = []
+    if spec.get("name") is not None and not isinstance(spec["name"], str):
+        errors.append("name: ожидается строка")
+    elif not spec_name(spec):
+        errors.append("name: обязателен для спеки без dashboard")
+    datasets = _check_items(spec, "datasets", ["name", "sql"], errors)
+    charts = _check_items(
+        spec, "charts", ["name", "dataset", "viz_type"], errors
+    )
+
+    for key, ds in datasets.items():
+        if ds.get("uuid") and not valid_uuid(ds["uuid"]):
+            errors.append(f"датасет '{key}': некорректный uuid")
+        if not isinstance(ds.get("columns") or [], list):
+            errors.append(f"датасет '{key}': columns должен быть списком")
+        if not isinstance(ds.get("rollup_sql", ""), str):
+            errors.append(f"датасет '{key}': rollup_sql должен быть строкой")
+        materialize = ds.get("materialize", False)
+        options = materialize if isinstance(materialize, dict) else {}
+        if not isinstance(materialize, (bool, dict)) or not isinstance(
+            options.get("unique_key") or [], list
+        ):
+            errors.append(
+                f"датасет '{key}': materialize — true или "
+                "{unique_key: [колонки]}"
+            )
+    for key, chart in charts.items():
+        where = f"график '{key}'"
+        if str(chart["dataset"]) not in datasets:
+            errors.append(f"{where}: неизвестный датасет '{chart['dataset']}'")
+        if chart.get("uuid") and not valid_uuid(chart["uuid"]):
+            errors.append(f"{where}: некорректный uuid")
+        if "metrics" in chart and not isinstance(chart["metrics"], list):
+            errors.append(f"{where}: metrics должен быть списком")
+        if not isinstance(chart.get("params") or {}, dict):
+            errors.append(f"{where}: params должен быть словарём")
+        elif viz is not None:
+            for error in viz.validate(chart["viz_type"], form_data(chart)):
+                errors.append(f"{where}: {error}")
+
+    dashboard = spec.get("dashboard")
+    if dashboard is None:
+        return errors
+    if not isinstance(dashboard, dict) or not dashboard.get("title"):
+        errors.append("dashboard: нужен словарь с title")
+        return errors
+    grid = layout_spec(dashboard, list(charts))
+    try:
+        rows = list(grid.get("rows") or [])
+        for tab in grid.get("tabs") or []:
+            rows.extend(tab.get("rows") or [])
+        for cell in _cells(rows):
+            if str(cell.get("chart")) not in charts:
+                errors.append(
+                    f"dashboard: неизвестный график '{cell.get('chart')}'"
+                )
+        layout.build_position(grid)
+    except layout.LayoutError as e:
+        errors.append(f"dashboard: {e}")
+    except (AttributeError, KeyError, TypeError) as e:
+        errors.append(f"dashboard: некорректная разметка ({e!r})")
+    return errors
+
+
+def use_rollups(spec: Spec, schema: str = config.PG_SCHEMA) -> List[str]:
+    """Подставить rollup_sql датасетов вместо sql ({schema} — схема
+    агрегатов, см. rollup.py); имена переключённых датасетов"""
+    switched = []
+    for ds in spec.get("datasets") or []:
+        if ds.get("rollup_sql"):
+            ds["sql"] = ds["rollup_sql"].replace(
+                "{schema}", pg.quote_ident(schema)
+            )
+            switched.append(ds["name"])
+    return switched
+
+
+def expected_columns(spec: Spec) -> Dict[str, Set[str]]:
+    """Имя датасета -> колонки, которые объявлены в спеке или нужны его
+    графикам (метрики, groupby, x_axis, ...)"""
+    datasets = {_key(ds): ds for ds in spec.get("datasets") or []}
+    result = {
+        ds["name"]: set(ds.get("columns") or []) for ds in datasets.values()
+    }
+    for chart in spec.get("charts") or []:
+        ds = datasets.get(str(chart["dataset"]))
+        if ds:
+            result[ds["name"]] |= columns.chart_columns(form_data(chart))
+    return result
+
+
+# ========================
+# Компиляция в бандл
+# ========================
+def spec_name(spec: Spec) -> Optional[str]:
+    """Имя спеки — пространство её uuid: name, иначе slug или title"""
+    dashboard = spec.get("dashboard")
+    if not isinstance(dashboard, dict):
+        dashboard = {}
+    return spec.get("name") or dashboard.get("slug") or dashboard.get("title")
+
+
+def object_uuid(spec: Spec, kind: str, item: Dict[str, Any]) -> str:
+    """Явный uuid из спеки или детерминированный по имени спеки и key"""
+    return valid_uuid(item.get("uuid")) or artifact_uuid(
+        f"spec-{kind}", f"{spec_name(spec)}/{_key(item)}"
+    )
+
+
+def dashboard_uuid(spec: Spec) -> str:
+    return valid_uuid(spec["dashboard"].get("uuid")) or artifact_uuid(
+        "spec-dashboard", spec_name(spec)
+    )
+
+
+def object_uuids(spec: Spec) -> Dict[str, str]:
+    """uuid -> описание объекта для всех объектов спеки"""
+    result = {}
+    for kind, section in (("dataset", "datasets"), ("chart", "charts")):
+        for item in spec.get(section) or []:
+            result[object_uuid(spec, kind, item)] = f"{kind} '{_key(item)}'"
+    if spec.get("dashboard"):
+        result[dashboard_uuid(spec)] = "dashboard"
+    return result
+
+
+def bundled_conflicts(spec: Spec, path: Any = None) -> List[str]:
+    """uuid спеки, совпадающие с uuid спек из auto_super/specs: загрузка
+    одной перезаписала бы объекты другой"""
+    path = Path(path).resolve() if path else None
+    own = object_uuids(spec)
+    errors = []
+    for other_path in sorted(spec_path("").glob("*.yaml")):
+        if other_path == path:
+            continue
+        other = load_spec(other_path)
+        if validate(other):
+            continue
+        for object_id, label in object_uuids(other).items():
+            if object_id in own:
+                errors.append(
+                    f"{own[object_id]}: uuid {object_id} совпадает с "
+                    f"{label} из {other_path.name}"
+                )
+    return errors
+
+
+def compile_bundle(spec: Spec, database: Dict[str, Any]) -> bundle.Bundle:
+    """Собрать бандл из проверенной спеки.
+
+    `database` — конфигурация подключения из экспорта Superset
+    (databases/*.yaml), на неё ссылаются все датасеты через uuid.
+    """
+    errors = validate(spec)
+    if errors:
+        raise SpecError(errors)
+
+    files: bundle.Bundle = {"metadata.yaml": bundle.metadata("assets")}
+    db_dir = bundle.safe_name(database["database_name"])
+    files[f"databases/{db_dir}.yaml"] = bundle.dump(database)
+
+    # === Датасеты ===
+    dataset_uuids = {}
+    for ds in spec.get("datasets") or []:
+        ds_uuid = object_uuid(spec, "dataset", ds)
+        dataset_uuids[_key(ds)] = ds_uuid
+        config = {
+            "table_name": ds["name"],
+            "schema": ds.get("schema"),
+            "sql": ds["sql"].strip(),
+            "uuid": ds_uuid,
+            "metrics": [],
+            "columns": [],
+            "version": "1.0.0",
+            "database_uuid": database["uuid"],
+        }
+        name = f"{bundle.safe_name(_key(ds))}_{ds_uuid[:8]}"
+        files[f"datasets/{db_dir}/{name}.yaml"] = bundle.dump(config)
+
+    # === Графики ===
+    charts = {}
+    for ch in spec.get("charts") or []:
+        ch_uuid = object_uuid(spec, "chart", ch)
+        charts[_key(ch)] = {"uuid": ch_uuid, "name": ch["name"]}
+        config = {
+            "slice_name": ch["name"],
+            "viz_type": ch["viz_type"],
+            "params": form_data(ch),
+            "cache_timeout": None,
+            "uuid": ch_uuid,
+            "version": "1.0.0",
+            "dataset_uuid": dataset_uuids[str(ch["dataset"])],
+        }
+        name = f"{bundle.safe_name(_key(ch))}_{ch_uuid[:8]}"
+        files[f"charts/{name}.yaml"] = bundle.dump(config)
+
+    # === Дашборд ===
+    dashboard = spec.get("dashboard")
+    if dashboard:
+        position = layout.build_position(
+            _resolve_cells(layout_spec(dashboard, list(charts)), charts)
+        )
+        dash_uuid = dashboard_uuid(spec)
+        config = {
+            "dashboard_title": dashboard["title"],
+            "slug": dashboard.get("slug"),
+            "uuid": dash_uuid,
+            "position": position,
+            "metadata": {},
+            "version": "1.0.0",
+        }
+        name = f"{bundle.safe_name(dashboard['title'])}_{dash_uuid[:8]}"
+        files[f"dashboards/{name}.yaml"] = bundle.dump(config)
+
+    return files
+
+
+def _resolve_cells(grid: Spec, charts: Dict[str, Dict[str, str]]) -> Spec:
+    """Копия разметки, где ключи графиков заменены на номер, uuid и имя.
+
+    chartId — лишь уникальный номер узла: при импорте Superset сам
+    связывает узел с графиком по uuid.
+    """
+    numbers = {key: n for n, key in enumerate(charts, 1)}
+
+    def cell(c: Dict[str, Any]) -> Dict[str, Any]:
+        if "column" in c:
+            return {**c, "column": [cell(inner) for inner in c["column"]]}
+        key = str(c["chart"])
+        return {**c, "chart": numbers[key], **charts[key]}
+
+    def rows(items):
+        return [
+            {**row, "charts": [cell(c) for c in row.get("charts", [])]}
+            for row in items or []
+        ]
+
+    resolved = json.loads(json.dumps(grid))
+    if resolved.get("tabs"):
+        resolved["tabs"] = [
+            {**tab, "rows": rows(tab.get("rows"))} for tab in resolved["tabs"]
+        ]
+    else:
+        resolved["rows"] = rows(resolved.get("rows"))
+    return resolved
+
+
+# ========================
+# Загрузка в Superset
+# ========================
+async def resolve_database(
+    client, name: Optional[str]
+) -> Tuple[int, Dict[str, Any]]:
+    """ID и конфигурация подключения `name` (или первого) из экспорта"""
+    rows = await client.list_all("database", columns=["id", "database_name"])
+    if name:
+        rows = [row for row in rows if row["database_name"] == name]
+    if not rows:
+        raise Exception(f"❌ Нет подключения к БД '{name or ''}'")
+    database_id = rows[0]["id"]
+    exported = bundle.read_zip(await client.export_database(database_id))
+    for path, content in exported.items():
+        if path.startswith("databases/"):
+            return database_id, bundle.load(content)
+    raise Exception("❌ В экспорте БД нет databases/*.yaml")
+
+
+def resolve_viz_types(spec: Spec, viz: registry.VizRegistry) -> None:
+    """Заменить viz_type, которых нет в этой версии Superset, на аналоги"""
+    for chart in spec.get("charts") or []:
+        resolved = viz.resolve(chart["viz_type"])
+        if resolved and resolved != chart["viz_type"]:
+            print(
+                f"⚠️  viz_type '{chart['viz_type']}' недоступен, "
+                f"используем '{resolved}' (график '{chart['name']}')"
+            )
+            chart["viz_type"] = resolved
+
+
+async def build(
+    client, spec: Spec, check_sql: bool = True
+) -> bundle.Bundle:
+    """Проверить спеку по реестру типов и SQL датасетов (EXPLAIN) и
+    собрать бандл под подключение из Superset"""
+    errors = validate(spec)
+    if errors:
+        raise SpecError(errors)
+    viz, (database_id, database) = await asyncio.gather(
+        registry.load(client),
+        resolve_database(client, spec.get("database")),
+    )
+    resolve_viz_types(spec, viz)
+    errors = validate(spec, viz)
+    if check_sql:
+        failed = await preflight.check_datasets(
+            client, database_id, spec.get("datasets") or []
+        )
+        errors += [f"датасет '{name}': {e}" for name, e in failed.items()]
+    if errors:
+        raise SpecError(errors)
+    return compile_bundle(spec, database)
+
+
+async def refresh_columns(client, spec: Spec) -> Dict[str, str]:
+    """Обновить колонки импортированных датасетов спеки и сверить их с
+    колонками, на которые ссылаются графики"""
+    index = await DatasetIndex.load(client)
+    dataset_ids = {}
+    for ds in spec.get("datasets") or []:
+        dataset_id = index.resolve(
+            object_uuid(spec, "dataset", ds), ds["name"]
+        )
+        if dataset_id is not None:
+            dataset_ids[ds["name"]] = dataset_id
+    return await columns.refresh_and_verify(
+        client, dataset_ids, expected_columns(spec)
+    )
+
+
+async def apply(
+    client, spec: Spec, check_sql: bool = True, refresh: bool = True
+) -> bundle.Bundle:
+    """Собрать и загрузить спеку одним импортом, затем обновить колонки
+    датасетов, чтобы первый рендер графиков не ждал их обнаружения"""
+    files = await build(client, spec, check_sql)
+    await bundle.import_files(client, files)
+    if refresh:
+        await refresh_columns(client, spec)
+    return files
+
+
+def summary(spec: Spec) -> str:
+    dashboard = spec.get("dashboard") or {}
+    return (
+        f"датасетов: {len(spec.get('datasets') or [])}, "
+        f"графиков: {len(spec.get('charts') or [])}, "
+        f"дашборд: {dashboard.get('title', '—')}"
+    )
+
+
+def spec_path(name: str) -> Path:
+    """Путь к спеке из auto_super/specs по имени файла"""
+    return Path(__file__).resolve().parent / "specs" / name
@@ -0,0 +1,263 @@
+"""Замер SQL датасетов спеки с историей и порогом регрессии.
+
+Каждый запрос выполняется в Postgres `--runs` раз (плюс прогрев) как
+`EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`: из плана берутся время
+планирования и выполнения, буферы shared hit/read и форма плана (дерево
+типов узлов). p50/p95 и прочее дописываются в JSON-историю
+(`config.BENCH_HISTORY`), а результат сравнивается с медианой p50
+последних успешных замеров датасета: если он стал медленнее в `--threshold`
+раз (и хотя бы на `--min-ms`), команда завершается с кодом 1, а замер
+не попадает в базу следующих запусков. Неизвестный key — код 2.
+
+    auto_super bench-sql                        # все датасеты спеки
+    auto_super bench-sql top_tracks --runs 50   # выбранные
+    auto_super bench-sql --no-save              # не писать в историю
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from auto_super import cache, config, pg, spec
+
+SPEC_FILE = spec.spec_path("chinook.yaml")
+EXPLAIN = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+# С какими запусками из истории сравнивать
+BASELINE_RUNS = 5
+
+
+# ========================
+# 1. Разбор плана
+# ========================
+def plan_shape(node: Dict[str, Any]) -> str:
+    """Дерево типов узлов: `Limit(Sort(HashAggregate(Hash Join(...))))`"""
+    children = node.get("Plans") or []
+    name = node["Node Type"]
+    if node.get("Relation Name"):
+        name += f" on {node['Relation Name']}"
+    if not children:
+        return name
+    return f"{name}({', '.join(plan_shape(c) for c in children)})"
+
+
+def parse_explain(value: Any) -> Dict[str, Any]:
+    """Время, буферы и форма из результата EXPLAIN (FORMAT JSON)"""
+    if isinstance(value, str):
+        value = json.loads(value)
+    explain = value[0]
+    plan = explain["Plan"]
+    return {
+        "ms": explain.get("Planning Time", 0.0)
+        + explain.get("Execution Time", 0.0),
+        "hit": plan.get("Shared Hit Blocks", 0),
+        "read": plan.get("Shared Read Blocks", 0),
+        "rows": plan.get("Actual Rows", 0),
+        "shape": plan_shape(plan),
+    }
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу (для десятков замеров достаточно)"""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+# ========================
+# 2. Замер
+# ========================
+def measure(conn, sql: str, runs: int) -> Dict[str, Any]:
+    """Прогрев и `runs` замеров одного запроса"""
+    query = EXPLAIN + pg.strip_sql(sql)
+    pg.fetch(conn, query)
+    samples = [parse_explain(pg.fetch(conn, query)[0][0]) for _ in range(runs)]
+    times = [s["ms"] for s in samples]
+    last = samples[-1]
+    return {
+        "p50": round(percentile(times, 50), 3),
+        "p95": round(percentile(times, 95), 3),
+        "mean": round(statistics.mean(times), 3),
+        "hit": last["hit"],
+        "read": max(s["read"] for s in samples),
+        "rows": last["rows"],
+        "shape": last["shape"],
+    }
+
+
+def run_benchmark(
+    datasets: List[Dict[str, Any]], runs: int, dsn: Optional[str] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Замеры всех датасетов по очереди в одном соединении — параллельные
+    запросы мешали бы друг другу и исказили время"""
+    conn = pg.connect(dsn)
+    results = {}
+    try:
+        for ds in datasets:
+            try:
+                results[ds["name"]] = measure(conn, ds["sql"], runs)
+            except Exception as e:
+                results[ds["name"]] = {"error": str(e).strip()}
+    finally:
+        conn.close()
+    return results
+
+
+# ========================
+# 3. История и регрессии
+# ========================
+def accepted(history: Dict[str, Any], name: str) -> List[Dict[str, Any]]:
+    """Замеры датасета без регрессии и ошибки, по порядку запусков (у
+    старых записей признак ok — общий на запуск)"""
+    results = []
+    for run in history.get("runs", []):
+        result = run["results"].get(name)
+        if result and "p50" in result and result.get("ok", run.get("ok")):
+            results.append(result)
+    return results
+
+
+def baseline(history: Dict[str, Any], name: str) -> Optional[float]:
+    """Медиана p50 датасета по последним успешным замерам"""
+    values = [r["p50"] for r in accepted(history, name)][-BASELINE_RUNS:]
+    return statistics.median(values) if values else None
+
+
+def previous_shape(history: Dict[str, Any], name: str) -> Optional[str]:
+    results = accepted(history, name)
+    return results[-1].get("shape") if results else None
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    history: Dict[str, Any],
+    threshold: float,
+    min_ms: float,
+) -> List[str]:
+    """Напечатать таблицу замеров; вернуть датасеты с регрессией/ошибкой"""
+    failed = []
+    print(
+        f"{'датасет':<32} {'p50 мс':>9} {'p95 мс':>9} {'база':>9} "
+        f"{'hit':>7} {'read':>6}"
+    )
+    for name, result in results.items():
+        if "error" in result:
+            print(f"❌ {name}: {result['error']}")
+            failed.append(name)
+            continue
+        base = baseline(history, name)
+        regressed = (
+            base is not None
+            and result["p50"] > base * threshold
+            and result["p50"] - base > min_ms
+        )
+        mark = "❌" if regressed else "✅"
+        print(
+            f"{mark} {name:<30} {result['p50']:>9.2f} {result['p95']:>9.2f} "
+            f"{'—' if base is None else f'{base:.2f}':>9} "
+            f"{result['hit']:>7} {result['read']:>6}"
+        )
+        shape = previous_shape(history, name)
+        if shape and shape != result["shape"]:
+            print(f"   ⚠️ план изменился: {shape} → {result['shape']}")
+        if regressed:
+            failed.append(name)
+    return failed
+
+
+# ========================
+# 4. Запуск
+# ========================
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Опции скрипта (их же использует `auto_super bench-sql`)"""
+    parser.add_argument("keys", nargs="*", help="key или имя датасета спеки")
+    parser.add_argument(
+        "--spec", default=str(SPEC_FILE), help="спека с датасетами"
+    )
+    parser.add_argument("--dsn", help="подключение к Postgres")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.5,
+        help="регрессия — p50 больше базы во столько раз",
+    )
+    parser.add_argument(
+        "--min-ms",
+        type=float,
+        default=1.0,
+        help="и больше базы хотя бы на столько миллисекунд",
+    )
+    parser.add_argument(
+        "--history", default=config.BENCH_HISTORY, help="JSON-история"
+    )
+    parser.add_argument(
+        "--no-save", action="store_true", help="не записывать в историю"
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Замер SQL датасетов")
+    add_arguments(parser)
+    return parser.parse_args()
+
+
+async def main(args) -> int:
+    dashboard_spec = spec.load_spec(args.spec)
+    datasets = dashboard_spec.get("datasets") or []
+    if args.keys:
+        known = {ds["name"] for ds in datasets}
+        known |= {str(ds["key"]) for ds in datasets if ds.get("key")}
+        unknown = [key for key in args.keys if key not in known]
+        if unknown:
+            print(f"❌ Нет датасетов в спеке: {', '.join(unknown)}")
+            return 2
+        datasets = [
+            ds
+            for ds in datasets
+            if ds["name"] in args.keys or ds.get("key") in args.keys
+        ]
+    print(
+        f"⏱️ Замеряем {len(datasets)} датасетов: "
+        f"{args.runs} × EXPLAIN ANALYZE..."
+    )
+    started = time.perf_counter()
+    results = await asyncio.to_thread(
+        run_benchmark, datasets, args.runs, args.dsn
+    )
+    print(f"✅ Замеры заняли {time.perf_counter() - started:.1f} с\n")
+
+    history = cache.read_json(args.history)
+    failed = compare(results, history, args.threshold, args.min_ms)
+    for name, result in results.items():
+        result["ok"] = name not in failed
+    if not args.no_save:
+        history.setdefault("runs", []).append(
+            {
+                "at": datetime.now(timezone.utc).isoformat(),
+                "ok": not failed,
+                "runs": args.runs,
+                "results": results,
+            }
+        )
+        cache.write_json(args.history, history)
+        print(f"\n💾 Результаты записаны в {args.history}")
+    if failed:
+        print(f"❌ Регрессии или ошибки: {', '.join(failed)}")
+        return 1
+    print("✅ Регрессий нет")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(asyncio.run(main(parse_args())))
+    except Exception as e:
+        print(f"\n❌ КРИТИЧЕСКАЯ ОШИБКА: {e}")
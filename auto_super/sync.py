@@ -0,0 +1,267 @@
+"""Сравнение бандла с живым Superset: план create/update/delete/unchanged.
+
+Обе стороны приводятся к каноническому виду и хэшируются: SQL датасета
+без лишних пробелов и `;` в конце, `params` графика — отсортированный
+JSON без полей, которые зависят от конкретного инстанса (id датасета,
+slice_id, dashboards). Объекты сопоставляются по uuid; если Superset не
+отдаёт uuid в списке — по имени.
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Set
+
+from auto_super import bundle
+from auto_super.client import SupersetClient
+from auto_super.remap import chart_source_dataset_id
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+UNCHANGED = "unchanged"
+ACTIONS = (CREATE, UPDATE, DELETE, UNCHANGED)
+
+# Каталог бандла -> ресурс API
+RESOURCES = {
+    "databases": "database",
+    "datasets": "dataset",
+    "charts": "chart",
+    "dashboards": "dashboard",
+}
+NAME_FIELDS = {
+    "databases": "database_name",
+    "datasets": "table_name",
+    "charts": "slice_name",
+    "dashboards": "dashboard_title",
+}
+# Поля params, которые различаются между инстансами при том же графике
+VOLATILE_PARAMS = ("datasource", "slice_id", "dashboards")
+
+
+# ========================
+# Канонический вид и хэши
+# ========================
+def canonical_sql(sql: Optional[str]) -> str:
+    return " ".join((sql or "").split()).rstrip("; ")
+
+
+def canonical_params(params: Any) -> Dict[str, Any]:
+    if isinstance(params, str):
+        params = json.loads(params or "{}")
+    return {
+        key: value
+        for key, value in (params or {}).items()
+        if key not in VOLATILE_PARAMS
+    }
+
+
+def canonical_position(position: Any) -> Dict[str, Any]:
+    """Разметка без chartId/uuid: они свои в каждом инстансе"""
+    if isinstance(position, str):
+        position = json.loads(position or "{}")
+    result = {}
+    for key, node in (position or {}).items():
+        if not isinstance(node, dict):
+            result[key] = node
+            continue
+        node = dict(node)
+        if isinstance(node.get("meta"), dict):
+            node["meta"] = {
+                k: v
+                for k, v in node["meta"].items()
+                if k not in ("chartId", "uuid")
+            }
+        result[key] = node
+    return result
+
+
+def fingerprint(kind: str, config: Dict[str, Any]) -> str:
+    """Хэш значимых полей объекта (конфиг бандла или строка API)"""
+    if kind == "datasets":
+        data = {
+            "table_name": config.get("table_name"),
+            "sql": canonical_sql(config.get("sql")),
+        }
+    elif kind == "charts":
+        data = {
+            "slice_name": config.get("slice_name"),
+            "viz_type": config.get("viz_type"),
+            "params": canonical_params(config.get("params")),
+        }
+    elif kind == "dashboards":
+        data = {
+            "dashboard_title": config.get("dashboard_title"),
+            "position": canonical_position(
+                config.get("position") or config.get("position_json")
+            ),
+        }
+    else:
+        data = {"database_name": config.get("database_name")}
+    text = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# ========================
+# Желаемое и текущее состояние
+# ========================
+def desired_state(files: bundle.Bundle) -> Dict[str, Dict[str, Any]]:
+    """uuid -> {kind, name, hash, deps} для объектов бандла"""
+    state = {}
+    for object_uuid, info in bundle.index(files).items():
+        config = bundle.load(files[info["path"]])
+        state[object_uuid] = {
+            "kind": info["kind"],
+            "name": config.get(NAME_FIELDS[info["kind"]]),
+            "hash": fingerprint(info["kind"], config),
+            "deps": info["deps"],
+        }
+    return state
+
+
+LIVE_COLUMNS = {
+    "databases": ["id", "uuid", "database_name"],
+    "datasets": ["id", "uuid", "table_name", "sql"],
+    "charts": ["id", "uuid", "slice_name", "viz_type", "params"],
+    "dashboards": ["id", "uuid", "dashboard_title"],
+}
+
+
+async def live_state(client: SupersetClient) -> Dict[str, List[Dict]]:
+    """Лёгкие списки объектов Superset; у каждой строки поле `hash`.
+
+    Разметки в списке дашбордов нет, поэтому дашборды дочитываются
+    по одному (их обычно единицы).
+    """
+    kinds = list(LIVE_COLUMNS)
+    lists = await asyncio.gather(
+        *(
+            client.list_all(RESOURCES[kind], columns=LIVE_COLUMNS[kind])
+            for kind in kinds
+        )
+    )
+    live = dict(zip(kinds, lists))
+    details = await asyncio.gather(
+        *(client.get_dashboard(row["id"]) for row in live["dashboards"])
+    )
+    for row, detail in zip(live["dashboards"], details):
+        row["position_json"] = detail.get("position_json")
+    for kind, rows in live.items():
+        for row in rows:
+            row["hash"] = fingerprint(kind, row)
+    return live
+
+
+# ========================
+# План
+# ========================
+def make_plan(
+    desired: Dict[str, Dict[str, Any]], live: Dict[str, List[Dict]]
+) -> Dict[str, Dict[str, List]]:
+    """kind -> action -> список.
+
+    Для create/update/unchanged в списке uuid объектов бандла, для
+    delete — строки API объектов, которых в бандле нет.
+    """
+    plan = {kind: {a: [] for a in ACTIONS} for kind in LIVE_COLUMNS}
+    for kind, rows in live.items():
+        by_uuid = {str(row["uuid"]): row for row in rows if row.get("uuid")}
+        by_name = {row.get(NAME_FIELDS[kind]): row for row in rows}
+        matched = set()
+        for object_uuid, obj in desired.items():
+            if obj["kind"] != kind:
+                continue
+            row = by_uuid.get(object_uuid)
+            if row is None and not by_uuid:
+                row = by_name.get(obj["name"])
+            if row is None:
+                plan[kind][CREATE].append(object_uuid)
+                continue
+            matched.add(row["id"])
+            action = UNCHANGED if row["hash"] == obj["hash"] else UPDATE
+            plan[kind][action].append(object_uuid)
+        plan[kind][DELETE] = [row for row in rows if row["id"] not in matched]
+    # Базы данных Superset не удаляем: на них завязаны чужие объекты
+    plan["databases"][DELETE] = []
+    return plan
+
+
+def position_chart_ids(position: Any) -> Set[int]:
+    """id графиков в узлах CHART разметки"""
+    if isinstance(position, str):
+        position = json.loads(position or "{}")
+    return {
+        node["meta"]["chartId"]
+        for node in (position or {}).values()
+        if isinstance(node, dict)
+        and node.get("type") == "CHART"
+        and isinstance(node.get("meta"), dict)
+        and node["meta"].get("chartId") is not None
+    }
+
+
+def limit_deletes(
+    plan: Dict[str, Dict[str, List]], live: Dict[str, List[Dict]]
+) -> int:
+    """Оставить в delete только объекты, достижимые из дашбордов бандла.
+
+    Бандл обычно описывает один дашборд, а в Superset есть и чужие:
+    удаляются только графики из текущей разметки дашбордов бандла и
+    датасеты графиков бандла, которыми не пользуются чужие графики.
+    Дашборды, которых нет в бандле, не трогаются. Возвращает, сколько
+    лишних объектов осталось вне этой области.
+    """
+    before = sum(len(actions[DELETE]) for actions in plan.values())
+    extra_dashboards = {row["id"] for row in plan["dashboards"][DELETE]}
+    reachable = set()
+    for row in live["dashboards"]:
+        if row["id"] not in extra_dashboards:
+            reachable |= position_chart_ids(row.get("position_json"))
+
+    extra_charts = plan["charts"][DELETE]
+    foreign = [row for row in extra_charts if row["id"] not in reachable]
+    foreign_ids = {row["id"] for row in foreign}
+    used = {chart_source_dataset_id(row) for row in foreign}
+    # Датасеты графиков бандла и удаляемых: после синхронизации графики
+    # бандла ссылаются на датасеты бандла
+    candidates = {
+        chart_source_dataset_id(row)
+        for row in live["charts"]
+        if row["id"] not in foreign_ids
+    }
+
+    plan["dashboards"][DELETE] = []
+    plan["charts"][DELETE] = [
+        row for row in extra_charts if row["id"] in reachable
+    ]
+    plan["datasets"][DELETE] = [
+        row
+        for row in plan["datasets"][DELETE]
+        if row["id"] in candidates and row["id"] not in used
+    ]
+    return before - sum(len(actions[DELETE]) for actions in plan.values())
+
+
+def changed(plan: Dict[str, Dict[str, List]]) -> List[str]:
+    """uuid объектов бандла, которые нужно создать или обновить"""
+    return [
+        object_uuid
+        for actions in plan.values()
+        for action in (CREATE, UPDATE)
+        for object_uuid in actions[action]
+    ]
+
+
+def print_plan(
+    plan: Dict[str, Dict[str, List]], desired: Dict[str, Dict[str, Any]]
+) -> None:
+    signs = {CREATE: "+", UPDATE: "~", DELETE: "-"}
+    print("📋 План синхронизации:")
+    for kind, actions in plan.items():
+        counts = ", ".join(f"{a}: {len(actions[a])}" for a in ACTIONS)
+        print(f"  {kind}: {counts}")
+        for action in (CREATE, UPDATE):
+            for object_uuid in actions[action]:
+                print(f"    {signs[action]} {desired[object_uuid]['name']}")
+        for row in actions[DELETE]:
+            print(f"    - {row.get(NAME_FIELDS[kind])} (ID: {row['id']})")
@@ -0,0 +1 @@
+"""Экспорт и импорт артефактов Superset (скрипты и модули для `auto_super`)."""
@@ -1,54 +1,47 @@
 # export_superset_artifacts.py
-import requests
+import argparse
+import asyncio
+import hashlib
 import json
+import sys
 import time
 import yaml
-import os
-from typing import List
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 
-# ========================
-# Конфигурация
-# ========================
-BASE_URL = "http://localhost:8088"
-USERNAME = "admin"
-PASSWORD = "admin"
-OUTPUT_FILE = "superset_artifacts.yaml"
-
-# Создаём сессию
-session = requests.Session()
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from auto_super import artifacts, bundle
+from auto_super.client import SupersetAPIError, SupersetClient
+from auto_super.config import BASE_URL
 
 # ========================
-# 1. Авторизация
+# Конфигурация
 # ========================
-def login():
-    print("🔐 Авторизуемся в Superset...")
-    url = f"{BASE_URL}/api/v1/security/login"
-    payload = {"username": USERNAME, "password": PASSWORD, "provider": "db"}
-    try:
-        response = session.post(url, json=payload)
-        if response.status_code != 200:
-            raise Exception(f"❌ Ошибка авторизации: {response.text}")
-        token = response.json()["access_token"]
-        session.headers.update({"Authorization": f"Bearer {token}"})
-        print("✅ Авторизация прошла успешно")
-    except Exception as e:
-        raise Exception(f"❌ Не удалось авторизоваться: {e}")
+OUTPUT_FILE = "superset_artifacts.yaml"
+# Каталог пошардового экспорта: по файлу на объект + index.yaml
+SHARDED_DIR = "superset_artifacts"
+# Манифест инкрементального экспорта: uuid -> id, changed_on, хэш
+MANIFEST_FILE = "superset_artifacts.manifest.json"
+# Запас (сек) для фильтра changed_on > прошлый запуск: правки, начатые
+# до старта прошлого экспорта, могли закоммититься уже после него
+CHANGED_ON_MARGIN = 300
+DASHBOARD_TITLE = "Статистика лейбла"
+# Каталог для нативного (полного) экспорта
+NATIVE_DIR = "superset_native_export"
+# Сколько id передаётся в один запрос /export/?q=!(...)
+EXPORT_CHUNK_SIZE = 100
 
 
 # ========================
-# 2. Получить все ID датасетов
+# 1. Получить все ID датасетов
 # ========================
-def get_all_dataset_ids() -> List[int]:
+async def get_all_dataset_ids(client: SupersetClient) -> List[int]:
     print("🔍 Получаем все ID датасетов...")
-    url = f"{BASE_URL}/api/v1/dataset/"
-    params = {"q": json.dumps({"columns": ["id"]})}
     try:
-        response = session.get(url, params=params)
-        if response.status_code != 200:
-            raise Exception(f"❌ Ошибка получения датасетов: {response.text}")
-        data = response.json()
-        ids = [item["id"] for item in data["result"]]
+        rows = await client.list_all("dataset", columns=["id"])
+        ids = [item["id"] for item in rows]
         print(f"✅ Найдено {len(ids)} датасетов")
         return ids
     except Exception as e:
@@ -57,18 +50,13 @@ def get_all_dataset_ids() -> List[int]:
 
 
 # ========================
-# 3. Получить все ID графиков
+# 2. Получить все ID графиков
 # ========================
-def get_all_chart_ids() -> List[int]:
+async def get_all_chart_ids(client: SupersetClient) -> List[int]:
     print("🔍 Получаем все ID графиков...")
-    url = f"{BASE_URL}/api/v1/chart/"
-    params = {"q": json.dumps({"columns": ["id"]})}
     try:
-        response = session.get(url, params=params)
-        if response.status_code != 200:
-            raise Exception(f"❌ Ошибка получения графиков: {response.text}")
-        data = response.json()
-        ids = [item["id"] for item in data["result"]]
+        rows = await client.list_all("chart", columns=["id"])
+        ids = [item["id"] for item in rows]
         print(f"✅ Найдено {len(ids)} графиков")
         return ids
     except Exception as e:
@@ -77,28 +65,16 @@ def get_all_chart_ids() -> List[int]:
 
 
 # ========================
-# 4. Получить ID дашборда по названию
+# 3. Получить ID дашборда по названию
 # ========================
-def get_dashboard_id_by_title(title: str) -> int:
+async def get_dashboard_id_by_title(
+    client: SupersetClient, title: str
+) -> int:
     print(f"🔍 Ищем дашборд по названию: {title}")
-    url = f"{BASE_URL}/api/v1/dashboard/"
-    params = {
-        "q": json.dumps(
-            {
-                "filters": [
-                    {"col": "dashboard_title", "opr": "eq", "value": title}
-                ]
-            }
-        )
-    }
     try:
-        response = session.get(url, params=params)
-        if response.status_code != 200:
-            raise Exception(f"❌ Ошибка поиска дашборда: {response.text}")
-        data = response.json()
-        if data["count"] == 0:
+        dashboard_id = await client.find_dashboard_id(title)
+        if dashboard_id is None:
             raise Exception(f"❌ Дашборд с названием '{title}' не найден")
-        dashboard_id = data["result"][0]["id"]
         print(f"✅ Найден дашборд '{title}' с ID = {dashboard_id}")
         return dashboard_id
     except Exception as e:
@@ -107,20 +83,17 @@ def get_dashboard_id_by_title(title: str) -> int:
 
 
 # ========================
-# 5. Экспорт: Подключение к БД
+# 4. Экспорт: Подключение к БД
 # ========================
-def export_database(database_id: int):
+async def export_database(client: SupersetClient, database_id: int):
     print(f"🗄️ Экспортируем подключение к БД (ID={database_id})...")
-    url = f"{BASE_URL}/api/v1/database/{database_id}/export/"
     try:
-        response = session.get(url)
-        if response.status_code != 200:
-            raise Exception(f"❌ Ошибка экспорта БД: {response.text}")
+        content = await client.export_database(database_id)
 
         import zipfile
         from io import BytesIO
 
-        zip_file = zipfile.ZipFile(BytesIO(response.content))
+        zip_file = zipfile.ZipFile(BytesIO(content))
         for file_name in zip_file.namelist():
             if file_name.endswith(".yaml"):
                 yaml_content = zip_file.read(file_name).decode("utf-8")
@@ -131,10 +104,93 @@ def export_database(database_id: int):
         return None
 
 
+# ========================
+# 5. Экспорт отдельных объектов
+# ========================
+async def export_dataset(client: SupersetClient, ds_id: int):
+    try:
+        ds_data = await client.get_dataset(ds_id)
+    except Exception as e:
+        print(f"⚠️ Ошибка при экспорте датасета {ds_id}: {e}")
+        return None
+    return {
+        "id": ds_data["id"],
+        "table_name": ds_data["table_name"],
+        "database_id": ds_data["database"]["id"],
+        "sql": ds_data.get("sql", "N/A"),
+    }
+
+
+async def export_chart(client: SupersetClient, ch_id: int):
+    try:
+        ch_data = await client.get_chart(ch_id)
+    except SupersetAPIError as e:
+        print(f"⚠️ Ошибка HTTP при получении графика {ch_id}: {e.status}")
+        return None
+    except Exception as e:
+        print(f"⚠️ Ошибка при экспорте графика {ch_id}: {e}")
+        return None
+
+    # ✅ Исправлено: безопасно получаем datasource
+    datasource = ch_data.get("datasource")
+    datasource_id = datasource["id"] if datasource else None
+    datasource_type = datasource["type"] if datasource else None
+
+    return {
+        "id": ch_data["id"],
+        "slice_name": ch_data["slice_name"],
+        "viz_type": ch_data["viz_type"],
+        "datasource_id": datasource_id,
+        "datasource_type": datasource_type,
+        "params": ch_data["params"],
+    }
+
+
+async def export_dashboard(client: SupersetClient, title: str):
+    dashboard_id = await get_dashboard_id_by_title(client, title)
+    return await export_dashboard_by_id(client, dashboard_id)
+
+
+async def export_dashboard_by_id(client: SupersetClient, dashboard_id: int):
+    try:
+        dash_data = await client.get_dashboard(dashboard_id)
+    except SupersetAPIError as e:
+        print(f"⚠️ Ошибка при получении дашборда: {e.status}")
+        return None
+    except Exception as e:
+        print(f"⚠️ Не удалось экспортировать дашборд: {e}")
+        return None
+    return {
+        "id": dash_data["id"],
+        "dashboard_title": dash_data["dashboard_title"],
+        "slug": dash_data["slug"],
+        "position_json": json.loads(dash_data["position_json"])
+        if isinstance(dash_data["position_json"], str)
+        else dash_data["position_json"],
+    }
+
+
+async def export_database_of_datasets(
+    client: SupersetClient, dataset_ids: List[int]
+):
+    """Экспорт БД через ID из первого датасета"""
+    if not dataset_ids:
+        return None
+    try:
+        ds_data = await client.get_dataset(dataset_ids[0])
+        return await export_database(client, ds_data["database"]["id"])
+    except Exception as e:
+        print(f"⚠️ Не удалось экспортировать БД: {e}")
+        return None
+
+
 # ========================
 # 6. Экспорт: Датасеты, Графики, Дашборд в YAML
 # ========================
-def export_to_yaml():
+async def export_to_yaml(
+    client: SupersetClient, sharded: bool = False
+) -> bool:
+    """Полный экспорт в YAML; True, если скачались все объекты"""
     print("📦 Экспортируем всё в YAML...")
 
     export_data = {
@@ -149,89 +205,42 @@ def export_to_yaml():
         "dashboard": None,
     }
 
-    # === 1. Экспорт БД (через ID из первого датасета) ===
-    dataset_ids = get_all_dataset_ids()
-    if dataset_ids:
-        try:
-            ds_url = f"{BASE_URL}/api/v1/dataset/{dataset_ids[0]}"
-            ds_response = session.get(ds_url)
-            if ds_response.status_code == 200:
-                db_id = ds_response.json()["result"]["database"]["id"]
-                export_data["database"] = export_database(db_id)
-        except Exception as e:
-            print(f"⚠️ Не удалось экспортировать БД: {e}")
-
-    # === 2. Экспорт датасетов ===
-    for ds_id in dataset_ids:
-        url = f"{BASE_URL}/api/v1/dataset/{ds_id}"
-        try:
-            response = session.get(url)
-            if response.status_code == 200:
-                ds_data = response.json()["result"]
-                export_data["datasets"].append(
-                    {
-                        "id": ds_data["id"],
-                        "table_name": ds_data["table_name"],
-                        "database_id": ds_data["database"]["id"],
-                        "sql": ds_data.get("sql", "N/A"),
-                    }
-                )
-        except Exception as e:
-            print(f"⚠️ Ошибка при экспорте датасета {ds_id}: {e}")
-
-    # === 3. Экспорт графиков ===
-    chart_ids = get_all_chart_ids()
-    for ch_id in chart_ids:
-        url = f"{BASE_URL}/api/v1/chart/{ch_id}"
-        try:
-            response = session.get(url)
-            if response.status_code == 200:
-                ch_data = response.json()["result"]
-                # ✅ Исправлено: безопасно получаем datasource
-                datasource = ch_data.get("datasource")
-                datasource_id = datasource["id"] if datasource else None
-                datasource_type = datasource["type"] if datasource else None
-
-                export_data["charts"].append(
-                    {
-                        "id": ch_data["id"],
-                        "slice_name": ch_data["slice_name"],
-                        "viz_type": ch_data["viz_type"],
-                        "datasource_id": datasource_id,
-                        "datasource_type": datasource_type,
-                        "params": ch_data["params"],
-                    }
-                )
-            else:
-                print(
-                    f"⚠️ Ошибка HTTP при получении графика {ch_id}: {response.status_code}"
-                )
-        except Exception as e:
-            print(f"⚠️ Ошибка при экспорте графика {ch_id}: {e}")
-
-    # === 4. Экспорт дашборда ===
-    try:
-        dashboard_id = get_dashboard_id_by_title(
-            "Статистика лейбла"
-        )  # ✅ Ты правильно изменил
-        url = f"{BASE_URL}/api/v1/dashboard/{dashboard_id}"
-        response = session.get(url)
-        if response.status_code == 200:
-            dash_data = response.json()["result"]
-            export_data["dashboard"] = {
-                "id": dash_data["id"],
-                "dashboard_title": dash_data["dashboard_title"],
-                "slug": dash_data["slug"],
-                "position_json": json.loads(dash_data["position_json"])
-                if isinstance(dash_data["position_json"], str)
-                else dash_data["position_json"],
-            }
-        else:
-            print(f"⚠️ Ошибка при получении дашборда: {response.status_code}")
-    except Exception as e:
-        print(f"⚠️ Не удалось экспортировать дашборд: {e}")
+    dataset_ids, chart_ids = await asyncio.gather(
+        get_all_dataset_ids(client), get_all_chart_ids(client)
+    )
+
+    # === Все объекты запрашиваются параллельно ===
+    database, datasets, charts, dashboard = await asyncio.gather(
+        export_database_of_datasets(client, dataset_ids),
+        asyncio.gather(*(export_dataset(client, i) for i in dataset_ids)),
+        asyncio.gather(*(export_chart(client, i) for i in chart_ids)),
+        export_dashboard(client, DASHBOARD_TITLE),  # ✅ Ты правильно изменил
+    )
+
+    export_data["database"] = database
+    export_data["datasets"] = [ds for ds in datasets if ds]
+    export_data["charts"] = [ch for ch in charts if ch]
+    export_data["dashboard"] = dashboard
 
-    # === 5. Сохраняем в YAML ===
+    target = write_artifacts(export_data, sharded)
+    ok = (
+        len(export_data["datasets"]) == len(dataset_ids)
+        and len(export_data["charts"]) == len(chart_ids)
+        and dashboard is not None
+        and (database is not None or not dataset_ids)
+    )
+    if not ok:
+        print(f"⚠️ Экспортированы не все артефакты: {target}")
+        return False
+    print(f"✅ Все артефакты экспортированы в: {target}")
+    return True
+
+
+def write_artifacts(export_data: Dict[str, Any], sharded: bool = False) -> str:
+    """Сохранить артефакты в YAML; вернуть путь к результату"""
+    if sharded:
+        artifacts.write_sharded(export_data, SHARDED_DIR)
+        return f"{SHARDED_DIR}/"
     with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
         yaml.dump(
             export_data,
@@ -241,18 +250,403 @@ def export_to_yaml():
             sort_keys=False,
             indent=2,
         )
+    return OUTPUT_FILE
+
+
+# ========================
+# 7. Инкрементальный экспорт по changed_on
+# ========================
+def content_hash(obj: Any) -> str:
+    """Хэш содержимого объекта: меняется только при реальной правке"""
+    text = json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def load_manifest() -> Dict[str, Any]:
+    """Манифест прошлого экспорта; без файла или с повреждённым файлом —
+    пустой (экспорт будет полным)"""
+    empty = {"last_run": None, "objects": {}}
+    try:
+        with open(MANIFEST_FILE, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return empty
+    except ValueError as e:
+        print(f"⚠️ Манифест {MANIFEST_FILE} повреждён ({e})")
+        return empty
+    objects = manifest.get("objects") if isinstance(manifest, dict) else None
+    if not isinstance(objects, dict) or not all(
+        isinstance(section, dict) for section in objects.values()
+    ):
+        print(f"⚠️ Манифест {MANIFEST_FILE} неполный")
+        return empty
+    return manifest
+
+
+def save_manifest(manifest: Dict[str, Any]) -> None:
+    with open(MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def load_previous_artifacts(sharded: bool = False):
+    """Предыдущий экспорт или None"""
+    try:
+        if sharded:
+            return artifacts.read_sharded(SHARDED_DIR)
+        with open(OUTPUT_FILE, encoding="utf-8") as f:
+            return yaml.safe_load(f)
+    except FileNotFoundError:
+        return None
+
+
+def changed_since(last_run: Optional[str]) -> Optional[str]:
+    """Граница фильтра changed_on: время прошлого запуска с запасом на
+    транзакции, которые были открыты в момент его старта"""
+    if not last_run:
+        return None
+    try:
+        started = datetime.fromisoformat(last_run)
+    except ValueError:
+        print(f"⚠️ Некорректный last_run в манифесте: {last_run!r}")
+        return None
+    since = started - timedelta(seconds=CHANGED_ON_MARGIN)
+    return since.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+async def list_changes(
+    client: SupersetClient,
+    resource: str,
+    known: Dict[str, Dict[str, Any]],
+    since: Optional[str] = None,
+    extra_columns: List[str] = (),
+):
+    """Изменённые с `since` строки (id, uuid, changed_on) и удалённые.
+
+    Строки запрашиваются с фильтром changed_on > since, поэтому их число
+    зависит от числа правок, а не от размера инстанса; полный список —
+    только из id, для поиска удалённых. Без `since` (или если фильтр не
+    поддерживается) — все строки. Возвращает (id существующих объектов,
+    изменённые/новые строки, id удалённых объектов).
+    """
+    columns = ["id", "uuid", "changed_on_utc", *extra_columns]
+    if since:
+        try:
+            id_rows, rows = await asyncio.gather(
+                client.list_all(resource, columns=["id"]),
+                client.list_all(
+                    resource,
+                    columns=columns,
+                    filters=[
+                        {"col": "changed_on", "opr": "gt", "value": since}
+                    ],
+                ),
+            )
+        except SupersetAPIError as e:
+            print(
+                f"⚠️ {resource}: фильтр по changed_on недоступен "
+                f"({e.status}), запрашиваю все строки"
+            )
+            since = None
+    if not since:
+        rows = id_rows = await client.list_all(resource, columns=columns)
+    current_ids = {row["id"] for row in id_rows}
+    changed = []
+    for row in rows:
+        entry = known.get(row.get("uuid") or str(row["id"]))
+        if entry is None or entry.get("changed_on") != row.get(
+            "changed_on_utc"
+        ):
+            changed.append(row)
+    deleted = [
+        entry["id"]
+        for entry in known.values()
+        if entry["id"] not in current_ids
+    ]
+    return current_ids, changed, deleted
+
+
+def merge_entries(
+    previous: List[Dict[str, Any]],
+    fetched: List[Dict[str, Any]],
+    deleted: List[int],
+) -> List[Dict[str, Any]]:
+    """Прошлые записи без удалённых, с заменой перекачанных (по id)"""
+    entries = {item["id"]: item for item in previous or []}
+    for object_id in deleted:
+        entries.pop(object_id, None)
+    for item in fetched:
+        entries[item["id"]] = item
+    return sorted(entries.values(), key=lambda item: item["id"])
+
+
+def update_manifest_section(
+    known: Dict[str, Dict[str, Any]],
+    current_ids: set,
+    changed: List[Dict[str, Any]],
+    fetched: List[Dict[str, Any]],
+    stats: Dict[str, int],
+) -> Dict[str, Dict[str, Any]]:
+    """Новая секция манифеста. Объект, который не удалось скачать,
+    сохраняет старую запись и будет перекачан в следующий раз."""
+    by_id = {item["id"]: item for item in fetched}
+    section = {
+        uuid: entry
+        for uuid, entry in known.items()
+        if entry["id"] in current_ids
+    }
+    for row in changed:
+        uuid = row.get("uuid") or str(row["id"])
+        item = by_id.get(row["id"])
+        if item is None:
+            continue
+        digest = content_hash(item)
+        old = known.get(uuid)
+        if old is None:
+            stats["new"] += 1
+        elif old.get("hash") != digest:
+            stats["updated"] += 1
+        else:
+            stats["touched"] += 1
+        section[uuid] = {
+            "id": row["id"],
+            "changed_on": row.get("changed_on_utc"),
+            "hash": digest,
+        }
+    return section
+
+
+async def export_incremental(
+    client: SupersetClient, sharded: bool = False
+) -> bool:
+    """Экспорт только изменённых с прошлого запуска объектов.
+
+    Строки (id, uuid, changed_on_utc) запрашиваются только изменённые
+    после прошлого запуска (фильтр changed_on); полные объекты качаются
+    для новых и тех, у кого changed_on отличается от манифеста. Удалённые
+    объекты находятся по разнице множеств id (список только из id).
+    Стоимость запуска пропорциональна числу правок, а не размеру инстанса.
+    True, если скачались все изменённые объекты.
+    """
+    previous = load_previous_artifacts(sharded)
+    manifest = load_manifest()
+    if previous is None or not manifest.get("last_run"):
+        print("⚠️ Нет прошлого экспорта или манифеста — полный экспорт")
+        previous = {"database": None, "datasets": [], "charts": []}
+        manifest = {"last_run": None, "objects": {}}
+    known = manifest["objects"]
+    since = changed_since(manifest["last_run"])
+    started = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime())
+    print(f"📦 Инкрементальный экспорт (прошлый: {manifest['last_run']})...")
+
+    ds_list, ch_list, dash_list = await asyncio.gather(
+        list_changes(client, "dataset", known.get("dataset", {}), since),
+        list_changes(client, "chart", known.get("chart", {}), since),
+        list_changes(
+            client,
+            "dashboard",
+            known.get("dashboard", {}),
+            since,
+            extra_columns=["dashboard_title"],
+        ),
+    )
+    ds_ids, ds_changed, ds_deleted = ds_list
+    ch_ids, ch_changed, ch_deleted = ch_list
+    dash_ids, dash_changed, dash_deleted = dash_list
+    dash_changed = [
+        row
+        for row in dash_changed
+        if row["dashboard_title"] == DASHBOARD_TITLE
+    ]
+
+    datasets, charts, dashboards = await asyncio.gather(
+        asyncio.gather(*(export_dataset(client, r["id"]) for r in ds_changed)),
+        asyncio.gather(*(export_chart(client, r["id"]) for r in ch_changed)),
+        asyncio.gather(
+            *(export_dashboard_by_id(client, r["id"]) for r in dash_changed)
+        ),
+    )
+    datasets = [ds for ds in datasets if ds]
+    charts = [ch for ch in charts if ch]
+    dashboards = [dash for dash in dashboards if dash]
+
+    dashboard = previous.get("dashboard")
+    if dashboards:
+        dashboard = dashboards[0]
+    elif dashboard and dashboard["id"] in dash_deleted:
+        dashboard = None
+
+    database = previous.get("database")
+    if database is None:
+        database = await export_database_of_datasets(
+            client, sorted(ds_ids)
+        )
 
-    print(f"✅ Все артефакты экспортированы в: {OUTPUT_FILE}")
+    export_data = {
+        "metadata": {
+            "exported_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "superset_url": BASE_URL,
+            "export_tool": "export_superset_artifacts.py",
+        },
+        "database": database,
+        "datasets": merge_entries(
+            previous.get("datasets"), datasets, ds_deleted
+        ),
+        "charts": merge_entries(previous.get("charts"), charts, ch_deleted),
+        "dashboard": dashboard,
+    }
+    target = write_artifacts(export_data, sharded)
+
+    stats = {"new": 0, "updated": 0, "touched": 0}
+    manifest = {
+        "last_run": started,
+        "objects": {
+            "dataset": update_manifest_section(
+                known.get("dataset", {}), ds_ids, ds_changed, datasets, stats
+            ),
+            "chart": update_manifest_section(
+                known.get("chart", {}), ch_ids, ch_changed, charts, stats
+            ),
+            "dashboard": update_manifest_section(
+                known.get("dashboard", {}),
+                dash_ids,
+                dash_changed,
+                dashboards,
+                stats,
+            ),
+        },
+    }
+    save_manifest(manifest)
+
+    unchanged = len(ds_ids) + len(ch_ids) - len(ds_changed) - len(ch_changed)
+    print(
+        f"✅ Инкрементальный экспорт в {target}: "
+        f"новых {stats['new']}, изменено {stats['updated']}, "
+        f"без изменений содержимого {stats['touched']}, "
+        f"удалено {len(ds_deleted) + len(ch_deleted) + len(dash_deleted)}, "
+        f"не менялись {unchanged}"
+    )
+    failed = (
+        len(ds_changed)
+        + len(ch_changed)
+        + len(dash_changed)
+        - len(datasets)
+        - len(charts)
+        - len(dashboards)
+    )
+    if failed:
+        print(f"⚠️ Не скачано объектов: {failed} (повторятся в следующий раз)")
+    return not failed
+
+
+# ========================
+# 8. Нативный экспорт пачками (/export/?q=!(ids))
+# ========================
+async def export_chunk(client: SupersetClient, resource: str, ids: List[int]):
+    content = await client.export_objects(resource, ids)
+    return bundle.read_zip(content)
+
+
+async def export_native(
+    client: SupersetClient,
+    output_dir: str = NATIVE_DIR,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> bundle.Bundle:
+    """Полный экспорт (колонки, метрики, uuid) нативными архивами Superset.
+
+    Сначала пробуем /api/v1/assets/export/ — всё одним архивом. Если
+    эндпоинта нет, экспортируем каждый тип объектов пачками по
+    `chunk_size` id; пачки качаются параллельно, а одинаковые пути
+    зависимостей (БД, датасеты) в разных архивах просто совпадают.
+    """
+    print("📦 Нативный экспорт Superset...")
+    try:
+        files = bundle.read_zip(await client.export_assets())
+        print("✅ Использован /api/v1/assets/export/")
+    except SupersetAPIError as e:
+        if e.status not in (404, 405):
+            raise
+        print("⚠️ /api/v1/assets/export/ недоступен, экспортируем пачками")
+        resources = ["database", "dataset", "chart", "dashboard"]
+        id_lists = await asyncio.gather(
+            *(client.list_all(r, columns=["id"]) for r in resources)
+        )
+        chunks = [
+            (resource, [row["id"] for row in rows[i : i + chunk_size]])
+            for resource, rows in zip(resources, id_lists)
+            for i in range(0, len(rows), chunk_size)
+        ]
+        parts = await asyncio.gather(
+            *(export_chunk(client, r, ids) for r, ids in chunks)
+        )
+        files = {}
+        for part in parts:
+            files.update(part)
+        files["metadata.yaml"] = bundle.metadata("assets")
+
+    bundle.write_dir(files, output_dir)
+    counts = {
+        kind: sum(1 for path in files if path.startswith(f"{kind}/"))
+        for kind in bundle.KINDS
+    }
+    print(
+        f"✅ Нативный экспорт сохранён в {output_dir}/: "
+        + ", ".join(f"{k}: {v}" for k, v in counts.items())
+    )
+    return files
 
 
 # ========================
-# 7. Основной процесс
+# 9. Основной процесс
 # ========================
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Опции скрипта (их же использует `auto_super export`)"""
+    parser.add_argument(
+        "--native",
+        action="store_true",
+        help=f"полный нативный экспорт пачками в каталог {NATIVE_DIR}/",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=f"только изменения с прошлого запуска (манифест {MANIFEST_FILE})",
+    )
+    parser.add_argument(
+        "--sharded",
+        action="store_true",
+        help=f"по файлу на объект в каталоге {SHARDED_DIR}/ (с index.yaml)",
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Экспорт артефактов Superset")
+    add_arguments(parser)
+    return parser.parse_args()
+
+
+async def main(args) -> bool:
+    """Экспорт; False, если часть объектов не скачалась"""
+    async with SupersetClient() as client:
+        if args.native:
+            await export_native(client)
+            return True
+        if args.incremental:
+            return await export_incremental(client, args.sharded)
+        return await export_to_yaml(client, args.sharded)
+
+
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        login()
-        export_to_yaml()
-        print(f"\n🎉 Экспорт завершён! Файл: {OUTPUT_FILE}")
+        if not asyncio.run(main(args)):
+            print("\n⚠️ Есть ошибки")
+            sys.exit(1)
+        if args.native:
+            target = f"{NATIVE_DIR}/"
+        elif args.sharded:
+            target = f"{SHARDED_DIR}/"
+        else:
+            target = OUTPUT_FILE
+        print(f"\n🎉 Экспорт завершён! Файл: {target}")
         print("👉 Теперь запусти: python import_superset_artifacts.py")
 
     except Exception as e:
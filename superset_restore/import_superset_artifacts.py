@@ -1,41 +1,38 @@
 # import_superset_artifacts.py
-import requests
-import yaml
+import argparse
+import asyncio
+import copy
+import io
+import json
 import os
+import sys
 import time
-import io
+import yaml
 import zipfile
-from typing import Dict, Any
-
-# ========================
-# Конфигурация
-# ========================
-BASE_URL = "http://localhost:8088"
-USERNAME = "admin"
-PASSWORD = "admin"
-YAML_FILE = "superset_artifacts.yaml"
+from pathlib import Path
+from typing import Dict, Any, Optional
 
-# Создаём сессию
-session = requests.Session()
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from auto_super import artifacts, bundle, dag, remap, sync
+from auto_super.journal import ImportJournal, content_hash
+from auto_super.remap import DatasetIndex, chart_source_dataset_id
+from auto_super.artifacts import artifact_uuid, valid_uuid
+from auto_super.client import SupersetAPIError, SupersetClient
+from auto_super.config import BASE_URL
 
 # ========================
-# 1. Авторизация
+# Конфигурация
 # ========================
-def login():
-    print("🔐 Авторизуемся в Superset...")
-    url = f"{BASE_URL}/api/v1/security/login"
-    payload = {"username": USERNAME, "password": PASSWORD, "provider": "db"}
-    response = session.post(url, json=payload)
-    if response.status_code != 200:
-        raise Exception(f"❌ Ошибка авторизации: {response.text}")
-    token = response.json()["access_token"]
-    session.headers.update({"Authorization": f"Bearer {token}"})
-    print("✅ Авторизация прошла успешно")
+YAML_FILE = "superset_artifacts.yaml"
+# Сколько id удаляется одним запросом при --sync --prune
+DELETE_CHUNK_SIZE = 100
+# Журнал параллельного импорта для --resume
+JOURNAL_FILE = "superset_import_journal.sqlite"
 
 
 # ========================
-# 2. Создать ZIP в памяти из словаря
+# 1. Создать ZIP в памяти из словаря
 # ========================
 def create_zip_from_dict(data: Dict[str, Any], filename: str) -> bytes:
     buffer = io.BytesIO()
@@ -49,23 +46,12 @@ def create_zip_from_dict(data: Dict[str, Any], filename: str) -> bytes:
 
 
 # ========================
-# 3. Импорт подключения к БД
+# 2. Импорт подключения к БД
 # ========================
-def import_database(database_data):
+async def import_database(client: SupersetClient, database_data):
     print("🗄️ Импортируем подключение к БД...")
-    url = f"{BASE_URL}/api/v1/database/import/"
-
-    # Структура, которую ожидает Superset
-    zip_data = {
-        "version": "1.0.0",
-        "type": "Database",
-        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-        "databases": {
-            "__root__": database_data  # 🔥 Ключ должен быть __root__
-        },
-    }
 
-    # Создаём ZIP в памяти
+    # Создаём ZIP в памяти в структуре, которую ожидает Superset
     buffer = io.BytesIO()
     with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
         zf.writestr(
@@ -80,102 +66,111 @@ def import_database(database_data):
             ),
         )
         zf.writestr(
-            "databases/__root__.yaml",
+            "databases/__root__.yaml",  # 🔥 Ключ должен быть __root__
             yaml.dump(database_data, allow_unicode=True),
         )
 
-    buffer.seek(0)
-
     # Отправляем
-    files = {
-        "file": ("database.zip", buffer.read(), "application/zip"),
-        "overwrite": (None, "true"),
-    }
-    response = session.post(url, files=files)
-    if response.status_code == 201:
-        print("✅ Подключение к БД импортировано")
-        return True
-    else:
-        print(
-            f"❌ Ошибка импорта БД: {response.status_code} — {response.text}"
+    try:
+        await client.import_zip(
+            "database", buffer.getvalue(), filename="database.zip"
         )
+    except SupersetAPIError as e:
+        print(f"❌ Ошибка импорта БД: {e.status} — {e.text}")
         return False
+    print("✅ Подключение к БД импортировано")
+    return True
 
 
 # ========================
-# 4. Импорт датасетов
+# 3. Импорт датасетов
 # ========================
-def import_datasets(dataset_list: list):
-    print(f"📊 Импортируем {len(dataset_list)} датасетов...")
-    url = f"{BASE_URL}/api/v1/dataset/import/"
+async def import_dataset(client: SupersetClient, ds: Dict):
+    print(f"  ➤ Импорт: {ds['table_name']} (ID={ds['id']})")
 
-    for ds in dataset_list:
-        print(f"  ➤ Импорт: {ds['table_name']} (ID={ds['id']})")
+    zip_data = {
+        "datasets": [ds],
+        "version": "1.0.0",
+        "type": "Dataset",
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    zip_content = create_zip_from_dict(zip_data, "dataset_metadata.yaml")
 
-        zip_data = {
-            "datasets": [ds],
-            "version": "1.0.0",
-            "type": "Dataset",
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-        }
-        zip_content = create_zip_from_dict(zip_data, "dataset_metadata.yaml")
+    try:
+        await client.import_zip("dataset", zip_content, filename="dataset.zip")
+    except SupersetAPIError as e:
+        print(f"    ❌ Ошибка: {e.status} — {e.text[:300]}")
+        return False
+    print(f"    ✅ Датасет '{ds['table_name']}' импортирован")
+    return True
 
-        files = {
-            "file": ("dataset.zip", zip_content, "application/zip"),
-            "overwrite": (None, "true"),
-        }
-        response = session.post(url, files=files)
-        if response.status_code == 201:
-            print(f"    ✅ Датасет '{ds['table_name']}' импортирован")
-        else:
-            print(
-                f"    ❌ Ошибка: {response.status_code} — {response.text[:300]}"
-            )
-        time.sleep(0.5)
 
+async def import_datasets(client: SupersetClient, dataset_list: list):
+    print(f"📊 Импортируем {len(dataset_list)} датасетов...")
+    results = await asyncio.gather(
+        *(import_dataset(client, ds) for ds in dataset_list)
+    )
     print("✅ Все датасеты обработаны")
+    return all(results)
 
 
 # ========================
-# 5. Импорт графиков
+# 4. Импорт графиков
 # ========================
-def import_charts(chart_list: list):
-    print(f"📈 Импортируем {len(chart_list)} графиков...")
-    url = f"{BASE_URL}/api/v1/chart/import/"
-
-    for ch in chart_list:
-        print(f"  ➤ Импорт: {ch['slice_name']} (ID={ch['id']})")
+async def import_chart(client: SupersetClient, ch: Dict):
+    print(f"  ➤ Импорт: {ch['slice_name']} (ID={ch['id']})")
 
-        zip_data = {
-            "charts": {str(ch["id"]): ch},
-            "version": "1.0.0",
-            "type": "Chart",
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-        }
-        zip_content = create_zip_from_dict(zip_data, "chart_metadata.yaml")
-
-        files = {
-            "file": ("chart.zip", zip_content, "application/zip"),
-            "overwrite": (None, "true"),
-        }
-        response = session.post(url, files=files)
-        if response.status_code == 201:
-            print(f"    ✅ График '{ch['slice_name']}' импортирован")
-        else:
-            print(
-                f"    ❌ Ошибка: {response.status_code} — {response.text[:300]}"
-            )
-        time.sleep(0.5)
+    zip_data = {
+        "charts": {str(ch["id"]): ch},
+        "version": "1.0.0",
+        "type": "Chart",
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    zip_content = create_zip_from_dict(zip_data, "chart_metadata.yaml")
 
+    try:
+        await client.import_zip("chart", zip_content, filename="chart.zip")
+    except SupersetAPIError as e:
+        print(f"    ❌ Ошибка: {e.status} — {e.text[:300]}")
+        return False
+    print(f"    ✅ График '{ch['slice_name']}' импортирован")
+    return True
+
+
+async def remap_charts(
+    client: SupersetClient, dataset_list: list, chart_list: list
+) -> list:
+    """Перевести графики на id датасетов целевого инстанса.
+
+    Один список датасетов после их импорта — и все графики
+    переписываются за один проход, без поиска датасета на каждый график.
+    """
+    index = await DatasetIndex.load(client)
+    id_map = remap.source_id_map(dataset_list, index)
+    charts, unresolved = remap.rewrite_charts(chart_list, id_map)
+    print(
+        f"🔗 Датасеты сопоставлены: {len(id_map)}/{len(dataset_list)}, "
+        f"графиков переписано: {len(charts)}"
+    )
+    for ch in unresolved:
+        print(f"⚠️ График '{ch['slice_name']}' без датасета — пропущен")
+    return charts
+
+
+async def import_charts(client: SupersetClient, chart_list: list):
+    print(f"📈 Импортируем {len(chart_list)} графиков...")
+    results = await asyncio.gather(
+        *(import_chart(client, ch) for ch in chart_list)
+    )
     print("✅ Все графики обработаны")
+    return all(results)
 
 
 # ========================
-# 6. Импорт дашборда
+# 5. Импорт дашборда
 # ========================
-def import_dashboard(dashboard_data: Dict):
+async def import_dashboard(client: SupersetClient, dashboard_data: Dict):
     print("🎨 Импортируем дашборд...")
-    url = f"{BASE_URL}/api/v1/dashboard/import/"
 
     zip_data = {
         "dashboards": {str(dashboard_data["id"]): dashboard_data},
@@ -185,68 +180,615 @@ def import_dashboard(dashboard_data: Dict):
     }
     zip_content = create_zip_from_dict(zip_data, "dashboard_metadata.yaml")
 
-    files = {
-        "file": ("dashboard.zip", zip_content, "application/zip"),
-        "overwrite": (None, "true"),
-    }
-    response = session.post(url, files=files)
-    if response.status_code == 201:
-        print("✅ Дашборд импортирован")
-        return True
-    else:
+    try:
+        await client.import_zip(
+            "dashboard", zip_content, filename="dashboard.zip"
+        )
+    except SupersetAPIError as e:
         print(
-            f"❌ Ошибка импорта дашборда: {response.status_code} — {response.text[:500]}"
+            f"❌ Ошибка импорта дашборда: {e.status} — {e.text[:500]}"
         )
         return False
+    print("✅ Дашборд импортирован")
+    return True
 
 
 # ========================
-# 7. Основной процесс
+# 6. Импорт одним бандлом (/api/v1/assets/import/)
 # ========================
-if __name__ == "__main__":
-    try:
-        login()
+def build_bundle(data: Dict) -> bundle.Bundle:
+    """Собрать нативный бандл из superset_artifacts.yaml.
+
+    Ссылки между объектами переводятся на uuid: датасет → database_uuid,
+    график → dataset_uuid, узлы CHART в position дашборда → uuid графика.
+    """
+    files: bundle.Bundle = {"metadata.yaml": bundle.metadata("assets")}
+
+    # === БД ===
+    database = dict(data.get("database") or {})
+    database_uuid = None
+    if database:
+        database_uuid = valid_uuid(database.get("uuid")) or artifact_uuid(
+            "database", database["database_name"]
+        )
+        database.update({"uuid": database_uuid, "version": "1.0.0"})
+        database.setdefault("extra", {})
+        database = {k: v for k, v in database.items() if v is not None}
+    db_dir = bundle.safe_name(database.get("database_name", "database"))
+    if database:
+        files[f"databases/{db_dir}.yaml"] = bundle.dump(database)
+
+    # === Датасеты ===
+    dataset_uuids = {}
+    for ds in data.get("datasets") or []:
+        ds_uuid = artifact_uuid("dataset", ds["id"])
+        dataset_uuids[ds["id"]] = ds_uuid
+        config = {
+            "table_name": ds["table_name"],
+            "schema": ds.get("schema"),
+            "sql": ds.get("sql"),
+            "uuid": ds_uuid,
+            "metrics": [],
+            "columns": [],
+            "version": "1.0.0",
+            "database_uuid": database_uuid,
+        }
+        name = f"{bundle.safe_name(ds['table_name'])}_{ds['id']}"
+        files[f"datasets/{db_dir}/{name}.yaml"] = bundle.dump(config)
+
+    # === Графики ===
+    chart_uuids = {}
+    for ch in data.get("charts") or []:
+        dataset_uuid = dataset_uuids.get(chart_source_dataset_id(ch))
+        if not dataset_uuid:
+            print(f"⚠️ График '{ch['slice_name']}' без датасета — пропущен")
+            continue
+        params = ch.get("params") or {}
+        if isinstance(params, str):
+            params = json.loads(params)
+        ch_uuid = artifact_uuid("chart", ch["id"])
+        chart_uuids[ch["id"]] = ch_uuid
+        config = {
+            "slice_name": ch["slice_name"],
+            "viz_type": ch["viz_type"],
+            "params": params,
+            "cache_timeout": None,
+            "uuid": ch_uuid,
+            "version": "1.0.0",
+            "dataset_uuid": dataset_uuid,
+        }
+        name = f"{bundle.safe_name(ch['slice_name'])}_{ch['id']}"
+        files[f"charts/{name}.yaml"] = bundle.dump(config)
+
+    # === Дашборд ===
+    dashboard = data.get("dashboard")
+    if dashboard:
+        position = copy.deepcopy(dashboard.get("position_json") or {})
+        missing = []
+        for key, node in position.items():
+            if isinstance(node, dict) and node.get("type") == "CHART":
+                chart_uuid = chart_uuids.get(node["meta"].get("chartId"))
+                if chart_uuid:
+                    node["meta"]["uuid"] = chart_uuid
+                else:
+                    missing.append(key)
+        # Узлы графиков, которых нет в бандле, убираем из разметки
+        for key in missing:
+            del position[key]
+        for node in position.values():
+            if isinstance(node, dict) and node.get("children"):
+                node["children"] = [
+                    c for c in node["children"] if c not in missing
+                ]
+        config = {
+            "dashboard_title": dashboard["dashboard_title"],
+            "slug": dashboard.get("slug"),
+            "uuid": artifact_uuid("dashboard", dashboard["id"]),
+            "position": position,
+            "metadata": {},
+            "version": "1.0.0",
+        }
+        title = bundle.safe_name(dashboard["dashboard_title"])
+        name = f"{title}_{dashboard['id']}"
+        files[f"dashboards/{name}.yaml"] = bundle.dump(config)
+
+    return files
+
+
+async def import_bundle(
+    client: SupersetClient,
+    files: bundle.Bundle,
+    chunk_size: Optional[int] = None,
+) -> bool:
+    """Импортировать бандл одним запросом (или частями по `chunk_size`)"""
+    parts = bundle.split(files, chunk_size) if chunk_size else [files]
+    total = sum(
+        1 for path in files if path.split("/", 1)[0] in bundle.KINDS
+    )
+    print(f"📦 Импортируем бандл: {total} объектов, частей: {len(parts)}")
+
+    for n, part in enumerate(parts, 1):
+        started = time.monotonic()
+        try:
+            await bundle.import_files(client, part)
+        except SupersetAPIError as e:
+            print(f"❌ Ошибка импорта части {n}: {e.status} — {e.text[:500]}")
+            return False
+        print(
+            f"  ✅ Часть {n}/{len(parts)} импортирована "
+            f"за {time.monotonic() - started:.1f} с"
+        )
+    return True
 
-        if not os.path.exists(YAML_FILE):
-            raise Exception(
-                f"❌ Файл {YAML_FILE} не найден. Убедитесь, что он в той же папке."
+
+# ========================
+# 7. Параллельный импорт по графу зависимостей
+# ========================
+# Каталог бандла -> ресурс API
+RESOURCES = {
+    "databases": "database",
+    "datasets": "dataset",
+    "charts": "chart",
+    "dashboards": "dashboard",
+}
+
+
+def object_label(files: bundle.Bundle, info: Dict) -> str:
+    config = bundle.load(files[info["path"]])
+    name = (
+        config.get("slice_name")
+        or config.get("table_name")
+        or config.get("dashboard_title")
+        or config.get("database_name")
+    )
+    return f"{RESOURCES[info['kind']]} '{name}'"
+
+
+async def import_object(
+    client: SupersetClient,
+    files: bundle.Bundle,
+    objects: Dict[str, Dict],
+    object_uuid: str,
+    journal: Optional[ImportJournal] = None,
+) -> bool:
+    """Импорт одного объекта через /api/v1/<resource>/import/.
+
+    В архив кладутся и зависимости — Superset ищет их по uuid и не
+    перезаписывает, перезаписывается только сам объект.
+    """
+    info = objects[object_uuid]
+    resource = RESOURCES[info["kind"]]
+    part = bundle.subset(
+        files, objects, [object_uuid], bundle.MODEL_TYPES[resource]
+    )
+    label = object_label(files, info)
+    started = time.monotonic()
+    try:
+        await client.import_zip(
+            resource, bundle.build_zip(part), filename=f"{resource}.zip"
+        )
+    except SupersetAPIError as e:
+        print(f"    ❌ {label}: {e.status} — {e.text[:300]}")
+        if journal:
+            journal.finish(
+                object_uuid,
+                False,
+                time.monotonic() - started,
+                f"{e.status} — {e.text[:300]}",
             )
+        return False
+    print(f"    ✅ {label} импортирован")
+    if journal:
+        elapsed = time.monotonic() - started
+        object_id = await lookup_id(client, resource, object_uuid)
+        journal.finish(object_uuid, True, elapsed, object_id=object_id)
+    return True
+
+
+async def lookup_id(
+    client: SupersetClient, resource: str, object_uuid: str
+) -> Optional[int]:
+    """id импортированного объекта по uuid; None, если фильтр по uuid
+    не поддерживается (тогда id доберёт `lookup_ids` в конце)"""
+    try:
+        rows = await client.list_all(
+            resource,
+            columns=["id", "uuid"],
+            filters=[{"col": "uuid", "opr": "eq", "value": object_uuid}],
+        )
+    except SupersetAPIError:
+        return None
+    return next(
+        (row["id"] for row in rows if str(row.get("uuid")) == object_uuid),
+        None,
+    )
+
+
+async def lookup_ids(
+    client: SupersetClient, objects: Dict[str, Dict]
+) -> Dict[str, int]:
+    """uuid -> id в Superset для объектов бандла (по спискам ресурсов)"""
+    kinds = sorted({info["kind"] for info in objects.values()})
+    lists = await asyncio.gather(
+        *(
+            client.list_all(RESOURCES[kind], columns=["id", "uuid"])
+            for kind in kinds
+        )
+    )
+    return {
+        str(row["uuid"]): row["id"]
+        for rows in lists
+        for row in rows
+        if str(row.get("uuid")) in objects
+    }
 
-        with open(YAML_FILE, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f)
 
+async def import_parallel(
+    client: SupersetClient,
+    files: bundle.Bundle,
+    workers: int,
+    journal_path: str = JOURNAL_FILE,
+    resume: bool = False,
+) -> Dict[str, str]:
+    """БД → датасеты → графики → дашборды: каждый уровень графа
+    импортируется параллельно, ошибка объекта пропускает только
+    зависящие от него объекты.
+
+    Статус каждого объекта пишется в журнал `journal_path`; с `resume`
+    объекты, уже импортированные в прошлый раз с тем же содержимым (хэш
+    YAML), пропускаются.
+    """
+    objects = bundle.index(files)
+    graph = {u: info["deps"] for u, info in objects.items()}
+    with ImportJournal(journal_path) as journal:
+        if not resume:
+            journal.reset()
+        hashes = {
+            u: content_hash(files[info["path"]]) for u, info in objects.items()
+        }
+        journal.plan(
+            (u, info["kind"], object_label(files, info), hashes[u])
+            for u, info in objects.items()
+        )
+        if resume:
+            done = journal.completed(hashes)
+            graph = {u: d for u, d in graph.items() if u not in done}
+            print(f"⏩ Уже импортировано в прошлый раз: {len(done)}")
         print(
-            f"📦 Найдено в YAML: "
-            f"БД: {'да' if data.get('database') else 'нет'}, "
-            f"Датасеты: {len(data.get('datasets', []))}, "
-            f"Графики: {len(data.get('charts', []))}, "
-            f"Дашборд: {'да' if data.get('dashboard') else 'нет'}"
+            f"📦 Параллельный импорт: {len(graph)} объектов, "
+            f"уровней: {len(dag.levels(graph))}, потоков: {workers}"
         )
 
-        # === 1. Импорт БД ===
-        if "database" in data:
-            import_database(data["database"])
-        else:
-            print(
-                "⚠️ Подключение к БД не найдено в YAML. Убедитесь, что оно создано вручную."
+        status = await dag.run(
+            graph,
+            lambda u: import_object(client, files, objects, u, journal),
+            workers=workers,
+        )
+        missing = journal.missing_ids() & set(status)
+        if missing:
+            found = await lookup_ids(
+                client, {u: objects[u] for u in missing}
             )
+            journal.record_ids(found)
+        print(f"📒 Журнал {journal_path}: {journal.summary()}")
 
-        # === 2. Импорт датасетов ===
-        if "datasets" in data:
-            import_datasets(data["datasets"])
+    for u, st in status.items():
+        if st == dag.SKIPPED:
+            print(f"    ⏭️ {object_label(files, objects[u])}: пропущен")
+    results = list(status.values())
+    print(
+        f"✅ Успешно: {results.count(dag.OK)}, "
+        f"❌ ошибок: {results.count(dag.FAILED)}, "
+        f"⏭️ пропущено: {results.count(dag.SKIPPED)}"
+    )
+    return status
 
-        # === 3. Импорт графиков ===
-        if "charts" in data:
-            import_charts(data["charts"])
 
-        # === 4. Импорт дашборда ===
-        if "dashboard" in data:
-            import_dashboard(data["dashboard"])
+# ========================
+# 8. Импорт пошардового каталога (export --sharded)
+# ========================
+async def import_sharded(
+    client: SupersetClient,
+    directory: str,
+    workers: int = artifacts.DEFAULT_WORKERS,
+):
+    """Импорт по объектам, начиная сразу по мере чтения файлов.
+
+    Весь каталог в память не загружается: каждый файл разбирается в
+    пуле потоков и тут же отправляется в Superset. Возвращает дашборд и
+    признак, что все объекты импортированы.
+    """
+    index = artifacts.read_index(directory)
+    print(
+        f"📦 Найдено в {directory}/: "
+        + ", ".join(
+            f"{sub}: {len(entries)}"
+            for sub, entries in index["objects"].items()
+        )
+    )
+
+    results = []
+    async for database in artifacts.stream(
+        directory, "databases", workers, index
+    ):
+        results.append(await import_database(client, database))
+
+    print("📊 Импортируем датасеты...")
+    sources, tasks = [], []
+    async for ds in artifacts.stream(directory, "datasets", workers, index):
+        sources.append({"id": ds["id"], "table_name": ds["table_name"]})
+        tasks.append(asyncio.create_task(import_dataset(client, ds)))
+    results += await asyncio.gather(*tasks)
+    id_map = remap.source_id_map(sources, await DatasetIndex.load(client))
+
+    print("📈 Импортируем графики...")
+    tasks = []
+    async for ch in artifacts.stream(directory, "charts", workers, index):
+        target_id = id_map.get(chart_source_dataset_id(ch))
+        if target_id is None:
+            print(f"⚠️ График '{ch['slice_name']}' без датасета — пропущен")
+            results.append(False)
+            continue
+        chart = remap.rewrite_chart(ch, target_id)
+        tasks.append(asyncio.create_task(import_chart(client, chart)))
+    results += await asyncio.gather(*tasks)
+
+    dashboard = None
+    async for dashboard in artifacts.stream(
+        directory, "dashboards", workers, index
+    ):
+        results.append(await import_dashboard(client, dashboard))
+    return dashboard, all(results)
 
-        print(f"\n🎉 Восстановление завершено!")
+
+# ========================
+# 9. Синхронизация: план и применение только разницы
+# ========================
+async def sync_apply(
+    client: SupersetClient,
+    files: bundle.Bundle,
+    workers: int,
+    apply: bool = True,
+    prune: bool = False,
+) -> bool:
+    """Сравнить бандл с Superset, напечатать план и применить разницу.
+
+    Неизменённые объекты не отправляются вовсе: их метаданные и кэши
+    остаются нетронутыми. Создание/обновление идёт через
+    /api/v1/<resource>/import/ по графу зависимостей — зависимости
+    кладутся в архив, но не перезаписываются. Объекты, которых нет в
+    бандле, удаляются только с `prune` и только в пределах дашбордов
+    бандла (см. sync.limit_deletes).
+    """
+    desired = sync.desired_state(files)
+    live = await sync.live_state(client)
+    plan = sync.make_plan(desired, live)
+    foreign = sync.limit_deletes(plan, live)
+    sync.print_plan(plan, desired)
+    if foreign:
+        print(f"ℹ️ Объектов вне дашбордов бандла (не удаляются): {foreign}")
+    if not apply:
+        return True
+
+    todo = sync.changed(plan)
+    objects = bundle.index(files)
+    ok = True
+    if todo:
+        status = await dag.run(
+            {u: objects[u]["deps"] for u in todo},
+            lambda u: import_object(client, files, objects, u),
+            workers=workers,
+        )
+        ok = all(st == dag.OK for st in status.values())
+    else:
+        print("✅ Изменений нет — импортировать нечего")
+
+    extra = sum(len(actions[sync.DELETE]) for actions in plan.values())
+    if extra and not prune:
+        print(f"ℹ️ Лишних объектов в Superset: {extra} (удалить: --prune)")
+    elif extra:
+        deleted = 0
+        for kind in ("charts", "datasets"):
+            ids = [row["id"] for row in plan[kind][sync.DELETE]]
+            for i in range(0, len(ids), DELETE_CHUNK_SIZE):
+                chunk = ids[i : i + DELETE_CHUNK_SIZE]
+                try:
+                    await client.bulk_delete(RESOURCES[kind], chunk)
+                except SupersetAPIError as e:
+                    print(f"❌ Не удалось удалить {kind}: {e.status}")
+                    ok = False
+                    continue
+                deleted += len(chunk)
+        print(f"🗑️ Удалено объектов: {deleted} из {extra}")
+    return ok
+
+
+# ========================
+# 10. Основной процесс
+# ========================
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Опции скрипта (их же использует `auto_super import`)"""
+    parser.add_argument(
+        "--bundle",
+        action="store_true",
+        help="собрать один бандл и импортировать его одним запросом",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="для --bundle: импортировать частями по N объектов",
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="импорт по графу зависимостей, уровни — параллельно",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="для --parallel: сколько объектов импортировать одновременно",
+    )
+    parser.add_argument(
+        "--native",
+        metavar="DIR",
+        help="импортировать каталог нативного экспорта (export --native)",
+    )
+    parser.add_argument(
+        "--sharded",
+        metavar="DIR",
+        help="читать артефакты из пошардового каталога (export --sharded)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="продолжить прерванный --parallel импорт по журналу",
+    )
+    parser.add_argument(
+        "--journal",
+        default=JOURNAL_FILE,
+        help="для --parallel: файл журнала импорта (SQLite)",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="только показать план синхронизации, ничего не менять",
+    )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="импортировать только созданные и изменённые объекты",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="для --sync: удалить объекты, которых нет в артефактах",
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Импорт артефактов Superset")
+    add_arguments(parser)
+    return parser.parse_args()
+
+
+async def main(args) -> bool:
+    """Импорт; False, если часть объектов не импортировалась"""
+    if args.native:
+        files = bundle.read_dir(args.native)
+        async with SupersetClient() as client:
+            if args.sync or args.plan:
+                ok = await sync_apply(
+                    client, files, args.workers, not args.plan, args.prune
+                )
+            elif args.parallel or args.resume:
+                status = await import_parallel(
+                    client, files, args.workers, args.journal, args.resume
+                )
+                ok = all(st == dag.OK for st in status.values())
+            else:
+                ok = await import_bundle(client, files, args.chunk_size)
+        print("\n🎉 Восстановление завершено!" if ok else "\n⚠️ Есть ошибки")
+        return ok
+
+    whole = (
+        args.parallel or args.resume or args.bundle or args.sync or args.plan
+    )
+    if args.sharded and not whole:
+        async with SupersetClient() as client:
+            dashboard, ok = await import_sharded(client, args.sharded)
+        print("\n🎉 Восстановление завершено!" if ok else "\n⚠️ Есть ошибки")
+        if dashboard:
+            print(
+                f"👉 Открой дашборд: {BASE_URL}/superset/dashboard/{dashboard['id']}/?standalone=true"
+            )
+        return ok
+
+    if args.sharded:
+        data = artifacts.read_sharded(args.sharded)
+    else:
+        if not os.path.exists(YAML_FILE):
+            raise Exception(
+                f"❌ Файл {YAML_FILE} не найден. Убедитесь, что он в той же папке."
+            )
+
+        with open(YAML_FILE, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f)
+
+    print(
+        f"📦 Найдено в YAML: "
+        f"БД: {'да' if data.get('database') else 'нет'}, "
+        f"Датасеты: {len(data.get('datasets', []))}, "
+        f"Графики: {len(data.get('charts', []))}, "
+        f"Дашборд: {'да' if data.get('dashboard') else 'нет'}"
+    )
+
+    async with SupersetClient() as client:
+        if args.sync or args.plan:
+            ok = await sync_apply(
+                client,
+                build_bundle(data),
+                args.workers,
+                not args.plan,
+                args.prune,
+            )
+        elif args.parallel or args.resume:
+            status = await import_parallel(
+                client,
+                build_bundle(data),
+                args.workers,
+                args.journal,
+                args.resume,
+            )
+            ok = all(st == dag.OK for st in status.values())
+        elif args.bundle:
+            ok = await import_bundle(
+                client, build_bundle(data), args.chunk_size
+            )
+        else:
+            results = []
+            # === 1. Импорт БД ===
+            if "database" in data:
+                results.append(await import_database(client, data["database"]))
+            else:
+                print(
+                    "⚠️ Подключение к БД не найдено в YAML. Убедитесь, что оно создано вручную."
+                )
+
+            # === 2. Импорт датасетов ===
+            if "datasets" in data:
+                results.append(
+                    await import_datasets(client, data["datasets"])
+                )
+
+            # === 3. Импорт графиков ===
+            if "charts" in data:
+                charts = await remap_charts(
+                    client, data.get("datasets") or [], data["charts"]
+                )
+                results.append(len(charts) == len(data["charts"]))
+                results.append(await import_charts(client, charts))
+
+            # === 4. Импорт дашборда ===
+            if "dashboard" in data:
+                results.append(
+                    await import_dashboard(client, data["dashboard"])
+                )
+            ok = all(results)
+
+    print("\n🎉 Восстановление завершено!" if ok else "\n⚠️ Есть ошибки")
+    if data.get("dashboard"):
         print(
             f"👉 Открой дашборд: {BASE_URL}/superset/dashboard/{data['dashboard']['id']}/?standalone=true"
         )
+    return ok
 
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        if not asyncio.run(main(args)):
+            sys.exit(1)
     except Exception as e:
         print(f"\n❌ КРИТИЧЕСКАЯ ОШИБКА: {e}")
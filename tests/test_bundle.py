@@ -0,0 +1,57 @@
+from auto_super import bundle
+
+
+def make_bundle(charts):
+    files = {
+        "metadata.yaml": bundle.metadata(),
+        "databases/db.yaml": bundle.dump({"uuid": "db"}),
+        "datasets/db/ds.yaml": bundle.dump(
+            {"uuid": "ds", "database_uuid": "db"}
+        ),
+    }
+    for n in range(charts):
+        files[f"charts/c{n}.yaml"] = bundle.dump(
+            {"uuid": f"c{n}", "dataset_uuid": "ds"}
+        )
+    position = {
+        f"CHART-{n}": {"type": "CHART", "meta": {"uuid": f"c{n}"}}
+        for n in range(charts)
+    }
+    files["dashboards/dash.yaml"] = bundle.dump(
+        {"uuid": "dash", "position": position}
+    )
+    return files
+
+
+def uuids(part):
+    return {
+        bundle.load(content)["uuid"]
+        for path, content in part.items()
+        if path != "metadata.yaml"
+    }
+
+
+def test_index_dependencies():
+    objects = bundle.index(make_bundle(2))
+    assert objects["ds"]["deps"] == ["db"]
+    assert objects["c1"]["deps"] == ["ds"]
+    assert objects["dash"]["deps"] == ["c0", "c1"]
+    assert objects["db"]["kind"] == "databases"
+
+
+def test_split_adds_dependencies_to_each_part():
+    parts = bundle.split(make_bundle(5), 2)
+    assert [uuids(part) for part in parts] == [
+        {"db"},
+        {"db", "ds"},
+        {"db", "ds", "c0", "c1"},
+        {"db", "ds", "c2", "c3"},
+        {"db", "ds", "c4"},
+        {"db", "ds", "dash", "c0", "c1", "c2", "c3", "c4"},
+    ]
+    assert all("metadata.yaml" in part for part in parts)
+
+
+def test_zip_round_trip():
+    files = make_bundle(1)
+    assert bundle.read_zip(bundle.build_zip(files)) == files
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from auto_super import dag
+
+
+def test_levels_orders_by_dependencies():
+    graph = {"dash": ["c1", "c2"], "c1": ["ds"], "c2": ["ds"], "ds": ["db"]}
+    levels = dag.levels({**graph, "db": []})
+    assert [sorted(level) for level in levels] == [
+        ["db"],
+        ["ds"],
+        ["c1", "c2"],
+        ["dash"],
+    ]
+
+
+def test_levels_ignores_outside_and_self_dependencies():
+    assert dag.levels({"a": ["missing", "a"], "b": ["a"]}) == [["a"], ["b"]]
+
+
+def test_levels_rejects_cycle():
+    with pytest.raises(ValueError, match="Цикл"):
+        dag.levels({"a": ["b"], "b": ["a"], "c": []})
+
+
+def test_run_skips_dependents_of_failed_nodes():
+    graph = {"db": [], "ds": ["db"], "chart": ["ds"], "other": []}
+
+    async def action(node):
+        if node == "other":
+            raise RuntimeError("boom")
+        return node != "ds"
+
+    status = asyncio.run(dag.run(graph, action, workers=2))
+    assert status == {
+        "db": dag.OK,
+        "ds": dag.FAILED,
+        "chart": dag.SKIPPED,
+        "other": dag.FAILED,
+    }
@@ -0,0 +1,63 @@
+import sqlite3
+
+from auto_super.journal import FAILED, OK, PENDING, ImportJournal
+
+
+def plan(journal, *hashes):
+    journal.plan(
+        (f"u{n}", "charts", f"chart {n}", digest)
+        for n, digest in enumerate(hashes)
+    )
+
+
+def test_resume_skips_only_unchanged_ok_objects(tmp_path):
+    path = str(tmp_path / "journal.sqlite")
+    with ImportJournal(path) as journal:
+        plan(journal, "h0", "h1", "h2")
+        journal.finish("u0", True, 0.1, object_id=10)
+        journal.finish("u1", False, 0.1, "422 — bad")
+    with ImportJournal(path) as journal:
+        plan(journal, "h0", "h1", "h2")
+        assert journal.completed({"u0": "h0", "u1": "h1"}) == {"u0"}
+        assert journal.summary() == {OK: 1, PENDING: 2}
+
+
+def test_changed_content_is_planned_again(tmp_path):
+    with ImportJournal(str(tmp_path / "journal.sqlite")) as journal:
+        plan(journal, "h0", "h1")
+        journal.finish("u0", True, 0.1)
+        journal.finish("u1", True, 0.1)
+        plan(journal, "h0", "new")
+        assert journal.completed({"u0": "h0", "u1": "new"}) == {"u0"}
+        assert journal.summary() == {OK: 1, PENDING: 1}
+
+
+def test_object_ids_are_written_on_finish(tmp_path):
+    with ImportJournal(str(tmp_path / "journal.sqlite")) as journal:
+        plan(journal, "h0", "h1", "h2")
+        journal.finish("u0", True, 0.1, object_id=10)
+        journal.finish("u1", True, 0.1)
+        journal.finish("u2", False, 0.1, "500")
+        assert journal.missing_ids() == {"u1"}
+        journal.record_ids({"u1": 11})
+        assert journal.missing_ids() == set()
+        assert journal.summary() == {OK: 2, FAILED: 1}
+
+
+def test_old_journal_gets_hash_column(tmp_path):
+    path = str(tmp_path / "journal.sqlite")
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE objects (uuid TEXT PRIMARY KEY, kind TEXT NOT NULL, "
+        "name TEXT, status TEXT NOT NULL, object_id INTEGER, duration REAL, "
+        "error TEXT, updated_at REAL NOT NULL)"
+    )
+    db.execute(
+        "INSERT INTO objects VALUES ('u0', 'charts', 'c', 'ok', 1, 0, NULL, 0)"
+    )
+    db.commit()
+    db.close()
+    with ImportJournal(path) as journal:
+        assert journal.completed({"u0": "h0"}) == set()
+        plan(journal, "h0")
+        assert journal.summary() == {PENDING: 1}
@@ -0,0 +1,72 @@
+import pytest
+
+from auto_super import layout
+
+
+def children(position, key):
+    return position[key]["children"]
+
+
+def test_build_position_rows_and_columns():
+    position = layout.build_position(
+        {
+            "title": "Chinook",
+            "rows": [
+                {
+                    "header": "Итоги",
+                    "charts": [
+                        {"chart": 1, "width": 4},
+                        {"column": [{"chart": 2}, {"chart": 3}], "width": 8},
+                    ],
+                }
+            ],
+        }
+    )
+    assert position["DASHBOARD_VERSION_KEY"] == "v2"
+    assert position["HEADER_ID"]["meta"]["text"] == "Chinook"
+    assert children(position, "ROOT_ID") == ["GRID_ID"]
+    assert children(position, "GRID_ID") == ["HEADER-1", "ROW-1"]
+    assert children(position, "ROW-1") == ["CHART-1", "COLUMN-1"]
+    assert children(position, "COLUMN-1") == ["CHART-2", "CHART-3"]
+    assert position["CHART-2"]["meta"]["width"] == 8
+    assert position["CHART-3"]["parents"] == [
+        "ROOT_ID",
+        "GRID_ID",
+        "ROW-1",
+        "COLUMN-1",
+    ]
+
+
+def test_build_position_tabs_and_repeated_chart():
+    position = layout.build_position(
+        {
+            "tabs": [
+                {"title": "A", "rows": [{"charts": [{"chart": 7}]}]},
+                {"title": "B", "rows": [{"charts": [{"chart": 7}]}]},
+            ]
+        }
+    )
+    assert children(position, "GRID_ID") == ["TABS-1"]
+    assert children(position, "TABS-1") == ["TAB-1", "TAB-2"]
+    charts = [
+        key
+        for key, node in position.items()
+        if isinstance(node, dict) and node.get("type") == "CHART"
+    ]
+    assert charts == ["CHART-7", "CHART-1"]
+
+
+def test_build_position_rejects_wide_row():
+    with pytest.raises(layout.LayoutError):
+        layout.build_position(
+            {"rows": [{"charts": [{"chart": 1, "width": 8}] * 2}]}
+        )
+
+
+def test_grid_spec():
+    grid = layout.grid_spec([1, 2, 3], per_row=2)
+    assert [[c["chart"] for c in row["charts"]] for row in grid["rows"]] == [
+        [1, 2],
+        [3],
+    ]
+    assert grid["rows"][0]["charts"][0]["width"] == 6
@@ -0,0 +1,43 @@
+import pytest
+
+from auto_super import loader
+
+
+def test_parse_values_rows():
+    text = (
+        "INSERT INTO artist (artist_id, name) VALUES "
+        "(1, N'AC/DC'), (2, 'Guns N'' Roses'),\n(3, NULL), (4, -1.5e3);"
+    )
+    pos = text.index("VALUES") + len("VALUES ")
+    assert loader.parse_values(text.rstrip(";"), pos) == [
+        ("1", "AC/DC"),
+        ("2", "Guns N' Roses"),
+        ("3", None),
+        ("4", "-1.5e3"),
+    ]
+
+
+def test_parse_values_keeps_separators_inside_strings():
+    assert loader.parse_values("('a, (b); c', '')", 0) == [("a, (b); c", "")]
+
+
+@pytest.mark.parametrize("text", ["(1, abc)", "1, 2"])
+def test_parse_values_rejects_garbage(text):
+    with pytest.raises(loader.DumpError):
+        loader.parse_values(text, 0)
+
+
+def test_parse_dump_defers_keys_and_indexes():
+    dump = loader.parse_dump(
+        "CREATE TABLE artist (artist_id INT NOT NULL, name TEXT,"
+        " CONSTRAINT pk_artist PRIMARY KEY (artist_id));\n"
+        "INSERT INTO artist (artist_id, name) VALUES (1, 'a'), (2, 'b');\n"
+        "CREATE INDEX ix_artist ON artist (name);\n"
+    )
+    assert loader.table_names(dump) == ["artist"]
+    assert "PRIMARY KEY" not in dump.tables[0]
+    assert dump.primary_keys == [
+        "ALTER TABLE artist ADD CONSTRAINT pk_artist PRIMARY KEY (artist_id)"
+    ]
+    assert dump.rows["artist"] == [("1", "a"), ("2", "b")]
+    assert dump.indexes == ["CREATE INDEX ix_artist ON artist (name)"]
@@ -0,0 +1,42 @@
+import pytest
+
+from auto_super.client import rison
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, "!n"),
+        (True, "!t"),
+        (False, "!f"),
+        (42, "42"),
+        (1.5, "1.5"),
+        ("abc", "abc"),
+        ("", "''"),
+        ("two words", "'two words'"),
+        ("-1", "'-1'"),
+        ("it's!", "'it!'s!!'"),
+        ([1, 2, 3], "!(1,2,3)"),
+        ([], "!()"),
+    ],
+)
+def test_dumps(value, expected):
+    assert rison.dumps(value) == expected
+
+
+def test_dumps_list_query():
+    query = {
+        "page": 0,
+        "page_size": 100,
+        "columns": ["id", "uuid"],
+        "filters": [{"col": "table_name", "opr": "eq", "value": "Выручка"}],
+    }
+    assert rison.dumps(query) == (
+        "(page:0,page_size:100,columns:!(id,uuid),"
+        "filters:!((col:table_name,opr:eq,value:Выручка)))"
+    )
+
+
+def test_dumps_rejects_unknown_type():
+    with pytest.raises(TypeError):
+        rison.dumps(object())
@@ -0,0 +1,119 @@
+import pytest
+
+from auto_super import spec
+
+
+@pytest.mark.parametrize(
+    "value, aggregate, column",
+    [
+        ("SUM(Выручка)", "SUM", "Выручка"),
+        ("sum( Общая выручка )", "SUM", "Общая выручка"),
+        ("COUNT(DISTINCT customer_id)", "COUNT_DISTINCT", "customer_id"),
+        ('AVG("Средний (чек)")', "AVG", "Средний (чек)"),
+        ('MAX("a ""b""")', "MAX", 'a "b"'),
+    ],
+)
+def test_metric_simple(value, aggregate, column):
+    result = spec.metric(value)
+    assert result["expressionType"] == "SIMPLE"
+    assert result["aggregate"] == aggregate
+    assert result["column"] == {"column_name": column}
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "COUNT(*)",
+        "SUM(a) / SUM(b)",
+        "SUM(price * qty)",
+        "AVG(CASE WHEN x THEN 1 END)",
+        "SUM(DISTINCT total)",
+        "ROUND(total)",
+        "SUM(COALESCE(total, 0))",
+    ],
+)
+def test_metric_sql(value):
+    assert spec.metric(value) == {
+        "expressionType": "SQL",
+        "sqlExpression": value,
+        "label": value,
+    }
+
+
+def test_metric_saved_and_dict_pass_through():
+    assert spec.metric("revenue") == "revenue"
+    adhoc = {"expressionType": "SQL", "sqlExpression": "1"}
+    assert spec.metric(adhoc) is adhoc
+
+
+def valid_spec():
+    return {
+        "name": "sales",
+        "datasets": [{"key": "ds", "name": "Продажи", "sql": "SELECT 1"}],
+        "charts": [
+            {
+                "key": "total",
+                "name": "Итого",
+                "dataset": "ds",
+                "viz_type": "big_number_total",
+            }
+        ],
+        "dashboard": {"title": "Продажи"},
+    }
+
+
+def test_validate_ok():
+    assert spec.validate(valid_spec()) == []
+
+
+def test_validate_bundled_spec():
+    bundled = spec.load_spec(spec.spec_path("chinook.yaml"))
+    assert spec.validate(bundled) == []
+
+
+@pytest.mark.parametrize(
+    "change, error",
+    [
+        (
+            lambda s: [s.pop(key) for key in ("name", "dashboard")],
+            "name: обязателен для спеки без dashboard",
+        ),
+        (lambda s: s.update(charts={"total": {}}), "charts: ожидается список"),
+        (
+            lambda s: s["datasets"][0].pop("sql"),
+            "datasets[0]: нет полей sql",
+        ),
+        (
+            lambda s: s["charts"][0].update(dataset="nope"),
+            "график 'total': неизвестный датасет 'nope'",
+        ),
+        (
+            lambda s: s["charts"][0].update(uuid="not-a-uuid"),
+            "график 'total': некорректный uuid",
+        ),
+        (
+            lambda s: s["datasets"].append(dict(s["datasets"][0])),
+            "datasets[1]: повторяется key 'ds'",
+        ),
+        (
+            lambda s: s["dashboard"].update(
+                rows=[{"charts": [{"chart": "other"}]}]
+            ),
+            "dashboard: неизвестный график 'other'",
+        ),
+        (
+            lambda s: s["dashboard"].update(
+                rows=[{"charts": [{"chart": "total", "width": 13}]}]
+            ),
+            "dashboard: ❌ Сумма ширин в строке [13] больше 12",
+        ),
+    ],
+)
+def test_validate_errors(change, error):
+    broken = valid_spec()
+    change(broken)
+    assert error in spec.validate(broken)
+
+
+def test_validate_not_a_dict():
+    assert spec.validate([]) == ["спека должна быть словарём"]